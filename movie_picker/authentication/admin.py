@@ -0,0 +1,18 @@
+from django.contrib import admin
+from .models import Question, QuestionAnswerWeight
+
+
+class QuestionAnswerWeightInline(admin.TabularInline):
+    model = QuestionAnswerWeight
+    extra = 1
+
+
+@admin.register(Question)
+class QuestionAdmin(admin.ModelAdmin):
+    list_display = ['question', 'created_at']
+    search_fields = ['question']
+    ordering = ['created_at']
+
+    inlines = [
+        QuestionAnswerWeightInline,
+    ]
@@ -0,0 +1,85 @@
+from django.db import migrations
+
+# Answer to category weights the recommender had hard-coded before they moved to
+# QuestionAnswerWeight: (question text fragment, exact match, {answer: {category: weight}}).
+# Fragments are checked in the old order and the first match wins. Movie type answers
+# were tested against every question mentioning "type of movie" or "prefer", which
+# also caught the viewing context question before its own rules, so context answers
+# never got weights and none are seeded here: existing rankings stay as they were.
+# db_seed --questions offers context weights for new installs.
+MOVIE_TYPE_WEIGHTS = {
+    "action-packed": {'Action': 4, 'Adventure': 3, 'Thriller': 2},
+    "emotional": {'Drama': 4, 'Romance': 3},
+    "mind-bending": {'Science Fiction': 4, 'Thriller': 2, 'Mystery': 2},
+    "light-hearted": {'Comedy': 4, 'Animation': 2, 'Romance': 1},
+}
+LEGACY_WEIGHTS = (
+    ('mood', True, {
+        "energetic": {'Action': 3, 'Adventure': 3, 'Thriller': 2},
+        "bored": {'Comedy': 3, 'Action': 2, 'Adventure': 2},
+        "chill": {'Romance': 3, 'Drama': 2, 'Documentary': 1},
+        "jittery": {'Horror': 3, 'Thriller': 3, 'Mystery': 2},
+    }),
+    ('type of movie', True, MOVIE_TYPE_WEIGHTS),
+    ('prefer', True, MOVIE_TYPE_WEIGHTS),
+    ('what draws you', False, {
+        "amazing visuals": {'Science Fiction': 3, 'Fantasy': 3, 'Action': 2, 'Animation': 2},
+        "great storyline": {'Drama': 3, 'Mystery': 2, 'Thriller': 2},
+    }),
+)
+
+
+def legacy_weights(question_text, answer_text):
+    """Category weights the old rules gave ``answer_text`` for a question"""
+    question_text = question_text.lower()
+    answer_text = answer_text.strip().lower()
+    for fragment, exact, rules in LEGACY_WEIGHTS:
+        if fragment in question_text:
+            for rule, weights in rules.items():
+                if answer_text == rule if exact else rule in answer_text:
+                    return weights
+            return {}
+    return {}
+
+
+def seed_answer_weights(apps, schema_editor):
+    Question = apps.get_model('authentication', 'Question')
+    Answer = apps.get_model('authentication', 'Answer')
+    QuestionAnswerWeight = apps.get_model('authentication', 'QuestionAnswerWeight')
+    Category = apps.get_model('movie', 'Category')
+
+    categories = {}
+    for question in Question.objects.all():
+        # Offered answers plus any other text users gave, one row set per normalized answer
+        answers = {}
+        given = Answer.objects.filter(question=question).values_list('answer', flat=True).distinct()
+        for answer_text in [*(question.available_answers or []), *given]:
+            answers.setdefault(answer_text.strip().lower(), answer_text)
+
+        for answer_text in answers.values():
+            for category_name, weight in legacy_weights(question.question, answer_text).items():
+                # The old rules weighted every category with the name
+                if category_name not in categories:
+                    categories[category_name] = (
+                        list(Category.objects.filter(name=category_name))
+                        or [Category.objects.create(name=category_name)]
+                    )
+                for category in categories[category_name]:
+                    QuestionAnswerWeight.objects.get_or_create(
+                        question=question,
+                        answer=answer_text,
+                        category=category,
+                        defaults={'weight': weight}
+                    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_questionanswerweight'),
+        ('movie', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_answer_weights, migrations.RunPython.noop),
+    ]
@@ -40,6 +40,17 @@ class Question(TimestampedModel):
     available_answers = models.JSONField()
 
 
+class QuestionAnswerWeight(TimestampedModel):
+    """How much picking an answer to a quiz question adds to a film category"""
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='answer_weights')
+    answer = models.CharField(max_length=255)
+    category = models.ForeignKey('movie.Category', on_delete=models.CASCADE)
+    weight = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('question', 'answer', 'category')
+
+
 class Answer(TimestampedModel):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     question = models.ForeignKey(Question, on_delete=models.CASCADE)
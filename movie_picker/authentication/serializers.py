@@ -71,11 +71,16 @@ class QuizAnswersSerializer(serializers.Serializer):
     )
 
     def validate_answers(self, value):
-        """Validate that all question IDs exist"""
-        question_ids = [answer['question_id'] for answer in value]
-        existing_questions = Question.objects.filter(id__in=question_ids).count()
-
-        if existing_questions != len(question_ids):
+        """Validate that all question IDs exist, in one query"""
+        try:
+            question_ids = {int(answer['question_id']) for answer in value}
+        except (KeyError, ValueError):
+            raise serializers.ValidationError("Every answer needs a numeric question_id and an answer.")
+        if any('answer' not in answer for answer in value):
+            raise serializers.ValidationError("Every answer needs a numeric question_id and an answer.")
+
+        existing_questions = set(Question.objects.filter(id__in=question_ids).values_list('id', flat=True))
+        if existing_questions != question_ids:
             raise serializers.ValidationError("One or more question IDs are invalid.")
 
         return value
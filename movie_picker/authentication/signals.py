@@ -0,0 +1,6 @@
+# authentication/signals.py
+from django.dispatch import Signal
+
+# Sent once after a user's quiz answers are written in bulk, which sends no
+# model signals. Receivers get the ``user_id``.
+preferences_changed = Signal()
@@ -14,6 +14,7 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.generics import RetrieveAPIView, ListAPIView, UpdateAPIView
 from django.db import transaction
 from .models import Question, Answer
+from .signals import preferences_changed
 from .serializers import (
     QuestionSerializer, QuizAnswersSerializer, UserProfileSerializer,
     UserStreamingServiceUpdateSerializer
@@ -113,7 +114,7 @@ class QuestionsListView(ListAPIView):
     """
     Get all available quiz questions
     """
-    queryset = Question.objects.all()
+    queryset = Question.objects.order_by('id')
     serializer_class = QuestionSerializer
     permission_classes = [IsAuthenticated]
 
@@ -160,18 +161,25 @@ class QuizAnswersView(APIView):
         answers_data = serializer.validated_data['answers']
         user = request.user
 
-        # Save quiz answers
+        # Later answers to the same question win
+        answers = {
+            int(answer_data['question_id']): answer_data['answer'] for answer_data in answers_data
+        }
+
+        # Upsert every answer in one statement
         with transaction.atomic():
-            for answer_data in answers_data:
-                question_id = answer_data['question_id']
-                answer_text = answer_data['answer']
-
-                # Update or create the answer
-                Answer.objects.update_or_create(
-                    user=user,
-                    question_id=question_id,
-                    defaults={'answer': answer_text}
-                )
+            Answer.objects.bulk_create(
+                [
+                    Answer(user=user, question_id=question_id, answer=answer_text)
+                    for question_id, answer_text in answers.items()
+                ],
+                update_conflicts=True,
+                unique_fields=['user', 'question'],
+                update_fields=['answer', 'modified_at'],
+            )
+
+        # bulk_create sends no model signals, tell the preference caches once
+        preferences_changed.send(sender=Answer, user_id=user.pk)
 
         return Response({
             'message': 'Quiz answers saved successfully'
@@ -2,7 +2,8 @@ from django.contrib import admin
 from .models import (
     Film, Actor, Director, Category, Tag, StreamingService,
     WatchedFilm, FilmTag, FilmStreamingService, FilmCategory,
-    FilmDirector, FilmActor
+    FilmDirector, FilmActor, UserRecommendation, CatalogSyncState,
+    IngestionRun, UserStats, FilmSimilarity
 )
 
 
@@ -93,3 +94,39 @@ class WatchedFilmAdmin(admin.ModelAdmin):
     search_fields = ['user__username', 'user__email', 'film__title']
     ordering = ['-created_at']
     raw_id_fields = ['user', 'film']
+
+
+@admin.register(UserRecommendation)
+class UserRecommendationAdmin(admin.ModelAdmin):
+    list_display = ['user', 'film', 'rank', 'score', 'computed_at']
+    list_filter = ['computed_at']
+    search_fields = ['user__username', 'user__email', 'film__title']
+    ordering = ['user', 'rank']
+    raw_id_fields = ['user', 'film']
+
+
+@admin.register(FilmSimilarity)
+class FilmSimilarityAdmin(admin.ModelAdmin):
+    list_display = ['film', 'neighbor', 'rank', 'score', 'computed_at']
+    search_fields = ['film__title']
+    ordering = ['film', 'rank']
+    raw_id_fields = ['film', 'neighbor']
+
+
+@admin.register(CatalogSyncState)
+class CatalogSyncStateAdmin(admin.ModelAdmin):
+    list_display = ['name', 'synced_through', 'modified_at']
+
+
+@admin.register(IngestionRun)
+class IngestionRunAdmin(admin.ModelAdmin):
+    list_display = ['command', 'status', 'started_at', 'updated_at', 'finished_at']
+    list_filter = ['command', 'status']
+    readonly_fields = ['completed_pages', 'completed_tmdb_ids']
+
+
+@admin.register(UserStats)
+class UserStatsAdmin(admin.ModelAdmin):
+    list_display = ['user', 'watched_count', 'reviewed_count', 'service_count', 'updated_at']
+    search_fields = ['user__username', 'user__email']
+    raw_id_fields = ['user']
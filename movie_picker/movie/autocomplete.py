@@ -0,0 +1,168 @@
+# movie/autocomplete.py
+"""
+In-process prefix index for search box autocomplete.
+
+Film titles and actor/director names are split into words and kept as sorted
+``(key, id)`` arrays, one per kind, so a prefix lookup is a bisect followed by
+a short forward scan. Every word start is indexed, which lets "run" find
+"Blade Runner".
+
+Signals apply single-row changes to this process's index in place and bump
+the shared version (see ``movie/versioning.py``); other processes notice the
+new version and rebuild on their next lookup.
+"""
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+
+from .models import Film, Actor, Director
+from .versioning import get_version, bump_version
+
+FILMS = 'films'
+ACTORS = 'actors'
+DIRECTORS = 'directors'
+
+VERSION_CACHE_KEY = 'movie:autocomplete:version'
+
+DEFAULT_LIMIT = 5
+MAX_LIMIT = 20
+
+
+def invalidate_autocomplete():
+    """Make every process rebuild its index, for writes that bypass signals"""
+    bump_version(VERSION_CACHE_KEY)
+
+
+def normalize(text):
+    """Lowercase ``text`` and strip accents so "Amélie" matches "ame" """
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def index_keys(text):
+    """Keys for every word start: "blade runner" -> ["blade runner", "runner"]"""
+    text = normalize(text)
+    return [text[match.start():].strip() for match in re.finditer(r'\w+', text)]
+
+
+def film_entry(film):
+    return film.id, film.title, {
+        'id': film.id,
+        'title': film.title,
+        'release_year': film.release_date.year if film.release_date else None,
+    }
+
+
+def person_entry(person):
+    name = f"{person.first_name} {person.last_name}".strip()
+    return person.id, name, {'id': person.id, 'name': name}
+
+
+class PrefixIndex:
+    """Sorted array of ``(key, id)`` pairs with the payload returned per id"""
+
+    def __init__(self):
+        self.entries = []
+        self.keys = {}
+        self.payloads = {}
+
+    def load(self, items):
+        """Replace the index with ``(id, text, payload)`` items"""
+        # Built aside and swapped in so lookups never see a half-filled index
+        keys = {}
+        payloads = {}
+        for item_id, text, payload in items:
+            keys[item_id] = index_keys(text)
+            payloads[item_id] = payload
+        entries = sorted((key, item_id) for item_id, item_keys in keys.items() for key in item_keys)
+        self.keys, self.payloads, self.entries = keys, payloads, entries
+
+    def add(self, item_id, text, payload):
+        self.remove(item_id)
+        self.keys[item_id] = index_keys(text)
+        self.payloads[item_id] = payload
+        for key in self.keys[item_id]:
+            insort(self.entries, (key, item_id))
+
+    def remove(self, item_id):
+        for key in self.keys.pop(item_id, ()):
+            position = bisect_left(self.entries, (key, item_id))
+            if position < len(self.entries) and self.entries[position] == (key, item_id):
+                del self.entries[position]
+        self.payloads.pop(item_id, None)
+
+    def search(self, prefix, limit):
+        """Payloads of up to ``limit`` items with a word starting with ``prefix``"""
+        prefix = normalize(prefix).strip()
+        if not prefix:
+            return []
+        entries, payloads = self.entries, self.payloads
+        found = []
+        seen = set()
+        for position in range(bisect_left(entries, (prefix,)), len(entries)):
+            try:
+                key, item_id = entries[position]
+            except IndexError:
+                # Shortened by a concurrent removal
+                break
+            if not key.startswith(prefix):
+                break
+            payload = payloads.get(item_id)
+            if payload is not None and item_id not in seen:
+                seen.add(item_id)
+                found.append(payload)
+                if len(found) == limit:
+                    break
+        return found
+
+
+class AutocompleteIndex:
+    """Prefix indexes of films, actors and directors"""
+
+    def __init__(self):
+        self.version = None
+        self.indexes = {FILMS: PrefixIndex(), ACTORS: PrefixIndex(), DIRECTORS: PrefixIndex()}
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return the index, rebuilding it first if another process changed it"""
+        version = get_version(VERSION_CACHE_KEY)
+        if version != self.version:
+            with self._lock:
+                if version != self.version:
+                    self._build()
+                    self.version = version
+        return self
+
+    def _build(self):
+        self.indexes[FILMS].load(film_entry(film) for film in Film.objects.only('id', 'title', 'release_date'))
+        self.indexes[ACTORS].load(person_entry(actor) for actor in Actor.objects.only('id', 'first_name', 'last_name'))
+        self.indexes[DIRECTORS].load(
+            person_entry(director) for director in Director.objects.only('id', 'first_name', 'last_name')
+        )
+
+    def search(self, prefix, limit=DEFAULT_LIMIT):
+        return {kind: index.search(prefix, limit) for kind, index in self.indexes.items()}
+
+    def apply(self, change):
+        """
+        Apply ``change(indexes)`` here and publish a new version.
+
+        The change is applied in place only if no other write happened since
+        this process last synced; otherwise the next lookup rebuilds.
+        """
+        with self._lock:
+            version = bump_version(VERSION_CACHE_KEY)
+            if self.version is not None and version == self.version + 1:
+                change(self.indexes)
+                self.version = version
+
+    def update(self, kind, entry):
+        self.apply(lambda indexes: indexes[kind].add(*entry))
+
+    def remove(self, kind, item_id):
+        self.apply(lambda indexes: indexes[kind].remove(item_id))
+
+
+autocomplete_index = AutocompleteIndex()
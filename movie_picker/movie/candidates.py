@@ -0,0 +1,93 @@
+# movie/candidates.py
+"""
+Materialized recommendation candidate sets.
+
+Films available on each streaming service and films watched by each user are
+cached as bitsets (Python ints where bit ``n`` stands for film id ``n``). A
+user's candidate pool is the union of their services' bitsets minus their
+watched bitset, so most requests never run the DISTINCT join over
+``FilmStreamingService``. The bitsets are dropped by signals whenever
+availability or watch history changes (see ``movie/signals.py``).
+"""
+from django.core.cache import cache
+
+from .models import FilmStreamingService, WatchedFilm
+
+SERVICE_CACHE_KEY = 'movie:candidates:service:{service_id}'
+WATCHED_CACHE_KEY = 'movie:candidates:watched:{user_id}'
+CANDIDATE_CACHE_TIMEOUT = 60 * 60
+
+
+def to_bitset(ids):
+    """Pack integer ids into a single int bitset"""
+    ids = list(ids)
+    if not ids:
+        return 0
+    packed = bytearray(max(ids) // 8 + 1)
+    for value in ids:
+        packed[value >> 3] |= 1 << (value & 7)
+    return int.from_bytes(packed, 'little')
+
+
+def iter_bitset(bits):
+    """Yield the ids set in a bitset in ascending order"""
+    packed = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    for index, byte in enumerate(packed):
+        while byte:
+            low = byte & -byte
+            yield (index << 3) + low.bit_length() - 1
+            byte ^= low
+
+
+def get_service_bitsets(service_ids):
+    """Return ``{service_id: bitset}``, loading missing services in one query"""
+    keys = {SERVICE_CACHE_KEY.format(service_id=service_id): service_id for service_id in service_ids}
+    cached = cache.get_many(keys)
+    bitsets = {keys[key]: bits for key, bits in cached.items()}
+
+    missing = [service_id for service_id in service_ids if service_id not in bitsets]
+    if missing:
+        film_ids = {service_id: [] for service_id in missing}
+        rows = FilmStreamingService.objects.filter(
+            streaming_service_id__in=missing
+        ).values_list('streaming_service_id', 'film_id')
+        for service_id, film_id in rows:
+            film_ids[service_id].append(film_id)
+
+        loaded = {service_id: to_bitset(ids) for service_id, ids in film_ids.items()}
+        cache.set_many(
+            {SERVICE_CACHE_KEY.format(service_id=service_id): bits for service_id, bits in loaded.items()},
+            CANDIDATE_CACHE_TIMEOUT
+        )
+        bitsets.update(loaded)
+
+    return bitsets
+
+
+def get_watched_bitset(user_id):
+    key = WATCHED_CACHE_KEY.format(user_id=user_id)
+    bits = cache.get(key)
+    if bits is None:
+        bits = to_bitset(WatchedFilm.objects.filter(user_id=user_id).values_list('film_id', flat=True))
+        cache.set(key, bits, CANDIDATE_CACHE_TIMEOUT)
+    return bits
+
+
+def get_candidate_bitset(user_id, service_ids):
+    """Bitset of films available on any of the services and not yet watched by the user"""
+    pool = 0
+    for bits in get_service_bitsets(service_ids).values():
+        pool |= bits
+    return pool & ~get_watched_bitset(user_id)
+
+
+def get_candidate_film_ids(user_id, service_ids):
+    return iter_bitset(get_candidate_bitset(user_id, service_ids))
+
+
+def invalidate_service_candidates(service_ids):
+    cache.delete_many([SERVICE_CACHE_KEY.format(service_id=service_id) for service_id in service_ids])
+
+
+def invalidate_watched_candidates(user_id):
+    cache.delete(WATCHED_CACHE_KEY.format(user_id=user_id))
@@ -0,0 +1,104 @@
+# movie/collaborative.py
+"""
+Item-item collaborative filtering over watched film reviews.
+
+``item_similarities`` turns ``(user, film, review)`` ratings into a sparse
+user x film matrix of mean-centred reviews and computes the adjusted cosine
+similarity of every pair of films reviewed by the same users. Films are
+processed one at a time: for each film, the rows of its reviewers are walked
+to accumulate dot products with every co-reviewed film, and only the best
+``neighbors`` are kept in a bounded heap. Memory stays proportional to the
+ratings plus one film's co-occurrences, and the work grows with the number of
+co-reviewed pairs rather than films squared.
+
+Similarities are damped by ``overlap / (overlap + shrinkage)`` so pairs
+backed by a handful of shared reviewers do not dominate, and only positive
+similarities are kept. The ``compute_film_similarities`` command stores the
+neighbour lists as ``FilmSimilarity`` rows for the recommender to read.
+"""
+import math
+from collections import defaultdict
+
+from .models import FilmSimilarity
+from .ranking import TopK
+
+DEFAULT_NEIGHBORS = 20
+DEFAULT_MIN_OVERLAP = 2
+DEFAULT_SHRINKAGE = 10
+
+
+def centered_ratings(ratings):
+    """
+    Group ``(user_id, film_id, review)`` ratings into per-user rows of
+    ``(film_id, review - user mean)``, dropping entries with no deviation
+    """
+    by_user = defaultdict(list)
+    for user_id, film_id, review in ratings:
+        by_user[user_id].append((film_id, review))
+
+    rows = []
+    for reviews in by_user.values():
+        mean = sum(review for film_id, review in reviews) / len(reviews)
+        row = [(film_id, review - mean) for film_id, review in reviews if review != mean]
+        if len(row) > 1:
+            rows.append(row)
+    return rows
+
+
+def item_similarities(ratings, neighbors=DEFAULT_NEIGHBORS, min_overlap=DEFAULT_MIN_OVERLAP,
+                      shrinkage=DEFAULT_SHRINKAGE):
+    """Yield ``(film_id, [(neighbor_id, similarity), ...])`` with the best neighbours first"""
+    rows = centered_ratings(ratings)
+
+    # Column view of the matrix: film -> [(row index, centred review)]
+    columns = defaultdict(list)
+    for index, row in enumerate(rows):
+        for film_id, value in row:
+            columns[film_id].append((index, value))
+    norms = {
+        film_id: math.sqrt(sum(value * value for index, value in column))
+        for film_id, column in columns.items()
+    }
+
+    for film_id, column in columns.items():
+        dots = defaultdict(float)
+        overlaps = defaultdict(int)
+        for index, value in column:
+            for other_id, other_value in rows[index]:
+                if other_id != film_id:
+                    dots[other_id] += value * other_value
+                    overlaps[other_id] += 1
+
+        top = TopK(neighbors)
+        for other_id, dot in dots.items():
+            overlap = overlaps[other_id]
+            if dot <= 0 or overlap < min_overlap:
+                continue
+            similarity = dot / (norms[film_id] * norms[other_id]) * overlap / (overlap + shrinkage)
+            top.push(other_id, similarity)
+        ranked = top.items()
+        if ranked:
+            yield film_id, ranked
+
+
+def collaborative_scores(reviews, average_review):
+    """
+    Predicted review deviation of films similar to the ones a user reviewed.
+
+    ``reviews`` maps the user's reviewed film ids to their review. Each stored
+    neighbour of a reviewed film gets the similarity-weighted deviation of that
+    review from the user's average; the weights are normalised with a floor of
+    1 so films backed only by weak similarities stay close to 0.
+    """
+    if not reviews:
+        return {}
+
+    weighted = defaultdict(float)
+    totals = defaultdict(float)
+    neighbors = FilmSimilarity.objects.filter(film_id__in=reviews).values_list('film_id', 'neighbor_id', 'score')
+    for film_id, neighbor_id, score in neighbors:
+        if neighbor_id in reviews:
+            continue
+        weighted[neighbor_id] += score * (reviews[film_id] - average_review)
+        totals[neighbor_id] += score
+    return {film_id: weighted[film_id] / max(totals[film_id], 1.0) for film_id in weighted}
@@ -0,0 +1,344 @@
+# movie/embeddings.py
+"""
+Dense film embeddings with an approximate nearest neighbour index.
+
+Each film is described by sparse tokens for its categories, tags, cast,
+directors, language and release decade, weighted with TF-IDF so rare tokens
+count more than ubiquitous ones. The sparse vectors are folded into
+``dim`` dense dimensions with a fixed signed random projection (every token
+adds its weight to a few hashed dimensions), which keeps cosine similarities
+approximately intact, and normalised to unit length.
+
+The vectors are grouped with spherical k-means into an IVF (inverted file)
+index: a query is compared with the cluster centroids first and then only
+with the films of the ``nprobe`` closest clusters.
+
+``build_film_embeddings`` writes everything to one binary file
+(``FILM_EMBEDDINGS_PATH``) laid out so that each section can be used in place
+from a read-only memory map::
+
+    header  magic, dim, count, clusters    '<4sIII'
+    ids     film id of each row            count x int64
+    offsets first row of each cluster      (clusters + 1) x int64
+    centroids                              clusters x dim x float32
+    vectors rows sorted by cluster         count x dim x float32
+
+Processes map the file lazily and reopen it when the command bumps the
+shared version (see ``movie/versioning.py``) or the file itself is replaced. Each reload builds a new
+read-only ``FilmEmbeddingIndex`` and swaps it in with one assignment, so
+searches running meanwhile keep using the index they started with.
+"""
+import heapq
+import math
+import os
+import random
+import struct
+import tempfile
+import threading
+import zlib
+from array import array
+from collections import defaultdict
+from mmap import mmap, ACCESS_READ
+from operator import mul
+
+from django.conf import settings
+
+from .models import Film, FilmCategory, FilmTag, FilmActor, FilmDirector
+from .ranking import TopK
+from .versioning import get_version, bump_version
+
+VERSION_CACHE_KEY = 'movie:film_embeddings:version'
+
+MAGIC = b'FEMB'
+HEADER = struct.Struct('<4sIII')
+
+DEFAULT_DIM = 64
+DEFAULT_ITERATIONS = 10
+DEFAULT_NPROBE = 8
+# Similar films returned by the API by default and at most
+SIMILAR_DEFAULT_LIMIT = 10
+SIMILAR_MAX_LIMIT = 50
+# Dimensions each token is added to
+PROJECTIONS_PER_TOKEN = 4
+# Films per cluster used to train the centroids
+TRAINING_SAMPLES_PER_CLUSTER = 40
+
+# Relative weight of each kind of token on top of its IDF
+TOKEN_WEIGHTS = {
+    'category': 1.0,
+    'tag': 1.0,
+    'director': 1.0,
+    'actor': 0.6,
+    'language': 0.5,
+    'decade': 0.5,
+}
+
+
+def invalidate_film_embeddings():
+    # Imported here because the recommender imports this module for its candidates
+    from .recommender import invalidate_recommendations
+
+    bump_version(VERSION_CACHE_KEY)
+    # Recommendation pools drawn from the previous index are stale
+    invalidate_recommendations()
+
+
+def dot(first, second):
+    return sum(map(mul, first, second))
+
+
+def normalize(vector):
+    norm = math.sqrt(dot(vector, vector))
+    return [value / norm for value in vector] if norm else vector
+
+
+def film_tokens():
+    """``{film_id: [(kind, value), ...]}`` for every film in the catalog"""
+    tokens = {}
+    for film_id, language, release_date in Film.objects.values_list('id', 'language', 'release_date'):
+        tokens[film_id] = [('language', (language or '').lower())]
+        if release_date:
+            tokens[film_id].append(('decade', release_date.year // 10 * 10))
+
+    for kind, through, column in (
+        ('category', FilmCategory, 'category_id'),
+        ('tag', FilmTag, 'tag_id'),
+        ('actor', FilmActor, 'actor_id'),
+        ('director', FilmDirector, 'director_id'),
+    ):
+        for film_id, value in through.objects.values_list('film_id', column).iterator(chunk_size=10000):
+            if film_id in tokens:
+                tokens[film_id].append((kind, value))
+    return tokens
+
+
+def token_projection(token, dim):
+    """The hashed ``(dimension, sign)`` pairs a token is added to"""
+    projection = []
+    for probe in range(PROJECTIONS_PER_TOKEN):
+        hashed = zlib.crc32(f'{token[0]}:{token[1]}:{probe}'.encode())
+        projection.append((hashed % dim, 1.0 if hashed & 0x80000000 else -1.0))
+    return projection
+
+
+def embed(tokens, dim=DEFAULT_DIM):
+    """TF-IDF weight and project the tokens of every film, returning ``{film_id: unit vector}``"""
+    document_frequency = defaultdict(int)
+    for document in tokens.values():
+        for token in set(document):
+            document_frequency[token] += 1
+
+    total = len(tokens)
+    projections = {}
+    vectors = {}
+    for film_id, document in tokens.items():
+        vector = [0.0] * dim
+        for token in set(document):
+            weight = TOKEN_WEIGHTS[token[0]] * (math.log((1 + total) / (1 + document_frequency[token])) + 1)
+            if token not in projections:
+                projections[token] = token_projection(token, dim)
+            for dimension, sign in projections[token]:
+                vector[dimension] += sign * weight
+        vectors[film_id] = normalize(vector)
+    return vectors
+
+
+def nearest_centroid(vector, centroids):
+    return max(range(len(centroids)), key=lambda index: dot(vector, centroids[index]))
+
+
+def train_centroids(vectors, clusters, iterations=DEFAULT_ITERATIONS, seed=0):
+    """Spherical k-means over a deterministic sample of ``vectors``"""
+    generator = random.Random(seed)
+    sample = vectors
+    if len(vectors) > clusters * TRAINING_SAMPLES_PER_CLUSTER:
+        sample = generator.sample(vectors, clusters * TRAINING_SAMPLES_PER_CLUSTER)
+    centroids = [list(vector) for vector in generator.sample(sample, clusters)]
+
+    for iteration in range(iterations):
+        sums = [[0.0] * len(centroids[0]) for centroid in centroids]
+        for vector in sample:
+            total = sums[nearest_centroid(vector, centroids)]
+            for dimension, value in enumerate(vector):
+                total[dimension] += value
+        # Clusters left empty keep their previous centroid
+        centroids = [
+            normalize(total) if any(total) else centroid for total, centroid in zip(sums, centroids)
+        ]
+    return centroids
+
+
+def build_index(vectors, clusters=None, iterations=DEFAULT_ITERATIONS):
+    """
+    Cluster ``{film_id: vector}`` and return ``(ids, offsets, centroids, rows)``
+    with the rows sorted by cluster
+    """
+    film_ids = sorted(vectors)
+    if not film_ids:
+        return [], [0], [], []
+    if clusters is None:
+        clusters = round(math.sqrt(len(film_ids)))
+    clusters = max(1, min(clusters, len(film_ids)))
+
+    ordered = [vectors[film_id] for film_id in film_ids]
+    centroids = train_centroids(ordered, clusters, iterations)
+    members = defaultdict(list)
+    for film_id, vector in zip(film_ids, ordered):
+        members[nearest_centroid(vector, centroids)].append(film_id)
+
+    ids, offsets = [], [0]
+    for cluster in range(clusters):
+        ids += members[cluster]
+        offsets.append(len(ids))
+    return ids, offsets, centroids, [vectors[film_id] for film_id in ids]
+
+
+def write_index(path, ids, offsets, centroids, rows, dim):
+    """Write the index file next to ``path`` and move it in place atomically"""
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix='.film_embeddings')
+    try:
+        with os.fdopen(descriptor, 'wb') as output:
+            output.write(HEADER.pack(MAGIC, dim, len(ids), len(centroids)))
+            output.write(array('q', ids).tobytes())
+            output.write(array('q', offsets).tobytes())
+            for centroid in centroids:
+                output.write(array('f', centroid).tobytes())
+            for row in rows:
+                output.write(array('f', row).tobytes())
+        # mkstemp creates the file readable by its owner only
+        os.chmod(temporary_path, 0o644)
+        # Processes still mapping the old file keep reading it until they reload
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+def build_film_embeddings(path, dim=DEFAULT_DIM, clusters=None, iterations=DEFAULT_ITERATIONS):
+    """Embed the whole catalog into the index file at ``path``, returning the number of films and clusters"""
+    vectors = embed(film_tokens(), dim)
+    ids, offsets, centroids, rows = build_index(vectors, clusters, iterations)
+    write_index(path, ids, offsets, centroids, rows, dim)
+    invalidate_film_embeddings()
+    return len(ids), len(centroids)
+
+
+class FilmEmbeddingIndex:
+    """Read-only view of one index file, searched with IVF probing"""
+
+    def __init__(self, dim=0, ids=(), offsets=(0,), centroids=(), vectors=None):
+        self.dim = dim
+        self.ids = tuple(ids)
+        self.rows = {film_id: row for row, film_id in enumerate(self.ids)}
+        self.offsets = tuple(offsets)
+        self.centroids = tuple(centroids)
+        self.vectors = vectors
+
+    @classmethod
+    def load(cls, path):
+        """Map the index file at ``path``, empty if it was not built yet"""
+        try:
+            with open(path, 'rb') as source:
+                # The mapping stays valid after the file is closed or replaced
+                mapped = mmap(source.fileno(), 0, access=ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            # Missing or empty file: no embeddings built yet
+            return cls()
+
+        view = memoryview(mapped)
+        magic, dim, count, clusters = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a film embeddings file")
+        position = HEADER.size
+        ids = view[position:position + 8 * count].cast('q')
+        position += 8 * count
+        offsets = view[position:position + 8 * (clusters + 1)].cast('q')
+        position += 8 * (clusters + 1)
+        centroids = view[position:position + 4 * clusters * dim].cast('f')
+        position += 4 * clusters * dim
+
+        return cls(
+            dim=dim,
+            ids=ids.tolist(),
+            offsets=offsets.tolist(),
+            centroids=[tuple(centroids[index * dim:(index + 1) * dim].tolist()) for index in range(clusters)],
+            vectors=view[position:position + 4 * count * dim].cast('f'),
+        )
+
+    def __contains__(self, film_id):
+        return film_id in self.rows
+
+    def vector(self, film_id):
+        row = self.rows[film_id]
+        return self.vectors[row * self.dim:(row + 1) * self.dim]
+
+    def search(self, vector, k, nprobe=DEFAULT_NPROBE, exclude=()):
+        """Best ``k`` ``(film_id, cosine similarity)`` pairs among the ``nprobe`` closest clusters"""
+        if not self.centroids or k <= 0:
+            return []
+        closest = heapq.nlargest(
+            nprobe, range(len(self.centroids)), key=lambda index: dot(vector, self.centroids[index])
+        )
+        top = TopK(k)
+        dim = self.dim
+        for cluster in closest:
+            for row in range(self.offsets[cluster], self.offsets[cluster + 1]):
+                film_id = self.ids[row]
+                if film_id not in exclude:
+                    top.push(film_id, dot(vector, self.vectors[row * dim:(row + 1) * dim]))
+        return top.items()
+
+    def similar(self, film_id, k, nprobe=DEFAULT_NPROBE):
+        """Films most similar to ``film_id``, empty if the film was added after the last build"""
+        if film_id not in self.rows:
+            return []
+        return self.search(self.vector(film_id), k, nprobe, exclude={film_id})
+
+    def similar_to_any(self, film_ids, k, nprobe=DEFAULT_NPROBE):
+        """
+        Films close to any of ``film_ids``, ordered by their best similarity to
+        one of them, excluding ``film_ids`` themselves
+        """
+        exclude = set(film_ids)
+        best = {}
+        for film_id in film_ids:
+            if film_id not in self.rows:
+                continue
+            for neighbor_id, score in self.search(self.vector(film_id), k, nprobe, exclude):
+                if score > best.get(neighbor_id, float('-inf')):
+                    best[neighbor_id] = score
+        return sorted(best, key=lambda neighbor_id: (-best[neighbor_id], neighbor_id))
+
+
+def file_stamp(path):
+    """Identity of the index file; write_index replaces it, so a rebuild changes it"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class FilmEmbeddings:
+    """Process-wide holder of the current ``FilmEmbeddingIndex``"""
+
+    def __init__(self):
+        self.stamp = None
+        self.index = FilmEmbeddingIndex()
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return the current index, reopening the file first if it was rebuilt"""
+        path = settings.FILM_EMBEDDINGS_PATH
+        stamp = (get_version(VERSION_CACHE_KEY), path, file_stamp(path))
+        if stamp != self.stamp:
+            with self._lock:
+                if stamp != self.stamp:
+                    # Swapped in whole before the stamp, never filled in place
+                    self.index = FilmEmbeddingIndex.load(settings.FILM_EMBEDDINGS_PATH)
+                    self.stamp = stamp
+        return self.index
+
+
+film_embeddings = FilmEmbeddings()
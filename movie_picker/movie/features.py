@@ -0,0 +1,134 @@
+# movie/features.py
+"""
+In-process film feature store used by the recommendation engine.
+
+Every film is stored as a sparse row of ``(kind, id)`` feature keys for its
+categories, actors and directors, so scoring a film against a user becomes a
+sparse dot product with the user's preference vector instead of comparing
+name strings. An inverted index from feature key to film ids lets that product
+be accumulated only over the films sharing a feature with the vector, and films
+are pre-grouped by release era so time period bonuses need no per-film check.
+The store is rebuilt lazily whenever the catalog version changes (see
+``movie/versioning.py``).
+"""
+import threading
+from collections import defaultdict
+
+from .models import Film, FilmCategory, FilmActor, FilmDirector
+from .versioning import get_version, bump_version
+
+CATEGORY = 'category'
+ACTOR = 'actor'
+DIRECTOR = 'director'
+
+VERSION_CACHE_KEY = 'movie:film_features:version'
+
+# Films released this year or later count as new releases
+NEW_RELEASE_YEAR = 2020
+
+
+def get_catalog_version():
+    return get_version(VERSION_CACHE_KEY)
+
+
+def invalidate_film_features():
+    """Bump the catalog version so every process rebuilds its feature store"""
+    bump_version(VERSION_CACHE_KEY)
+
+
+def release_era(release_year):
+    """Quiz era ("classic", "retro", "modern" or "recent") a release year falls in"""
+    if not release_year:
+        return None
+    if release_year < 1980:
+        return 'classic'
+    if release_year < 2000:
+        return 'retro'
+    if release_year < 2015:
+        return 'modern'
+    return 'recent'
+
+
+class FilmFeatureStore:
+    """Sparse film x category/actor/director matrix keyed by ids"""
+
+    def __init__(self):
+        self.version = None
+        self.rows = {}
+        self.release_years = {}
+        self.postings = {}
+        self.era_films = {}
+        self.new_releases = frozenset()
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return the store, rebuilding it first if the catalog changed"""
+        version = get_catalog_version()
+        if version != self.version:
+            with self._lock:
+                if version != self.version:
+                    self._build()
+                    self.version = version
+        return self
+
+    def _build(self):
+        features = {}
+        release_years = {}
+
+        for film_id, release_date in Film.objects.values_list('id', 'release_date'):
+            features[film_id] = []
+            release_years[film_id] = release_date.year if release_date else None
+
+        for kind, through, column in (
+            (CATEGORY, FilmCategory, 'category_id'),
+            (ACTOR, FilmActor, 'actor_id'),
+            (DIRECTOR, FilmDirector, 'director_id'),
+        ):
+            for film_id, feature_id in through.objects.values_list('film_id', column):
+                if film_id in features:
+                    features[film_id].append((kind, feature_id))
+
+        postings = defaultdict(list)
+        for film_id, row in features.items():
+            for key in row:
+                postings[key].append(film_id)
+
+        era_films = defaultdict(set)
+        for film_id, release_year in release_years.items():
+            era = release_era(release_year)
+            if era:
+                era_films[era].add(film_id)
+
+        self.rows = {film_id: tuple(row) for film_id, row in features.items()}
+        self.release_years = release_years
+        self.postings = {key: tuple(film_ids) for key, film_ids in postings.items()}
+        self.era_films = {era: frozenset(film_ids) for era, film_ids in era_films.items()}
+        self.new_releases = frozenset(
+            film_id for film_id, release_year in release_years.items()
+            if release_year and release_year >= NEW_RELEASE_YEAR
+        )
+
+    def row(self, film_id):
+        return self.rows.get(film_id, ())
+
+    def release_year(self, film_id):
+        return self.release_years.get(film_id)
+
+    def score(self, film_id, vector):
+        """Dot product of a film row with a sparse preference vector"""
+        return sum(vector.get(key, 0) for key in self.rows.get(film_id, ()))
+
+    def feature_scores(self, vector):
+        """
+        ``score`` of every film sharing a non-zero feature with ``vector``, as a
+        ``{film_id: score}`` dict; every film missing from it scores 0
+        """
+        scores = defaultdict(int)
+        for key, weight in vector.items():
+            if weight:
+                for film_id in self.postings.get(key, ()):
+                    scores[film_id] += weight
+        return scores
+
+
+film_features = FilmFeatureStore()
@@ -0,0 +1,297 @@
+# movie/ingestion.py
+"""
+Bulk persistence stage for TMDb ingestion.
+
+``BulkCatalogWriter`` preloads the keys of existing films, people, categories
+and streaming services into dicts, accumulates fetched movies and writes each
+batch with ``bulk_create`` in one transaction: one insert per table plus one
+query per table to read back new ids, instead of a ``get_or_create`` per row.
+
+``bulk_create`` sends no model signals, so after each batch the writer does
+what the receivers in ``movie/signals.py`` would have done: refresh relation
+counts and search documents, and invalidate the in-process caches.
+
+The ``sync_*`` functions bring a stored film in line with fresh TMDb data for
+incremental syncs. They only write what differs, through the model and
+related managers, so the usual signals keep every derived structure current.
+"""
+from django.db import transaction
+
+from .autocomplete import invalidate_autocomplete
+from .candidates import invalidate_service_candidates
+from .features import invalidate_film_features
+from .models import (
+    Film, Actor, Director, Category, StreamingService,
+    FilmActor, FilmDirector, FilmCategory, FilmStreamingService
+)
+from .recommender import invalidate_recommendations
+from .search import refresh_search_documents
+from .tmdb import film_fields, cast_names, director_names, genre_names, region_providers
+
+DEFAULT_BATCH_SIZE = 100
+
+# Film fields kept in sync with TMDb details
+SYNCED_FIELDS = ('title', 'overview', 'poster_url', 'release_date', 'language')
+
+
+class BulkCatalogWriter:
+    """Accumulate fetched movies and write them in batches"""
+
+    def __init__(self, image_base_url, batch_size=DEFAULT_BATCH_SIZE):
+        self.image_base_url = image_base_url
+        self.batch_size = batch_size
+        self.batch = []
+        self.failed_batch = []
+
+        self.film_tmdb_ids = set(Film.objects.exclude(tmdb_id=None).values_list('tmdb_id', flat=True))
+        self.film_titles = set(Film.objects.values_list('title', flat=True))
+        self.actors = self._people(Actor)
+        self.directors = self._people(Director)
+        self.categories = {name: pk for pk, name in Category.objects.values_list('id', 'name')}
+        self.services = dict(
+            StreamingService.objects.exclude(tmdb_provider_id=None).values_list('tmdb_provider_id', 'id')
+        )
+
+    def _people(self, model):
+        people = {}
+        for pk, first_name, last_name in model.objects.values_list('id', 'first_name', 'last_name').order_by('id'):
+            people.setdefault((first_name, last_name), pk)
+        return people
+
+    @property
+    def is_full(self):
+        return len(self.batch) >= self.batch_size
+
+    def add(self, movie_data, details=None, providers=None):
+        """Queue a fetched movie, returning False if it is already stored or queued"""
+        if movie_data['id'] in self.film_tmdb_ids or movie_data['title'] in self.film_titles:
+            return False
+
+        self.film_tmdb_ids.add(movie_data['id'])
+        self.film_titles.add(movie_data['title'])
+        self.batch.append({
+            'source': (movie_data, details, providers),
+            'film': film_fields(movie_data, self.image_base_url),
+            'cast': cast_names(details) if details else [],
+            'directors': director_names(details) if details else [],
+            'categories': genre_names(movie_data),
+            'providers': region_providers(providers, 'US') if providers else [],
+        })
+        return True
+
+    def flush(self):
+        """
+        Write the queued movies in one transaction and return their source data.
+
+        If the batch fails nothing is kept, the error is re-raised and the
+        failed movies are available as ``failed_batch`` for a slower retry.
+        """
+        batch, self.batch = self.batch, []
+        self.failed_batch = []
+        if not batch:
+            return []
+
+        try:
+            with transaction.atomic():
+                film_ids, service_ids, new_keys = self._write(batch)
+        except Exception:
+            for record in batch:
+                self.film_tmdb_ids.discard(record['film']['tmdb_id'])
+                self.film_titles.discard(record['film']['title'])
+            self.failed_batch = [record['source'] for record in batch]
+            raise
+
+        # Only remember new keys once they are committed
+        for known, keys in zip((self.actors, self.directors, self.categories, self.services), new_keys):
+            known.update(keys)
+
+        invalidate_film_features()
+        invalidate_recommendations()
+        invalidate_autocomplete()
+        invalidate_service_candidates(service_ids)
+        return [record['source'] for record in batch]
+
+    def _write(self, batch):
+        Film.objects.bulk_create([Film(**record['film']) for record in batch])
+        film_ids = dict(
+            Film.objects.filter(tmdb_id__in=[record['film']['tmdb_id'] for record in batch])
+            .values_list('tmdb_id', 'id')
+        )
+
+        actors = self._create_people(Actor, self.actors, {name for record in batch for name in record['cast']})
+        directors = self._create_people(
+            Director, self.directors, {name for record in batch for name in record['directors']}
+        )
+        categories = self._create_categories({name for record in batch for name in record['categories']})
+        services = self._create_services(
+            {provider['provider_id']: provider for record in batch for provider in record['providers']}
+        )
+
+        film_actors, film_directors, film_categories, film_services = [], [], [], []
+        for record in batch:
+            film_id = film_ids[record['film']['tmdb_id']]
+            film_actors += [FilmActor(film_id=film_id, actor_id=actors[name]) for name in record['cast']]
+            film_directors += [
+                FilmDirector(film_id=film_id, director_id=directors[name]) for name in record['directors']
+            ]
+            film_categories += [
+                FilmCategory(film_id=film_id, category_id=categories[name]) for name in record['categories']
+            ]
+            film_services += [
+                FilmStreamingService(film_id=film_id, streaming_service_id=services[provider['provider_id']])
+                for provider in record['providers']
+            ]
+
+        FilmActor.objects.bulk_create(film_actors, ignore_conflicts=True)
+        FilmDirector.objects.bulk_create(film_directors, ignore_conflicts=True)
+        FilmCategory.objects.bulk_create(film_categories, ignore_conflicts=True)
+        FilmStreamingService.objects.bulk_create(film_services, ignore_conflicts=True)
+
+        Film.objects.filter(id__in=film_ids.values()).refresh_counts()
+        refresh_search_documents(film_ids.values())
+
+        service_ids = {link.streaming_service_id for link in film_services}
+        return film_ids.values(), service_ids, (actors, directors, categories, services)
+
+    def _create_people(self, model, known, names):
+        """Map every (first name, last name) to an id, inserting missing people"""
+        ids = {name: known[name] for name in names if name in known}
+        missing = names - ids.keys()
+        if missing:
+            model.objects.bulk_create(
+                [model(first_name=first_name, last_name=last_name) for first_name, last_name in missing],
+                ignore_conflicts=True
+            )
+            rows = model.objects.filter(
+                first_name__in={first_name for first_name, last_name in missing},
+                last_name__in={last_name for first_name, last_name in missing},
+            ).values_list('id', 'first_name', 'last_name').order_by('id')
+            for pk, first_name, last_name in rows:
+                if (first_name, last_name) in missing:
+                    ids.setdefault((first_name, last_name), pk)
+        return ids
+
+    def _create_categories(self, names):
+        ids = {name: self.categories[name] for name in names if name in self.categories}
+        missing = names - ids.keys()
+        if missing:
+            Category.objects.bulk_create([Category(name=name) for name in missing], ignore_conflicts=True)
+            for pk, name in Category.objects.filter(name__in=missing).values_list('id', 'name').order_by('id'):
+                ids.setdefault(name, pk)
+        return ids
+
+    def _create_services(self, providers):
+        """Map every TMDb provider id to a streaming service id, inserting missing services"""
+        ids = {provider_id: self.services[provider_id] for provider_id in providers if provider_id in self.services}
+        missing = [provider for provider_id, provider in providers.items() if provider_id not in ids]
+        if missing:
+            StreamingService.objects.bulk_create(
+                [
+                    StreamingService(
+                        name=provider['provider_name'],
+                        tmdb_provider_id=provider['provider_id'],
+                        logo_path=f"{self.image_base_url}{provider['logo_path']}" if provider.get('logo_path') else None
+                    )
+                    for provider in missing
+                ],
+                ignore_conflicts=True
+            )
+            ids.update(
+                StreamingService.objects.filter(tmdb_provider_id__in=[provider['provider_id'] for provider in missing])
+                .values_list('tmdb_provider_id', 'id')
+            )
+        return ids
+
+
+def sync_film_fields(film, details, image_base_url):
+    """Copy changed TMDb fields onto ``film``, returning the names of the fields updated"""
+    fields = film_fields(details, image_base_url)
+    if not details.get('release_date'):
+        # film_fields falls back to today, never overwrite a known date with that
+        del fields['release_date']
+
+    changed = [name for name in SYNCED_FIELDS if name in fields and getattr(film, name) != fields[name]]
+    if changed:
+        for name in changed:
+            setattr(film, name, fields[name])
+        film.save(update_fields=changed + ['modified_at'])
+    return changed
+
+
+def sync_film_people(film, relation, model, names):
+    """Make ``film.<relation>`` hold exactly the people named, returning whether it changed"""
+    manager = getattr(film, relation)
+    current = {(person.first_name, person.last_name): person.pk for person in manager.all()}
+    wanted = set(names)
+
+    removed = [pk for name, pk in current.items() if name not in wanted]
+    added = []
+    for first_name, last_name in wanted - current.keys():
+        person = model.objects.filter(first_name=first_name, last_name=last_name).order_by('id').first()
+        if person is None:
+            person = model.objects.create(first_name=first_name, last_name=last_name)
+        added.append(person.pk)
+
+    if removed:
+        manager.remove(*removed)
+    if added:
+        manager.add(*added)
+    return bool(removed or added)
+
+
+def sync_film_categories(film, names):
+    current = {category.name: category.pk for category in film.categories.all()}
+    wanted = set(names)
+
+    removed = [pk for name, pk in current.items() if name not in wanted]
+    added = [Category.objects.get_or_create(name=name)[0].pk for name in wanted - current.keys()]
+
+    if removed:
+        film.categories.remove(*removed)
+    if added:
+        film.categories.add(*added)
+    return bool(removed or added)
+
+
+def sync_film_providers(film, providers, image_base_url):
+    """Make the film's streaming services match a watch providers response"""
+    offered = {provider['provider_id']: provider for provider in region_providers(providers, 'US')}
+    current = dict(film.streaming_services.exclude(tmdb_provider_id=None).values_list('tmdb_provider_id', 'id'))
+
+    removed = [pk for provider_id, pk in current.items() if provider_id not in offered]
+    added = []
+    for provider_id in offered.keys() - current.keys():
+        provider = offered[provider_id]
+        service, created = StreamingService.objects.get_or_create(
+            tmdb_provider_id=provider_id,
+            defaults={
+                'name': provider['provider_name'],
+                'logo_path': f"{image_base_url}{provider['logo_path']}" if provider.get('logo_path') else None,
+            }
+        )
+        added.append(service.pk)
+
+    if removed:
+        film.streaming_services.remove(*removed)
+    if added:
+        film.streaming_services.add(*added)
+    return bool(removed or added)
+
+
+def sync_film(film, details, providers, image_base_url):
+    """Apply fresh TMDb details and providers to a stored film, returning the parts that changed"""
+    changed = sync_film_fields(film, details, image_base_url)
+    # Leave relations alone when the response does not include them
+    if 'credits' in details:
+        if sync_film_people(film, 'actors', Actor, cast_names(details)):
+            changed.append('actors')
+        if sync_film_people(film, 'directors', Director, director_names(details)):
+            changed.append('directors')
+    if 'genres' in details:
+        # Details list genres as objects rather than the genre_ids of list entries
+        genre_ids = [genre['id'] for genre in details['genres']]
+        if sync_film_categories(film, genre_names({'genre_ids': genre_ids})):
+            changed.append('categories')
+    if providers is not None and sync_film_providers(film, providers, image_base_url):
+        changed.append('streaming_services')
+    return changed
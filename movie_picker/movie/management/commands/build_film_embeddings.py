@@ -0,0 +1,48 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from movie.embeddings import build_film_embeddings, DEFAULT_DIM, DEFAULT_ITERATIONS
+
+
+class Command(BaseCommand):
+    help = "Embed every film and write the approximate nearest neighbour index used for similar films"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=None,
+            help='Index file to write (default: FILM_EMBEDDINGS_PATH)'
+        )
+        parser.add_argument(
+            '--dim',
+            type=int,
+            default=DEFAULT_DIM,
+            help=f'Dimensions of the film vectors (default: {DEFAULT_DIM})'
+        )
+        parser.add_argument(
+            '--clusters',
+            type=int,
+            default=None,
+            help='Number of IVF clusters (default: square root of the number of films)'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=DEFAULT_ITERATIONS,
+            help=f'k-means iterations used to train the clusters (default: {DEFAULT_ITERATIONS})'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path'] or settings.FILM_EMBEDDINGS_PATH
+        started = time.perf_counter()
+        self.stdout.write(f"Building film embeddings into {path}...")
+
+        films, clusters = build_film_embeddings(
+            path, dim=options['dim'], clusters=options['clusters'], iterations=options['iterations']
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Embedded {films} films in {clusters} clusters in {time.perf_counter() - started:.1f}s"
+        ))
@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from movie.collaborative import item_similarities, DEFAULT_NEIGHBORS, DEFAULT_MIN_OVERLAP, DEFAULT_SHRINKAGE
+from movie.models import FilmSimilarity, WatchedFilm
+from movie.recommender import invalidate_recommendations
+
+
+class Command(BaseCommand):
+    help = "Compute item-item collaborative filtering neighbours of every film from watched film reviews"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--neighbors',
+            type=int,
+            default=DEFAULT_NEIGHBORS,
+            help=f'Neighbours stored per film (default: {DEFAULT_NEIGHBORS})'
+        )
+        parser.add_argument(
+            '--min-overlap',
+            type=int,
+            default=DEFAULT_MIN_OVERLAP,
+            help=f'Users who must have reviewed both films of a pair (default: {DEFAULT_MIN_OVERLAP})'
+        )
+        parser.add_argument(
+            '--shrinkage',
+            type=float,
+            default=DEFAULT_SHRINKAGE,
+            help=f'Damping of similarities backed by few co-reviews (default: {DEFAULT_SHRINKAGE})'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        ratings = list(
+            WatchedFilm.objects.filter(review__isnull=False).values_list('user_id', 'film_id', 'review')
+            .iterator(chunk_size=10000)
+        )
+        self.stdout.write(f"Computing film similarities from {len(ratings)} reviews...")
+
+        computed_at = timezone.now()
+        similarities = [
+            FilmSimilarity(film_id=film_id, neighbor_id=neighbor_id, rank=rank, score=score, computed_at=computed_at)
+            for film_id, neighbors in item_similarities(
+                ratings, options['neighbors'], options['min_overlap'], options['shrinkage']
+            )
+            for rank, (neighbor_id, score) in enumerate(neighbors, start=1)
+        ]
+
+        with transaction.atomic():
+            FilmSimilarity.objects.all().delete()
+            FilmSimilarity.objects.bulk_create(similarities, batch_size=1000)
+        invalidate_recommendations()
+
+        films = len({similarity.film_id for similarity in similarities})
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {len(similarities)} neighbours for {films} films in {time.perf_counter() - started:.1f}s"
+        ))
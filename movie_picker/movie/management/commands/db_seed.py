@@ -1,21 +1,41 @@
+import logging
 import os
+import queue
+import threading
 import requests
-from datetime import datetime
-from django.core.management.base import BaseCommand
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from dotenv import load_dotenv
 
 from movie.models import (
     Film, Actor, Director, Category,
-    FilmActor, FilmDirector, FilmCategory, StreamingService, FilmStreamingService
+    FilmActor, FilmDirector, FilmCategory, StreamingService, FilmStreamingService, IngestionRun
 )
-from authentication.models import Question
+from movie.ingestion import BulkCatalogWriter, DEFAULT_BATCH_SIZE
+from movie.metrics import IngestionMetrics
+from movie.tmdb_cache import ResponseCache, DEFAULT_TTL
+from movie.tmdb import (
+    TMDbClient, DEFAULT_RATE_LIMIT, film_fields, cast_names, director_names, genre_names, region_providers
+)
+from authentication.models import Question, QuestionAnswerWeight
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Kinds of results passed from fetch workers to the writing thread
+PAGE = 'page'
+MOVIE = 'movie'
+ERROR = 'error'
+
+# Seconds a worker waits on the full results queue before checking whether the run stopped
+RESULT_PUT_TIMEOUT = 0.5
+
 
 class Command(BaseCommand):
     help = "Seed database with movies from TMBD API"
+    verbosity = 1
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -44,18 +64,76 @@ class Command(BaseCommand):
             action='store_true',
             help='Fetch streaming providers from TMDb'
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Number of threads fetching from TMDb, database writes stay on one thread (default: 8)'
+        )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Write movies in batches with bulk inserts instead of one transaction per movie'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Movies per bulk write transaction (default: {DEFAULT_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--http-cache',
+            default=os.getenv('TMDB_CACHE_PATH', ''),
+            help='SQLite file caching TMDb responses (default: $TMDB_CACHE_PATH, empty disables the cache)'
+        )
+        parser.add_argument(
+            '--cache-ttl',
+            type=int,
+            default=DEFAULT_TTL,
+            help=f'Seconds cached responses are used before being revalidated (default: {DEFAULT_TTL})'
+        )
+        parser.add_argument(
+            '--offline',
+            action='store_true',
+            help='Replay TMDb responses from --http-cache without network access'
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue the last unfinished run with the same movie lists and pages, skipping completed pages'
+        )
+        parser.add_argument(
+            '--metrics-json',
+            help='Write counters and per-stage timings of the run to this JSON file'
+        )
 
     def __init__(self):
         super().__init__()
         self.api_key = os.getenv('API_KEY_TMDB')
         self.base_url = os.getenv('TMDB_BASE_URL', 'https://api.themoviedb.org/3')
         self.image_base_url = os.getenv('TMDB_IMAGE_BASE_URL', 'https://image.tmdb.org/t/p/w500')
+        self.rate_limit = float(os.getenv('TMDB_RATE_LIMIT', DEFAULT_RATE_LIMIT))
 
         if not self.api_key:
             raise ValueError("API_KEY_TMDB environment variable is required")
 
     def handle(self, *args, **options):
         pages = options['pages']
+        self.verbosity = options['verbosity']
+        self.metrics = IngestionMetrics()
+        self.workers = max(options['workers'], 1)
+        # Only commands that fetch from TMDb open the client and its response cache
+        fetches_movies = options['popular'] or options['top_rated'] or not (
+            options['questions'] or options['providers']
+        )
+        self.client = None
+        if options['providers'] or fetches_movies:
+            self.client = self.get_client(options)
+        self.seen_tmdb_ids = set()
+        self.run = None
+        self.writer = None
+        if options['bulk']:
+            self.writer = BulkCatalogWriter(self.image_base_url, batch_size=max(options['batch_size'], 1))
 
         if options['providers']:
             self.stdout.write("Fetching streaming providers...")
@@ -65,148 +143,316 @@ class Command(BaseCommand):
             self.stdout.write("Seeding quiz questions...")
             self.seed_questions()
 
+        movie_lists = []
         if options['popular']:
             self.stdout.write("Fetching popular movies...")
-            self.fetch_movies('popular', pages)
+            movie_lists = ['popular']
         elif options['top_rated']:
             self.stdout.write("Fetching top rated movies...")
-            self.fetch_movies('top_rated', pages)
+            movie_lists = ['top_rated']
         elif not options['questions'] and not options['providers']:
             # Only fetch movies if not just seeding questions or providers
             self.stdout.write("Fetching both popular and top rated movies...")
-            self.fetch_movies('popular', pages)
-            self.fetch_movies('top_rated', pages)
+            movie_lists = ['popular', 'top_rated']
 
+        if movie_lists:
+            self.run = self.start_run(movie_lists, pages, options['resume'])
+            try:
+                for category in movie_lists:
+                    self.fetch_movies(category, pages)
+            except BaseException:
+                self.run.finish(IngestionRun.FAILED)
+                raise
+            self.run.finish(IngestionRun.COMPLETED)
+
+        if self.client:
+            self.client.close()
+        self.report_metrics(options['metrics_json'])
         self.stdout.write(
             self.style.SUCCESS("Database seeding completed successfully!")
         )
 
+    def log(self, message, verbosity=2):
+        """Write per-item progress, shown only with -v 2 or higher by default"""
+        if self.verbosity >= verbosity:
+            self.stdout.write(message)
+
+    def report_metrics(self, json_path):
+        for line in self.metrics.format_summary():
+            self.log(line, verbosity=1)
+        if json_path:
+            self.metrics.write_json(json_path)
+
+    def start_run(self, movie_lists, pages, resume):
+        """Start a checkpointed run, or pick up the last unfinished one with the same parameters"""
+        parameters = {'movie_lists': movie_lists, 'pages': pages}
+        if resume:
+            unfinished = IngestionRun.objects.filter(command='db_seed').exclude(
+                status=IngestionRun.COMPLETED
+            ).order_by('-started_at')
+            for run in unfinished:
+                if run.parameters == parameters:
+                    self.stdout.write(
+                        f"Resuming run from {run.started_at:%Y-%m-%d %H:%M}, "
+                        f"{sum(len(done) for done in run.completed_pages.values())} pages already done"
+                    )
+                    # Movies of completed pages are skipped without checking the database again
+                    self.seen_tmdb_ids.update(run.completed_tmdb_ids)
+                    run.status = IngestionRun.RUNNING
+                    run.save(update_fields=['status', 'updated_at'])
+                    return run
+            self.stdout.write("No unfinished run to resume, starting a new one")
+        return IngestionRun.objects.create(command='db_seed', parameters=parameters)
+
+    def get_client(self, options):
+        cache = None
+        if options['http_cache']:
+            cache = ResponseCache(options['http_cache'], ttl=options['cache_ttl'])
+        elif options['offline']:
+            raise CommandError("--offline needs --http-cache or TMDB_CACHE_PATH")
+
+        return TMDbClient(
+            self.api_key, self.base_url, rate_limit=self.rate_limit, pool_size=self.workers,
+            cache=cache, offline=options['offline'], metrics=self.metrics
+        )
+
     def fetch_movies(self, category, pages):
-        """Fetch movies from TMDb API"""
-        for page in range(1, pages + 1):
-            self.stdout.write(f"Fetching {category} movies - page {page}...")
-
-            url = f"{self.base_url}/movie/{category}"
-            params = {
-                'api_key': self.api_key,
-                'page': page,
-                'language': 'en-US'
-            }
+        """
+        Fetch movies from TMDb API.
+
+        Pages, details and providers are fetched by a pool of worker threads
+        that hand their results to this thread through a bounded queue; only
+        this thread touches the database.
+        """
+        results = queue.Queue(maxsize=self.workers * 4)
+        pending = 0
+        # Pages are checkpointed once every new movie on them is committed
+        self.page_movies = {}
+        self.page_tmdb_ids = {}
+        self.movie_pages = {}
+        self.failed_pages = set()
+        self.stopping = threading.Event()
+
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            for page in range(1, pages + 1):
+                if self.run.is_page_completed(category, page):
+                    self.metrics.incr('pages_resumed')
+                    continue
+                self.log(f"Fetching {category} movies - page {page}...")
+                executor.submit(self.run_fetch, results, self.fetch_page, category, page)
+                pending += 1
+
+            while pending:
+                kind, payload = results.get()
+                pending -= 1
+
+                if kind == PAGE:
+                    page, movies = payload
+                    new_movies = self.new_movies(movies)
+                    self.track_page(category, page, [movie_data['id'] for movie_data in new_movies])
+                    for movie_data in new_movies:
+                        executor.submit(self.run_fetch, results, self.fetch_movie, movie_data)
+                        pending += 1
+                elif kind == MOVIE:
+                    self.process_movie(*payload)
+                else:
+                    self.metrics.incr('errored')
+                    self.stdout.write(self.style.ERROR(f"Error fetching data: {payload}"))
+        finally:
+            # On an error nobody reads the queue any more: stop the workers instead of
+            # waiting for them, as they would block forever on the full queue
+            self.stopping.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+            self.drain(results)
+
+        if self.writer:
+            self.flush_movies()
+
+    def run_fetch(self, results, fetch, *args):
+        """Run ``fetch`` on a worker thread, reporting back to the writing thread until the run stops"""
+        if self.stopping.is_set():
+            return
+        try:
+            result = fetch(*args)
+        except Exception as e:
+            result = (ERROR, e)
 
+        while not self.stopping.is_set():
             try:
-                response = requests.get(url, params=params)
-                response.raise_for_status()
-                data = response.json()
+                results.put(result, timeout=RESULT_PUT_TIMEOUT)
+                return
+            except queue.Full:
+                continue
 
-                self.process_movies(data['results'])
+    def drain(self, results):
+        """Drop results nobody will process, unblocking workers waiting on the queue"""
+        try:
+            while True:
+                results.get_nowait()
+        except queue.Empty:
+            pass
+
+    def fetch_page(self, category, page):
+        return PAGE, (page, self.client.movie_list(category, page)['results'])
+
+    def track_page(self, category, page, tmdb_ids):
+        key = (category, page)
+        self.page_movies[key] = set(tmdb_ids)
+        self.page_tmdb_ids[key] = list(tmdb_ids)
+        for tmdb_id in tmdb_ids:
+            self.movie_pages[tmdb_id] = key
+        if not tmdb_ids:
+            self.checkpoint_page(key)
+
+    def movie_done(self, tmdb_id, succeeded=True):
+        """Note a committed (or failed) movie, checkpointing its page once the page is finished"""
+        key = self.movie_pages.pop(tmdb_id, None)
+        if key is None:
+            return
+        if not succeeded:
+            # Leave the page out of the checkpoint so a resumed run retries it
+            self.failed_pages.add(key)
+        remaining = self.page_movies[key]
+        remaining.discard(tmdb_id)
+        if not remaining:
+            del self.page_movies[key]
+            if key not in self.failed_pages:
+                self.checkpoint_page(key)
+
+    def checkpoint_page(self, key):
+        category, page = key
+        self.run.checkpoint(category, page, self.page_tmdb_ids.pop(key))
+
+    def fetch_movie(self, movie_data):
+        """Fetch details with credits and streaming providers of one movie"""
+        warnings = []
+        details = providers = None
+        title = movie_data.get('title', 'Unknown')
+        self.metrics.incr('fetched')
 
-            except requests.RequestException as e:
-                self.stdout.write(
-                    self.style.ERROR(f"Error fetching data: {e}")
-                )
-                continue
+        try:
+            details = self.client.movie_details(movie_data['id'])
+        except requests.RequestException as e:
+            warnings.append(f"Error fetching details for {title}: {e}")
 
-    def process_movies(self, movies):
-        """Process and save movies to database"""
-        for movie_data in movies:
-            try:
-                with transaction.atomic():
-                    self.create_movie(movie_data)
-            except Exception as e:
-                self.stdout.write(
-                    self.style.WARNING(f"Error processing movie {movie_data.get('title', 'Unknown')}: {e}")
-                )
+        try:
+            providers = self.client.movie_watch_providers(movie_data['id'])
+        except requests.RequestException as e:
+            warnings.append(f"Error fetching streaming providers for {title}: {e}")
 
-    def create_movie(self, movie_data):
-        """Create movie record with detailed information"""
-        tmdb_id = movie_data['id']
+        return MOVIE, (movie_data, details, providers, warnings)
 
-        # Check if movie already exists by tmdb_id first, then by title
-        if Film.objects.filter(tmdb_id=tmdb_id).exists():
-            return
-        if Film.objects.filter(title=movie_data['title']).exists():
-            return
+    def new_movies(self, movies):
+        """Drop movies already stored or already handled by this run before spending requests on them"""
+        unseen = [movie_data for movie_data in movies if movie_data['id'] not in self.seen_tmdb_ids]
+        self.metrics.incr('skipped', len(movies) - len(unseen))
+        if not unseen:
+            return []
 
-        # Debug: Print movie data to see what we're receiving
-        print(f"DEBUG: Processing movie: {movie_data.get('title', 'Unknown')}")
-        print(f"DEBUG: Overview available: {bool(movie_data.get('overview'))}")
-        if movie_data.get('overview'):
-            print(f"DEBUG: Overview length: {len(movie_data.get('overview', ''))}")
-            print(f"DEBUG: Overview preview: {movie_data.get('overview', '')[:100]}...")
+        if self.writer:
+            existing_ids, existing_titles = self.writer.film_tmdb_ids, self.writer.film_titles
         else:
-            print("DEBUG: No overview in movie_data")
+            tmdb_ids = [movie_data['id'] for movie_data in unseen]
+            titles = [movie_data['title'] for movie_data in unseen]
+            existing_ids = set(Film.objects.filter(tmdb_id__in=tmdb_ids).values_list('tmdb_id', flat=True))
+            existing_titles = set(Film.objects.filter(title__in=titles).values_list('title', flat=True))
+
+        new = []
+        for movie_data in unseen:
+            self.seen_tmdb_ids.add(movie_data['id'])
+            if movie_data['id'] in existing_ids or movie_data['title'] in existing_titles:
+                self.metrics.incr('skipped')
+                continue
+            new.append(movie_data)
+        return new
+
+    def process_movie(self, movie_data, details, providers, warnings):
+        """Save one fetched movie to database, or queue it for the next bulk write"""
+        for warning in warnings:
+            self.metrics.incr('http_errors')
+            self.stdout.write(self.style.WARNING(warning))
+
+        if self.writer:
+            with self.metrics.stage('parse'):
+                queued = self.writer.add(movie_data, details, providers)
+            if not queued:
+                self.metrics.incr('skipped')
+                self.movie_done(movie_data['id'])
+            if self.writer.is_full:
+                self.flush_movies()
+            return
 
-        release_date = None
-        if movie_data.get('release_date'):
-            try:
-                release_date = datetime.strptime(movie_data['release_date'], '%Y-%m-%d').date()
-            except ValueError:
-                pass
-
-        overview_text = movie_data.get('overview', '')
-        print(f"DEBUG: Creating film with overview: {bool(overview_text)}")
-
-        # Construct poster URL
-        poster_url = None
-        if movie_data.get('poster_path'):
-            poster_url = f"{self.image_base_url}{movie_data['poster_path']}"
-            print(f"DEBUG: Poster URL: {poster_url}")
-
-        film = Film.objects.create(
-            title=movie_data['title'],
-            release_date=release_date or datetime.now().date(),
-            language=movie_data.get('original_language', 'en'),
-            overview=overview_text,
-            poster_url=poster_url,
-            tmdb_id=tmdb_id
-        )
+        self.movie_done(movie_data['id'], self.save_movie(movie_data, details, providers))
 
-        print(f"DEBUG: Film created. Overview in DB: {bool(film.overview)}")
-        print(f"DEBUG: Film created. Poster URL in DB: {bool(film.poster_url)}")
+    def flush_movies(self):
+        """Bulk write the queued movies, retrying them one by one if the batch fails"""
+        try:
+            with self.metrics.stage('db'):
+                written = self.writer.flush()
+        except Exception as e:
+            self.stdout.write(self.style.WARNING(f"Error writing batch, saving movies one by one: {e}"))
+            for movie_data, details, providers in self.writer.failed_batch:
+                self.movie_done(movie_data['id'], self.save_movie(movie_data, details, providers))
+            return
 
-        self.add_movie_details(film, tmdb_id)
+        if written:
+            self.metrics.incr('created', len(written))
+            self.log(f"Created {len(written)} movies")
+        for movie_data, details, providers in written:
+            self.movie_done(movie_data['id'])
 
-        self.add_movie_streaming_providers(film, tmdb_id)
+    def save_movie(self, movie_data, details, providers):
+        """Save one movie in its own transaction, returning whether it is committed or already stored"""
+        try:
+            with self.metrics.stage('db'), transaction.atomic():
+                film = self.create_movie(movie_data, details, providers)
+        except Exception as e:
+            self.metrics.incr('errored')
+            self.stdout.write(
+                self.style.WARNING(f"Error processing movie {movie_data.get('title', 'Unknown')}: {e}")
+            )
+            return False
 
-        if movie_data.get('genre_ids'):
-            self.add_genres(film, movie_data['genre_ids'])
+        self.metrics.incr('created' if film else 'skipped')
+        return True
 
-        self.stdout.write(f"Created movie: {film.title}")
+    def create_movie(self, movie_data, details=None, providers=None):
+        """Create movie record with detailed information, returning None if it already exists"""
+        tmdb_id = movie_data['id']
 
-    def add_movie_details(self, film, tmdb_id):
-        """Fetch and add detailed movie information"""
-        url = f"{self.base_url}/movie/{tmdb_id}"
-        params = {
-            'api_key': self.api_key,
-            'append_to_response': 'credits'
-        }
+        # Check if movie already exists by tmdb_id first, then by title
+        if Film.objects.filter(tmdb_id=tmdb_id).exists():
+            return None
+        if Film.objects.filter(title=movie_data['title']).exists():
+            return None
 
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+        fields = film_fields(movie_data, self.image_base_url)
+        film = Film.objects.create(**fields)
+        logger.debug(
+            "Created film %s (tmdb %s), overview: %d chars, poster: %s",
+            film.title, tmdb_id, len(film.overview or ''), film.poster_url or 'none'
+        )
 
-            if 'credits' in data and 'cast' in data['credits']:
-                self.add_cast(film, data['credits']['cast'][:10])  # limit is here
+        if details:
+            self.add_movie_details(film, details)
 
-            if 'credits' in data and 'crew' in data['credits']:
-                self.add_directors(film, data['credits']['crew'])
+        if providers:
+            self.add_movie_streaming_providers(film, providers)
 
-        except requests.RequestException as e:
-            self.stdout.write(
-                self.style.WARNING(f"Error fetching details for {film.title}: {e}")
-            )
+        self.add_genres(film, genre_names(movie_data))
 
-    def add_cast(self, film, cast_data):
-        """Add actors to the film"""
-        for actor_data in cast_data:
-            if not actor_data.get('name'):
-                continue
+        self.log(f"Created movie: {film.title}")
+        return film
 
-            name_parts = actor_data['name'].split(' ', 1)
-            first_name = name_parts[0]
-            last_name = name_parts[1] if len(name_parts) > 1 else ''
+    def add_movie_details(self, film, data):
+        """Add detailed movie information"""
+        self.add_cast(film, cast_names(data))
+        self.add_directors(film, director_names(data))
 
+    def add_cast(self, film, names):
+        """Add actors to the film"""
+        for first_name, last_name in names:
             actor, created = Actor.objects.get_or_create(
                 first_name=first_name,
                 last_name=last_name
@@ -214,18 +460,9 @@ class Command(BaseCommand):
 
             FilmActor.objects.get_or_create(film=film, actor=actor)
 
-    def add_directors(self, film, crew_data):
+    def add_directors(self, film, names):
         """Add directors to the film"""
-        directors = [person for person in crew_data if person.get('job') == 'Director']
-
-        for director_data in directors:
-            if not director_data.get('name'):
-                continue
-
-            name_parts = director_data['name'].split(' ', 1)
-            first_name = name_parts[0]
-            last_name = name_parts[1] if len(name_parts) > 1 else ''
-
+        for first_name, last_name in names:
             director, created = Director.objects.get_or_create(
                 first_name=first_name,
                 last_name=last_name
@@ -233,34 +470,34 @@ class Command(BaseCommand):
 
             FilmDirector.objects.get_or_create(film=film, director=director)
 
-    def add_genres(self, film, genre_ids):
+    def add_genres(self, film, names):
         """Add genres as categories"""
-        # genre mapping from tmdb, not sure if this shouldn't be stored externally
-        genre_map = {
-            28: 'Action', 12: 'Adventure', 16: 'Animation', 35: 'Comedy',
-            80: 'Crime', 99: 'Documentary', 18: 'Drama', 10751: 'Family',
-            14: 'Fantasy', 36: 'History', 27: 'Horror', 10402: 'Music',
-            9648: 'Mystery', 10749: 'Romance', 878: 'Science Fiction',
-            10770: 'TV Movie', 53: 'Thriller', 10752: 'War', 37: 'Western'
-        }
-
-        for genre_id in genre_ids:
-            if genre_id in genre_map:
-                category, created = Category.objects.get_or_create(
-                    name=genre_map[genre_id]
-                )
-                FilmCategory.objects.get_or_create(film=film, category=category)
+        for name in names:
+            category, created = Category.objects.get_or_create(name=name)
+            FilmCategory.objects.get_or_create(film=film, category=category)
 
     def seed_questions(self):
         """Add predefined quiz questions to the database"""
         questions_data = [
             {
                 'question': "What's your mood today?",
-                'available_answers': ["Energetic", "Bored", "Chill", "Jittery"]
+                'available_answers': ["Energetic", "Bored", "Chill", "Jittery"],
+                'answer_weights': {
+                    "Energetic": {'Action': 3, 'Adventure': 3, 'Thriller': 2},
+                    "Bored": {'Comedy': 3, 'Action': 2, 'Adventure': 2},
+                    "Chill": {'Romance': 3, 'Drama': 2, 'Documentary': 1},
+                    "Jittery": {'Horror': 3, 'Thriller': 3, 'Mystery': 2},
+                }
             },
             {
                 'question': "What type of movie do you prefer?",
-                'available_answers': ["Action-packed", "Emotional", "Mind-bending", "Light-hearted"]
+                'available_answers': ["Action-packed", "Emotional", "Mind-bending", "Light-hearted"],
+                'answer_weights': {
+                    "Action-packed": {'Action': 4, 'Adventure': 3, 'Thriller': 2},
+                    "Emotional": {'Drama': 4, 'Romance': 3},
+                    "Mind-bending": {'Science Fiction': 4, 'Thriller': 2, 'Mystery': 2},
+                    "Light-hearted": {'Comedy': 4, 'Animation': 2, 'Romance': 1},
+                }
             },
             {
                 'question': "What's your favorite time period for movies?",
@@ -271,7 +508,13 @@ class Command(BaseCommand):
             },
             {
                 'question': "How do you prefer to watch movies?",
-                'available_answers': ["Alone for focus", "With friends for fun", "Date night romance", "Family time"]
+                'available_answers': ["Alone for focus", "With friends for fun", "Date night romance", "Family time"],
+                'answer_weights': {
+                    "Alone for focus": {'Drama': 2, 'Documentary': 2, 'Thriller': 1},
+                    "With friends for fun": {'Comedy': 3, 'Action': 2, 'Horror': 1},
+                    "Date night romance": {'Romance': 4, 'Comedy': 1},
+                    "Family time": {'Animation': 3, 'Adventure': 2, 'Comedy': 2},
+                }
             },
             {
                 'question': "What movie length do you prefer?",
@@ -282,7 +525,12 @@ class Command(BaseCommand):
             },
             {
                 'question': "What draws you to a movie most?",
-                'available_answers': ["Amazing visuals", "Great storyline", "Favorite actors", "Director's reputation"]
+                'available_answers': ["Amazing visuals", "Great storyline", "Favorite actors", "Director's reputation"],
+                'answer_weights': {
+                    # Favorite actors and director's reputation are handled by review-based scoring
+                    "Amazing visuals": {'Science Fiction': 3, 'Fantasy': 3, 'Action': 2, 'Animation': 2},
+                    "Great storyline": {'Drama': 3, 'Mystery': 2, 'Thriller': 2},
+                }
             }
         ]
 
@@ -297,18 +545,24 @@ class Command(BaseCommand):
             else:
                 self.stdout.write(f"Question already exists: {question.question}")
 
+            self.seed_answer_weights(question, question_data.get('answer_weights', {}))
+
+    def seed_answer_weights(self, question, answer_weights):
+        """Add answer to category weights for a quiz question, keeping retuned values"""
+        for answer, weights in answer_weights.items():
+            for category_name, weight in weights.items():
+                category, created = Category.objects.get_or_create(name=category_name)
+                QuestionAnswerWeight.objects.get_or_create(
+                    question=question,
+                    answer=answer,
+                    category=category,
+                    defaults={'weight': weight}
+                )
+
     def fetch_streaming_providers(self):
         """Fetch streaming providers from TMDb API"""
-        url = f"{self.base_url}/watch/providers/movie"
-        params = {
-            'api_key': self.api_key,
-            'watch_region': 'US'  # for now only US, we can change this later
-        }
-
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = self.client.watch_providers(region='US')  # for now only US, we can change this later
 
             if 'results' in data:
                 self.process_streaming_providers(data['results'])
@@ -353,41 +607,12 @@ class Command(BaseCommand):
             logo_path=logo_url
         )
 
-        self.stdout.write(f"Created streaming provider: {provider.name}")
+        self.log(f"Created streaming provider: {provider.name}")
 
-    def add_movie_streaming_providers(self, film, tmdb_id):
-        """Fetch and add streaming providers for a specific movie"""
-        url = f"{self.base_url}/movie/{tmdb_id}/watch/providers"
-        params = {
-            'api_key': self.api_key
-        }
-
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-            if 'results' in data and 'US' in data['results']:
-                us_providers = data['results']['US']
-
-                all_providers = []
-
-                if 'flatrate' in us_providers:
-                    all_providers.extend(us_providers['flatrate'])
-
-                if 'rent' in us_providers:
-                    all_providers.extend(us_providers['rent'])
-
-                if 'buy' in us_providers:
-                    all_providers.extend(us_providers['buy'])
-
-                for provider_data in all_providers:
-                    self.link_movie_to_provider(film, provider_data)
-
-        except requests.RequestException as e:
-            self.stdout.write(
-                self.style.WARNING(f"Error fetching streaming providers for {film.title}: {e}")
-            )
+    def add_movie_streaming_providers(self, film, data):
+        """Add streaming providers for a specific movie"""
+        for provider_data in region_providers(data, 'US'):
+            self.link_movie_to_provider(film, provider_data)
 
     def link_movie_to_provider(self, film, provider_data):
         """Link a movie to a streaming provider"""
@@ -0,0 +1,91 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.utils import timezone
+
+from movie.models import UserRecommendation
+from movie.recommender import Recommender
+from authentication.models import User, UserStreamingService
+
+
+def init_worker():
+    """Make sure Django is ready in worker processes started without fork"""
+    django.setup()
+
+
+def rank_users(user_ids):
+    """Score every user in a chunk, returning ``[(user_id, [(film_id, score), ...]), ...]``"""
+    service_ids = {user_id: [] for user_id in user_ids}
+    rows = UserStreamingService.objects.filter(user_id__in=user_ids).values_list('user_id', 'streaming_service_id')
+    for user_id, service_id in rows:
+        service_ids[user_id].append(service_id)
+
+    recommender = Recommender()
+    results = []
+    for user in User.objects.filter(id__in=user_ids):
+        results.append((user.id, recommender.recommend(user, service_ids[user.id])))
+    return results
+
+
+class Command(BaseCommand):
+    help = "Precompute film recommendations for all active users"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=200,
+            help='Number of users scored per task (default: 200)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Number of worker processes, 1 scores in this process (default: CPU count)'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        workers = options['workers']
+
+        eligible = User.objects.filter(is_active=True, streaming_services__isnull=False)
+        user_ids = list(eligible.distinct().order_by('id').values_list('id', flat=True))
+        chunks = [user_ids[index:index + chunk_size] for index in range(0, len(user_ids), chunk_size)]
+        self.stdout.write(f"Scoring {len(user_ids)} users in {len(chunks)} chunks...")
+
+        if workers > 1 and len(chunks) > 1:
+            # Forked workers must not share the parent's database connections
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+                for results in executor.map(rank_users, chunks):
+                    self.save_recommendations(results)
+        else:
+            for chunk in chunks:
+                self.save_recommendations(rank_users(chunk))
+
+        # Users who were deactivated or dropped every service keep no stale rankings
+        removed, _ = UserRecommendation.objects.exclude(user_id__in=eligible.values('id')).delete()
+        if removed:
+            self.stdout.write(f"Removed {removed} recommendations of users no longer scored")
+
+        self.stdout.write(
+            self.style.SUCCESS("Recommendations precomputed successfully!")
+        )
+
+    def save_recommendations(self, results):
+        """Replace the stored recommendations of a chunk of users in one transaction"""
+        computed_at = timezone.now()
+        recommendations = [
+            UserRecommendation(user_id=user_id, film_id=film_id, rank=rank, score=score, computed_at=computed_at)
+            for user_id, ranked in results
+            for rank, (film_id, score) in enumerate(ranked, start=1)
+        ]
+
+        with transaction.atomic():
+            UserRecommendation.objects.filter(user_id__in=[user_id for user_id, ranked in results]).delete()
+            UserRecommendation.objects.bulk_create(recommendations, batch_size=1000)
+
+        self.stdout.write(f"Saved recommendations for {len(results)} users")
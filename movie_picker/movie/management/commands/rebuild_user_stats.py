@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from movie.stats import rebuild_user_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the materialized user statistics from watch history and streaming services"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='Only rebuild this user id (can be repeated, default: every user)'
+        )
+
+    def handle(self, *args, **options):
+        drifted = rebuild_user_stats(options['user_ids'])
+        if drifted:
+            self.stdout.write(self.style.WARNING(
+                f"Repaired stats of {len(drifted)} users: {', '.join(str(user_id) for user_id in drifted[:20])}"
+                + (' ...' if len(drifted) > 20 else '')
+            ))
+        self.stdout.write(self.style.SUCCESS("User stats rebuilt"))
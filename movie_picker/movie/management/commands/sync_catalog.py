@@ -0,0 +1,207 @@
+import os
+from collections import deque
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from dotenv import load_dotenv
+
+from movie.ingestion import sync_film, sync_film_providers
+from movie.models import Film, CatalogSyncState
+from movie.tmdb import TMDbClient, DEFAULT_RATE_LIMIT
+from movie.tmdb_cache import ResponseCache, DEFAULT_TTL
+
+load_dotenv()
+
+CHANGES_SYNC = 'tmdb_changes'
+# TMDb's change feed accepts windows of up to 14 days
+CHANGES_WINDOW_DAYS = 14
+# Fetches queued per worker ahead of the film being written
+FETCH_WINDOW_PER_WORKER = 4
+
+
+class Command(BaseCommand):
+    help = "Apply TMDb changes to films already in the catalog"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            type=date.fromisoformat,
+            help='Start of the change window as YYYY-MM-DD (default: end of the previous sync, or yesterday)'
+        )
+        parser.add_argument(
+            '--providers-only',
+            action='store_true',
+            help='Only refresh streaming availability of every film with a TMDb id'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Number of threads fetching from TMDb (default: 8)'
+        )
+        parser.add_argument(
+            '--http-cache',
+            default=os.getenv('TMDB_CACHE_PATH', ''),
+            help='SQLite file caching TMDb responses (default: $TMDB_CACHE_PATH, empty disables the cache)'
+        )
+        parser.add_argument(
+            '--cache-ttl',
+            type=int,
+            default=DEFAULT_TTL,
+            help=f'Seconds cached responses are used before being revalidated (default: {DEFAULT_TTL})'
+        )
+        parser.add_argument(
+            '--offline',
+            action='store_true',
+            help='Replay TMDb responses from --http-cache without network access'
+        )
+
+    def handle(self, *args, **options):
+        api_key = os.getenv('API_KEY_TMDB')
+        if not api_key:
+            raise CommandError("API_KEY_TMDB environment variable is required")
+        self.image_base_url = os.getenv('TMDB_IMAGE_BASE_URL', 'https://image.tmdb.org/t/p/w500')
+        self.workers = max(options['workers'], 1)
+
+        cache = None
+        if options['http_cache']:
+            cache = ResponseCache(options['http_cache'], ttl=options['cache_ttl'])
+        elif options['offline']:
+            raise CommandError("--offline needs --http-cache or TMDB_CACHE_PATH")
+        self.client = TMDbClient(
+            api_key, os.getenv('TMDB_BASE_URL', 'https://api.themoviedb.org/3'),
+            rate_limit=float(os.getenv('TMDB_RATE_LIMIT', DEFAULT_RATE_LIMIT)), pool_size=self.workers,
+            cache=cache, offline=options['offline']
+        )
+
+        try:
+            if options['providers_only']:
+                self.sync_providers()
+            else:
+                self.sync_changes(options['since'])
+        finally:
+            self.client.close()
+
+    def sync_changes(self, since):
+        """Apply every change TMDb reported since the last sync to the films we store"""
+        state = CatalogSyncState.objects.filter(name=CHANGES_SYNC).first()
+        today = timezone.now().date()
+        start = since or (state.synced_through if state else today - timedelta(days=1))
+
+        self.stdout.write(f"Fetching TMDb changes from {start} to {today}...")
+        changed_ids = self.fetch_changed_ids(start, today)
+        films = list(Film.objects.filter(tmdb_id__in=changed_ids))
+        self.stdout.write(f"{len(changed_ids)} movies changed, {len(films)} of them in the catalog")
+
+        updated = errors = 0
+        with closing(self.fetch_all(films, self.fetch_film)) as results:
+            for film, details, providers, error in results:
+                if error:
+                    errors += 1
+                    self.stdout.write(self.style.WARNING(f"Error fetching {film.title}: {error}"))
+                    continue
+                try:
+                    with transaction.atomic():
+                        changed = sync_film(film, details, providers, self.image_base_url)
+                except Exception as e:
+                    errors += 1
+                    self.stdout.write(self.style.WARNING(f"Error updating {film.title}: {e}"))
+                    continue
+                if changed:
+                    updated += 1
+                    self.stdout.write(f"Updated {film.title}: {', '.join(changed)}")
+
+        if errors:
+            # Keep the old mark so the failed films are picked up by the next run
+            self.stdout.write(self.style.WARNING(f"{errors} films failed, high-water mark left at {start}"))
+        else:
+            CatalogSyncState.objects.update_or_create(name=CHANGES_SYNC, defaults={'synced_through': today})
+
+        self.stdout.write(self.style.SUCCESS(f"Catalog sync completed: {updated} films updated"))
+
+    def sync_providers(self):
+        """Refresh streaming availability of every film with a TMDb id"""
+        films = list(Film.objects.exclude(tmdb_id=None))
+        self.stdout.write(f"Refreshing streaming providers of {len(films)} films...")
+
+        updated = errors = 0
+        with closing(self.fetch_all(films, self.fetch_providers)) as results:
+            for film, details, providers, error in results:
+                if error:
+                    errors += 1
+                    self.stdout.write(
+                        self.style.WARNING(f"Error fetching streaming providers for {film.title}: {error}")
+                    )
+                    continue
+                try:
+                    with transaction.atomic():
+                        if sync_film_providers(film, providers, self.image_base_url):
+                            updated += 1
+                except Exception as e:
+                    errors += 1
+                    self.stdout.write(
+                        self.style.WARNING(f"Error updating streaming providers for {film.title}: {e}")
+                    )
+
+        if errors:
+            self.stdout.write(self.style.WARNING(f"{errors} films failed"))
+        self.stdout.write(self.style.SUCCESS(f"Provider sync completed: {updated} films updated"))
+
+    def fetch_changed_ids(self, start, end):
+        """TMDb ids of movies changed between two dates, walking the feed in 14 day windows"""
+        changed_ids = set()
+        window_start = start
+        while window_start <= end:
+            window_end = min(window_start + timedelta(days=CHANGES_WINDOW_DAYS - 1), end)
+            page, total_pages = 1, 1
+            while page <= total_pages:
+                data = self.client.movie_changes(window_start, window_end, page)
+                changed_ids.update(movie['id'] for movie in data.get('results', []))
+                total_pages = data.get('total_pages', 1)
+                page += 1
+            window_start = window_end + timedelta(days=1)
+        return changed_ids
+
+    def fetch_all(self, films, fetch):
+        """
+        Fetch TMDb data for every film on the worker pool, yielding results in order on this thread.
+
+        Only a bounded window of fetches is queued ahead, and whatever is still
+        queued is cancelled if the caller stops early, so an error while writing
+        does not wait for the rest of the catalog to be fetched.
+        """
+        films = iter(films)
+        pending = deque()
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            for film in films:
+                pending.append(executor.submit(fetch, film))
+                if len(pending) >= self.workers * FETCH_WINDOW_PER_WORKER:
+                    break
+            while pending:
+                result = pending.popleft().result()
+                film = next(films, None)
+                if film is not None:
+                    pending.append(executor.submit(fetch, film))
+                yield result
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def fetch_film(self, film):
+        try:
+            return (
+                film, self.client.movie_details(film.tmdb_id), self.client.movie_watch_providers(film.tmdb_id), None
+            )
+        except requests.RequestException as e:
+            return film, None, None, e
+
+    def fetch_providers(self, film):
+        try:
+            return film, None, self.client.movie_watch_providers(film.tmdb_id), None
+        except requests.RequestException as e:
+            return film, None, None, e
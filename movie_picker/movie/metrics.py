@@ -0,0 +1,77 @@
+# movie/metrics.py
+"""
+Progress metrics for ingestion commands.
+
+``IngestionMetrics`` counts items per outcome (fetched, created, skipped,
+errored, ...) and accumulates wall time per stage (``http``, ``parse``, ``db``)
+from any thread, then reports throughput and a summary that can be written
+as JSON.
+"""
+import json
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+
+class IngestionMetrics:
+    """Thread-safe counters and per-stage timings of one ingestion run"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.counters = Counter()
+        self.stage_seconds = defaultdict(float)
+        self.stage_calls = Counter()
+        self._lock = threading.Lock()
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as part of stage ``name``"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.stage_seconds[name] += elapsed
+                self.stage_calls[name] += 1
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def summary(self):
+        elapsed = self.elapsed()
+        with self._lock:
+            return {
+                'elapsed_seconds': round(elapsed, 3),
+                'movies_per_second': round(self.counters['created'] / elapsed, 2) if elapsed else 0.0,
+                'counters': dict(self.counters),
+                'stages': {
+                    name: {
+                        'calls': self.stage_calls[name],
+                        'seconds': round(seconds, 3),
+                        'avg_ms': round(seconds * 1000 / self.stage_calls[name], 2),
+                    }
+                    for name, seconds in self.stage_seconds.items()
+                },
+            }
+
+    def format_summary(self):
+        """Human readable summary lines"""
+        summary = self.summary()
+        counters = ', '.join(f"{count} {name}" for name, count in sorted(summary['counters'].items()))
+        lines = [
+            f"{counters or 'nothing processed'} in {summary['elapsed_seconds']}s "
+            f"({summary['movies_per_second']} movies/s)"
+        ]
+        for name, stage in sorted(summary['stages'].items()):
+            lines.append(f"  {name}: {stage['calls']} calls, {stage['seconds']}s total, {stage['avg_ms']}ms avg")
+        return lines
+
+    def write_json(self, path):
+        with open(path, 'w') as output:
+            json.dump(self.summary(), output, indent=2)
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:04
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counts(apps, schema_editor):
+    Film = apps.get_model('movie', 'Film')
+
+    def related_count(model_name):
+        through_model = apps.get_model('movie', model_name)
+        counts = (
+            through_model.objects.filter(film=OuterRef('pk'))
+            .order_by().values('film').annotate(total=Count('pk')).values('total')
+        )
+        return Coalesce(Subquery(counts), 0)
+
+    Film.objects.update(
+        actors_count=related_count('FilmActor'),
+        directors_count=related_count('FilmDirector'),
+        categories_count=related_count('FilmCategory'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie', '0002_userrecommendation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='film',
+            name='actors_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='film',
+            name='categories_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='film',
+            name='directors_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
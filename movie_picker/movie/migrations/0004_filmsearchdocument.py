@@ -0,0 +1,120 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+POSTGRES_INDEX = [
+    """
+    ALTER TABLE movie_filmsearchdocument ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(cast_names, '') || ' ' || coalesce(crew_names, '')), 'B')
+        || setweight(to_tsvector('english', coalesce(category_names, '')), 'C')
+        || setweight(to_tsvector('english', coalesce(overview, '')), 'D')
+    ) STORED
+    """,
+    "CREATE INDEX movie_filmsearchdocument_vector_gin ON movie_filmsearchdocument USING GIN (search_vector)",
+]
+POSTGRES_INDEX_REVERSE = [
+    "DROP INDEX IF EXISTS movie_filmsearchdocument_vector_gin",
+    "ALTER TABLE movie_filmsearchdocument DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_COLUMNS = 'title, overview, cast_names, crew_names, category_names'
+SQLITE_NEW = 'new.title, new.overview, new.cast_names, new.crew_names, new.category_names'
+SQLITE_OLD = 'old.title, old.overview, old.cast_names, old.crew_names, old.category_names'
+SQLITE_INDEX = [
+    f"""
+    CREATE VIRTUAL TABLE movie_filmsearch_fts USING fts5(
+        {SQLITE_COLUMNS}, content='movie_filmsearchdocument', content_rowid='film_id'
+    )
+    """,
+    f"""
+    CREATE TRIGGER movie_filmsearch_fts_insert AFTER INSERT ON movie_filmsearchdocument BEGIN
+        INSERT INTO movie_filmsearch_fts(rowid, {SQLITE_COLUMNS}) VALUES (new.film_id, {SQLITE_NEW});
+    END
+    """,
+    f"""
+    CREATE TRIGGER movie_filmsearch_fts_delete AFTER DELETE ON movie_filmsearchdocument BEGIN
+        INSERT INTO movie_filmsearch_fts(movie_filmsearch_fts, rowid, {SQLITE_COLUMNS})
+        VALUES ('delete', old.film_id, {SQLITE_OLD});
+    END
+    """,
+    f"""
+    CREATE TRIGGER movie_filmsearch_fts_update AFTER UPDATE ON movie_filmsearchdocument BEGIN
+        INSERT INTO movie_filmsearch_fts(movie_filmsearch_fts, rowid, {SQLITE_COLUMNS})
+        VALUES ('delete', old.film_id, {SQLITE_OLD});
+        INSERT INTO movie_filmsearch_fts(rowid, {SQLITE_COLUMNS}) VALUES (new.film_id, {SQLITE_NEW});
+    END
+    """,
+]
+SQLITE_INDEX_REVERSE = [
+    "DROP TRIGGER IF EXISTS movie_filmsearch_fts_insert",
+    "DROP TRIGGER IF EXISTS movie_filmsearch_fts_delete",
+    "DROP TRIGGER IF EXISTS movie_filmsearch_fts_update",
+    "DROP TABLE IF EXISTS movie_filmsearch_fts",
+]
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+def backfill_documents(apps, schema_editor):
+    Film = apps.get_model('movie', 'Film')
+    FilmSearchDocument = apps.get_model('movie', 'FilmSearchDocument')
+    FilmActor = apps.get_model('movie', 'FilmActor')
+    FilmDirector = apps.get_model('movie', 'FilmDirector')
+    FilmCategory = apps.get_model('movie', 'FilmCategory')
+
+    names = {}
+    for key, through, fields in (
+        ('cast', FilmActor, ('actor__first_name', 'actor__last_name')),
+        ('crew', FilmDirector, ('director__first_name', 'director__last_name')),
+        ('categories', FilmCategory, ('category__name',)),
+    ):
+        for film_id, *parts in through.objects.values_list('film_id', *fields):
+            names.setdefault((film_id, key), []).append(' '.join(part for part in parts if part))
+
+    FilmSearchDocument.objects.bulk_create(
+        [
+            FilmSearchDocument(
+                film_id=film_id,
+                title=title,
+                overview=overview or '',
+                cast_names=', '.join(names.get((film_id, 'cast'), [])),
+                crew_names=', '.join(names.get((film_id, 'crew'), [])),
+                category_names=', '.join(names.get((film_id, 'categories'), [])),
+            )
+            for film_id, title, overview in Film.objects.values_list('id', 'title', 'overview').iterator()
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie', '0003_film_relation_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FilmSearchDocument',
+            fields=[
+                ('film', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='movie.film')),
+                ('title', models.CharField(max_length=255)),
+                ('overview', models.TextField(blank=True, default='')),
+                ('cast_names', models.TextField(blank=True, default='')),
+                ('crew_names', models.TextField(blank=True, default='')),
+                ('category_names', models.TextField(blank=True, default='')),
+            ],
+        ),
+        migrations.RunPython(
+            run_for_vendor({'postgresql': POSTGRES_INDEX, 'sqlite': SQLITE_INDEX}),
+            run_for_vendor({'postgresql': POSTGRES_INDEX_REVERSE, 'sqlite': SQLITE_INDEX_REVERSE}),
+        ),
+        migrations.RunPython(backfill_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie', '0004_filmsearchdocument'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='category',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='streamingservice',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='tag',
+            unique_together=set(),
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='streamingservice',
+            name='name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='tag',
+            name='name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='film',
+            index=models.Index(fields=['-created_at', 'id'], name='film_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='film',
+            index=models.Index(fields=['title', 'id'], name='film_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='film',
+            index=models.Index(fields=['release_date'], name='film_release_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='film',
+            index=models.Index(fields=['language'], name='film_language_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='watchedfilm',
+            index=models.Index(fields=['user', 'review'], name='watched_user_review_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='watchedfilm',
+            index=models.Index(fields=['user', '-created_at'], name='watched_user_created_idx'),
+        ),
+        migrations.AlterField(
+            model_name='watchedfilm',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
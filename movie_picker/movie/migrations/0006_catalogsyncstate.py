@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie', '0005_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('synced_through', models.DateField()),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
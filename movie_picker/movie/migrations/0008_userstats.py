@@ -0,0 +1,31 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_questionanswerweight'),
+        ('movie', '0007_ingestionrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('watched_count', models.PositiveIntegerField(default=0)),
+                ('reviewed_count', models.PositiveIntegerField(default=0)),
+                ('review_sum', models.IntegerField(default=0)),
+                ('service_count', models.PositiveIntegerField(default=0)),
+                ('rating_histogram', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'user stats',
+            },
+        ),
+    ]
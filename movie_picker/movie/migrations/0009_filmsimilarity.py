@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-16 23:26
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movie', '0008_userstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FilmSimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveIntegerField()),
+                ('score', models.FloatField()),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('film', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similarities', to='movie.film')),
+                ('neighbor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='movie.film')),
+            ],
+            options={
+                'verbose_name_plural': 'film similarities',
+                'unique_together': {('film', 'rank')},
+            },
+        ),
+    ]
@@ -1,5 +1,8 @@
 # movie/models.py
+from django.conf import settings
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from authentication.models import User
 
@@ -12,6 +15,36 @@ class TimestampedModel(models.Model):
         abstract = True
 
 
+def related_count(through_model):
+    """Subquery counting the rows of a film through model for the outer film"""
+    counts = (
+        through_model.objects.filter(film=OuterRef('pk'))
+        .order_by().values('film').annotate(total=Count('pk')).values('total')
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+class FilmQuerySet(models.QuerySet):
+    def with_counts(self):
+        """Annotate actor, director and category counts (num_actors, ...) without extra queries per row"""
+        if settings.FILM_COUNTS_SOURCE == 'denormalized':
+            # Serializers read the denormalized columns directly
+            return self
+        return self.annotate(
+            num_actors=related_count(FilmActor),
+            num_directors=related_count(FilmDirector),
+            num_categories=related_count(FilmCategory),
+        )
+
+    def refresh_counts(self):
+        """Recompute the denormalized relation counts of the selected films"""
+        return self.update(
+            actors_count=related_count(FilmActor),
+            directors_count=related_count(FilmDirector),
+            categories_count=related_count(FilmCategory),
+        )
+
+
 class Film(TimestampedModel):
     title = models.CharField(max_length=255)
     release_date = models.DateField()
@@ -26,9 +59,37 @@ class Film(TimestampedModel):
     tags = models.ManyToManyField('Tag', through='FilmTag')
     streaming_services = models.ManyToManyField('StreamingService', through='FilmStreamingService')
 
+    # Denormalized relation counts, maintained by signals on the through models
+    actors_count = models.PositiveIntegerField(default=0, editable=False)
+    directors_count = models.PositiveIntegerField(default=0, editable=False)
+    categories_count = models.PositiveIntegerField(default=0, editable=False)
+
+    COUNT_FIELDS = ('actors_count', 'directors_count', 'categories_count')
+
+    objects = FilmQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Default list ordering and its keyset cursor
+            models.Index(fields=['-created_at', 'id'], name='film_created_at_idx'),
+            # Title ordering/cursor and the duplicate check in db_seed
+            models.Index(fields=['title', 'id'], name='film_title_idx'),
+            models.Index(fields=['release_date'], name='film_release_date_idx'),
+            models.Index(fields=['language'], name='film_language_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # Never write back counts loaded with the instance, they may be stale by now
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNT_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
 
 class Actor(TimestampedModel):
     first_name = models.CharField(max_length=255)
@@ -43,35 +104,31 @@ class Director(TimestampedModel):
 
 
 class Category(TimestampedModel):
-    name = models.CharField(max_length=255)
-
-    class Meta:
-        unique_together = ('id', 'name')
+    name = models.CharField(max_length=255, db_index=True)
 
 
 class Tag(TimestampedModel):
-    name = models.CharField(max_length=255)
-
-    class Meta:
-        unique_together = ('id', 'name')
+    name = models.CharField(max_length=255, db_index=True)
 
 
 class StreamingService(TimestampedModel):
-    name = models.CharField(max_length=255)
+    name = models.CharField(max_length=255, db_index=True)
     tmdb_provider_id = models.IntegerField(unique=True, null=True, blank=True)
     logo_path = models.URLField(blank=True, null=True)
 
-    class Meta:
-        unique_together = ('id', 'name')
-
 
 class WatchedFilm(TimestampedModel):
     film = models.ForeignKey(Film, on_delete=models.CASCADE)
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Lookups by user are served by the composite indexes below
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     review = models.IntegerField(null=True, blank=True)
 
     class Meta:
         unique_together = ('film', 'user')
+        indexes = [
+            models.Index(fields=['user', 'review'], name='watched_user_review_idx'),
+            models.Index(fields=['user', '-created_at'], name='watched_user_created_idx'),
+        ]
 
 
 class FilmTag(TimestampedModel):
@@ -112,3 +169,125 @@ class FilmActor(TimestampedModel):
 
     class Meta:
         unique_together = ('film', 'actor')
+
+
+class UserRecommendation(models.Model):
+    """Ranked recommendation precomputed offline by the precompute_recommendations command"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    film = models.ForeignKey(Film, on_delete=models.CASCADE)
+    rank = models.PositiveIntegerField()
+    score = models.FloatField()
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ('user', 'rank')
+
+
+class FilmSimilarity(models.Model):
+    """Nearest neighbour of a film by co-reviews, computed offline by the compute_film_similarities command"""
+    film = models.ForeignKey(Film, on_delete=models.CASCADE, related_name='similarities')
+    neighbor = models.ForeignKey(Film, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveIntegerField()
+    score = models.FloatField()
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ('film', 'rank')
+        verbose_name_plural = 'film similarities'
+
+
+class FilmSearchDocument(models.Model):
+    """
+    Denormalized text of a film used for full-text search.
+
+    The search index itself is created by migration: a weighted tsvector column
+    with a GIN index on PostgreSQL, or an FTS5 table kept in sync by triggers on
+    SQLite (see movie/search.py).
+    """
+    film = models.OneToOneField(Film, on_delete=models.CASCADE, primary_key=True, related_name='search_document')
+    title = models.CharField(max_length=255)
+    overview = models.TextField(blank=True, default='')
+    cast_names = models.TextField(blank=True, default='')
+    crew_names = models.TextField(blank=True, default='')
+    category_names = models.TextField(blank=True, default='')
+
+
+class CatalogSyncState(models.Model):
+    """High-water mark of an incremental catalog sync, see the sync_catalog command"""
+    name = models.CharField(max_length=50, unique=True)
+    synced_through = models.DateField()
+    modified_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.synced_through}"
+
+
+class IngestionRun(models.Model):
+    """Checkpoints of a db_seed run, used to resume it after an interruption"""
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(RUNNING, 'Running'), (COMPLETED, 'Completed'), (FAILED, 'Failed')]
+
+    command = models.CharField(max_length=50)
+    parameters = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=RUNNING)
+    # {movie list: [page, ...]} of pages whose movies are all written
+    completed_pages = models.JSONField(default=dict)
+    # TMDb ids of the movies on those pages
+    completed_tmdb_ids = models.JSONField(default=list)
+    started_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.command} {self.started_at:%Y-%m-%d %H:%M} ({self.status})"
+
+    def is_page_completed(self, category, page):
+        return page in self.completed_pages.get(category, [])
+
+    def checkpoint(self, category, page, tmdb_ids):
+        """Record a page whose movies are all committed"""
+        self.completed_pages.setdefault(category, []).append(page)
+        self.completed_tmdb_ids.extend(tmdb_ids)
+        self.save(update_fields=['completed_pages', 'completed_tmdb_ids', 'updated_at'])
+
+    def finish(self, status):
+        self.status = status
+        self.finished_at = timezone.now()
+        self.save(update_fields=['status', 'finished_at', 'updated_at'])
+
+
+class UserStats(models.Model):
+    """Aggregates of a user's watch history, kept current by signals (see movie/stats.py)"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    watched_count = models.PositiveIntegerField(default=0)
+    reviewed_count = models.PositiveIntegerField(default=0)
+    review_sum = models.IntegerField(default=0)
+    service_count = models.PositiveIntegerField(default=0)
+    # {review: number of films with that review}, keys are strings as in JSON
+    rating_histogram = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'user stats'
+
+    def __str__(self):
+        return f"{self.user}: {self.watched_count} watched"
+
+    @property
+    def average_review(self):
+        return self.review_sum / self.reviewed_count if self.reviewed_count else None
+
+    def count_review(self, review, amount):
+        """Add ``amount`` (1 or -1) films with ``review`` to the review aggregates"""
+        if review is None:
+            return
+        self.reviewed_count += amount
+        self.review_sum += review * amount
+        key = str(review)
+        remaining = self.rating_histogram.get(key, 0) + amount
+        if remaining > 0:
+            self.rating_histogram[key] = remaining
+        else:
+            self.rating_histogram.pop(key, None)
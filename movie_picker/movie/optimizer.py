@@ -0,0 +1,134 @@
+# movie/optimizer.py
+"""
+Eager loading derived from serializers.
+
+``optimize_queryset`` reads the readable fields of a serializer and loads
+everything it will touch up front:
+
+* nested serializers and dotted sources (``film.title``) over forward foreign
+  keys become ``select_related`` joins,
+* nested ``many=True`` serializers and many related fields become
+  ``prefetch_related`` lookups, whose querysets are optimized for the nested
+  serializer in turn,
+* when every field maps to a model column, ``only()`` limits the columns read.
+
+A serializer can add what the optimizer cannot infer, such as annotations
+read by method fields, with a ``setup_eager_loading(queryset)`` static method.
+Nested serializers that define one are loaded with a ``Prefetch`` rather than
+a join, since annotations do not travel through ``select_related``.
+"""
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+@dataclass
+class LoadingPlan:
+    select: list = field(default_factory=list)
+    # (lookup, nested serializer class, related model)
+    prefetch: list = field(default_factory=list)
+    only: list = field(default_factory=list)
+    # False once a field reads something other than model columns
+    restrict_columns: bool = True
+
+
+def optimize_queryset(queryset, serializer_class):
+    """Return ``queryset`` with the joins, prefetches and columns ``serializer_class`` needs"""
+    plan = loading_plan(serializer_class, queryset.model)
+    setup = getattr(serializer_class, 'setup_eager_loading', None)
+    if setup is not None:
+        queryset = setup(queryset)
+    if plan.select:
+        queryset = queryset.select_related(*plan.select)
+    for lookup, nested_class, model in plan.prefetch:
+        if nested_class is None:
+            queryset = queryset.prefetch_related(lookup)
+        else:
+            queryset = queryset.prefetch_related(
+                Prefetch(lookup, queryset=optimize_queryset(model._default_manager.all(), nested_class))
+            )
+    if plan.restrict_columns and plan.only:
+        queryset = queryset.only(*plan.only)
+    return queryset
+
+
+@lru_cache(maxsize=None)
+def loading_plan(serializer_class, model):
+    plan = LoadingPlan()
+    _collect(serializer_class(), model, '', plan)
+    return plan
+
+
+def _collect(serializer, model, prefix, plan):
+    """Add what ``serializer`` reads from ``model``, reached through ``prefix``, to ``plan``"""
+    for serializer_field in serializer.fields.values():
+        if serializer_field.write_only:
+            continue
+        if serializer_field.source == '*' or isinstance(serializer_field, serializers.SerializerMethodField):
+            plan.restrict_columns = False
+            continue
+
+        current_model, path = model, prefix
+        source_attrs = serializer_field.source_attrs
+        for position, attr in enumerate(source_attrs):
+            try:
+                model_field = current_model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                # A property or method, its dependencies are unknown
+                plan.restrict_columns = False
+                break
+            lookup = f"{path}{attr}"
+            is_last = position == len(source_attrs) - 1
+
+            if model_field.many_to_many or model_field.one_to_many:
+                _add_prefetch(serializer_field, lookup, model_field.related_model, plan)
+                break
+            if not model_field.is_relation:
+                plan.only.append(lookup)
+                break
+            if model_field.concrete:
+                plan.only.append(lookup)
+            else:
+                # Reverse one-to-one, there is no column to keep on this table
+                plan.restrict_columns = False
+            if is_last:
+                _add_related(serializer_field, lookup, model_field.related_model, plan)
+                break
+            plan.select.append(lookup)
+            current_model, path = model_field.related_model, f"{lookup}__"
+
+
+def _add_related(serializer_field, lookup, related_model, plan):
+    """Load a single related object, joined unless its serializer needs its own queryset"""
+    if isinstance(serializer_field, serializers.RelatedField):
+        if serializer_field.use_pk_only_optimization():
+            # Read from the foreign key column
+            return
+        plan.select.append(lookup)
+        plan.restrict_columns = False
+        return
+    if not isinstance(serializer_field, serializers.BaseSerializer):
+        return
+    if hasattr(serializer_field, 'setup_eager_loading'):
+        plan.prefetch.append((lookup, type(serializer_field), related_model))
+        return
+    plan.select.append(lookup)
+    _collect(serializer_field, related_model, f"{lookup}__", plan)
+
+
+def _add_prefetch(serializer_field, lookup, related_model, plan):
+    nested = getattr(serializer_field, 'child', None) or getattr(serializer_field, 'child_relation', None)
+    if isinstance(nested, serializers.ModelSerializer):
+        plan.prefetch.append((lookup, type(nested), related_model))
+    else:
+        plan.prefetch.append((lookup, None, related_model))
+
+
+class OptimizedQuerysetMixin:
+    """Generic view mixin that eager loads ``queryset`` for the view's serializer"""
+
+    def get_queryset(self):
+        return optimize_queryset(super().get_queryset(), self.get_serializer_class())
@@ -0,0 +1,161 @@
+# movie/pagination.py
+"""
+Pagination used by every list endpoint.
+
+Lists are paginated with page numbers by default. Passing ``?pagination=cursor``
+(or following a ``next`` link that carries a ``cursor``) switches to keyset
+pagination: each page continues strictly after the last row of the previous
+one on a unique ordering such as ``(-created_at, id)``, so deep pages never pay
+for an OFFSET scan.
+"""
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def get_requested_page_size(request, query_param, default, maximum):
+    """Read a positive page size from the query string, capped at ``maximum``"""
+    try:
+        page_size = int(request.query_params[query_param])
+    except (KeyError, ValueError):
+        return default
+    if page_size <= 0:
+        return default
+    return min(page_size, maximum)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only keyset pagination over an ordering whose last field is unique
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering, page_size=DEFAULT_PAGE_SIZE, max_page_size=MAX_PAGE_SIZE):
+        self.ordering = tuple(ordering)
+        self.default_page_size = page_size
+        self.max_page_size = max_page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = get_requested_page_size(
+            request, self.page_size_query_param, self.default_page_size, self.max_page_size
+        )
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+
+        results = list(queryset[:page_size + 1])
+        self.has_next = len(results) > page_size
+        results = results[:page_size]
+        self.next_position = self.position_of(results[-1]) if self.has_next else None
+        return results
+
+    def after(self, position):
+        """Filter matching rows that sort strictly after ``position``"""
+        conditions = []
+        for index, field in enumerate(self.ordering):
+            lookups = {self.field_name(previous): position[i] for i, previous in enumerate(self.ordering[:index])}
+            comparison = 'lt' if field.startswith('-') else 'gt'
+            lookups[f'{self.field_name(field)}__{comparison}'] = position[index]
+            conditions.append(Q(**lookups))
+        return reduce(or_, conditions)
+
+    def field_name(self, field):
+        return field.lstrip('-')
+
+    def position_of(self, instance):
+        values = []
+        for field in self.ordering:
+            value = getattr(instance, self.field_name(field))
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return values
+
+    def decode_cursor(self, request, model):
+        """Read the cursor position, converted to the Python values of the ordering fields of ``model``"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+        except (TypeError, ValueError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        values = []
+        for field_name, value in zip(self.ordering, position):
+            field = model._meta.get_field(self.field_name(field_name))
+            try:
+                value = field.to_python(value)
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+            if value is None and not field.null:
+                raise NotFound(self.invalid_cursor_message)
+            values.append(value)
+        return values
+
+    def encode_cursor(self, position):
+        encoded = base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, encoded)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.encode_cursor(self.next_position) if self.has_next else None,
+            'results': data,
+        })
+
+
+class StandardPagination(PageNumberPagination):
+    """
+    Page number pagination that switches to keyset pagination on request.
+
+    Views opt into keyset mode by declaring ``cursor_orderings``, a mapping of
+    accepted ``?ordering=`` values to unique orderings; the first entry is the
+    default.
+    """
+    page_size = DEFAULT_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = MAX_PAGE_SIZE
+    mode_query_param = 'pagination'
+
+    keyset = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = self.get_cursor_ordering(request, view)
+        if ordering is not None:
+            self.keyset = KeysetPagination(ordering, self.page_size, self.max_page_size)
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_cursor_ordering(self, request, view):
+        cursor_orderings = getattr(view, 'cursor_orderings', None)
+        wants_cursor = (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
+        if not cursor_orderings or not wants_cursor:
+            return None
+        requested = request.query_params.get('ordering')
+        if requested in cursor_orderings:
+            return cursor_orderings[requested]
+        return next(iter(cursor_orderings.values()))
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,28 @@
+# movie/parsers.py
+import codecs
+import csv
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class CSVParser(BaseParser):
+    """
+    Parse a CSV body with a header row into a list of dicts.
+
+    Empty cells are left out of the rows so optional columns can be blank.
+    """
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            reader = csv.DictReader(codecs.iterdecode(stream, encoding))
+            return [
+                {name.strip(): value.strip() for name, value in row.items() if name and value and value.strip()}
+                for row in reader
+            ]
+        except (csv.Error, UnicodeDecodeError) as exc:
+            raise ParseError(f'CSV parse error - {exc}')
@@ -0,0 +1,140 @@
+# movie/preferences.py
+"""
+Per-user quiz preference profiles for the recommendation engine.
+
+A profile is parsed once from the user's ``Answer`` rows and cached across
+requests, so scoring never has to go back to the database for quiz answers.
+Saving or deleting an answer drops the cached profile (see ``movie/signals.py``).
+
+Category weights for quiz answers come from ``QuestionAnswerWeight`` rows,
+compiled into an in-process ``(question_id, answer) -> {category_id: weight}``
+table that is rebuilt whenever a weight is edited.
+"""
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Optional
+
+from django.core.cache import cache
+
+from authentication.models import Answer, QuestionAnswerWeight
+from .versioning import get_version, bump_version
+
+PROFILE_CACHE_KEY = 'movie:preferences:{user_id}'
+PROFILE_CACHE_TIMEOUT = 60 * 60 * 24
+
+WEIGHTS_VERSION_CACHE_KEY = 'movie:answer_weights:version'
+
+# Question text fragments mapped to profile fields, checked in order.
+# Fragments are specific to one question: the viewing context and movie length
+# questions also say "prefer", so a bare "prefer" must never map to a field.
+QUESTION_FIELDS = (
+    ('mood', 'mood'),
+    ('time period', 'era'),
+    ('how do you prefer to watch', 'context'),
+    ('what draws you', 'draw'),
+    ('type of movie', 'movie_type'),
+)
+
+ERAS = ('classic', 'retro', 'modern', 'recent')
+
+
+@dataclass(frozen=True)
+class PreferenceProfile:
+    """Lowercased quiz answers for one user, grouped by what they describe"""
+    mood: Optional[str] = None
+    movie_type: Optional[str] = None
+    era: Optional[str] = None
+    context: Optional[str] = None
+    draw: Optional[str] = None
+    # (question_id, normalized answer) pairs used to look up category weights
+    answers: tuple = ()
+
+
+def normalize_answer(answer_text):
+    return answer_text.strip().lower()
+
+
+def parse_era(answer_text):
+    """Reduce a time period answer such as "Retro (1980-2000)" to its era"""
+    for era in ERAS:
+        if era in answer_text:
+            return era
+    return None
+
+
+def build_preference_profile(user_id):
+    """Build a profile from the user's answers with a single query"""
+    values = {}
+    answer_keys = []
+    answers = Answer.objects.filter(user_id=user_id).values_list('question_id', 'question__question', 'answer')
+
+    for question_id, question_text, answer_text in answers:
+        question_text = question_text.lower()
+        answer_text = normalize_answer(answer_text)
+        answer_keys.append((question_id, answer_text))
+
+        for fragment, field_name in QUESTION_FIELDS:
+            if fragment in question_text:
+                if field_name == 'era':
+                    answer_text = parse_era(answer_text)
+                values.setdefault(field_name, answer_text)
+                break
+
+    return PreferenceProfile(answers=tuple(answer_keys), **values)
+
+
+def get_preference_profile(user):
+    """Return the cached profile for a user, building it on a cache miss"""
+    key = PROFILE_CACHE_KEY.format(user_id=user.pk)
+    profile = cache.get(key)
+    if profile is None:
+        profile = build_preference_profile(user.pk)
+        cache.set(key, profile, PROFILE_CACHE_TIMEOUT)
+    return profile
+
+
+def invalidate_preference_profile(user_id):
+    cache.delete(PROFILE_CACHE_KEY.format(user_id=user_id))
+
+
+def invalidate_answer_weights():
+    bump_version(WEIGHTS_VERSION_CACHE_KEY)
+
+
+class AnswerWeightTable:
+    """Quiz answer weights compiled into an id-keyed lookup"""
+
+    def __init__(self):
+        self.version = None
+        self.weights = {}
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return the table, recompiling it first if any weight changed"""
+        version = get_version(WEIGHTS_VERSION_CACHE_KEY)
+        if version != self.version:
+            with self._lock:
+                if version != self.version:
+                    self._build()
+                    self.version = version
+        return self
+
+    def _build(self):
+        weights = {}
+        rows = QuestionAnswerWeight.objects.values_list('question_id', 'answer', 'category_id', 'weight')
+        for question_id, answer_text, category_id, weight in rows:
+            vector = weights.setdefault((question_id, normalize_answer(answer_text)), {})
+            vector[category_id] = vector.get(category_id, 0) + weight
+        self.weights = weights
+
+    def category_weights(self, answers):
+        """Sum the category weight vectors of the given answer keys"""
+        totals = defaultdict(int)
+        for key in answers:
+            for category_id, weight in self.weights.get(key, {}).items():
+                totals[category_id] += weight
+        return totals
+
+
+answer_weights = AnswerWeightTable()
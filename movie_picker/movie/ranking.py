@@ -0,0 +1,118 @@
+# movie/ranking.py
+"""
+Ranking helpers for the recommendation engine.
+
+Everything here is deterministic: the same inputs and seed always produce the
+same ranking, which is what makes recommendation responses cacheable.
+"""
+import heapq
+import zlib
+
+
+class TopK:
+    """Bounded min-heap that keeps the ``k`` highest scored items"""
+
+    def __init__(self, k):
+        self.k = k
+        self._heap = []
+
+    @property
+    def full(self):
+        return len(self._heap) >= self.k
+
+    @property
+    def threshold(self):
+        """Score an item has to beat to enter a full heap"""
+        return self._heap[0][0] if self.full else float('-inf')
+
+    def push(self, item, score):
+        # Ties are broken in favour of the lower item id to keep results stable
+        entry = (score, -item)
+        if not self.full:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self):
+        """Return ``(item, score)`` pairs, best first"""
+        return [(-negated_item, score) for score, negated_item in sorted(self._heap, reverse=True)]
+
+
+def select_top_k(items, score, k, upper_bound=None):
+    """
+    Stream ``items`` through a bounded heap and return the ``k`` best as
+    ``(item, score)`` pairs, best first.
+
+    Scores are computed lazily, so only ``k`` of them are held at any time.
+    When ``upper_bound`` is given, iteration stops as soon as the heap is full
+    and its weakest entry already reaches the best score any remaining item
+    could get.
+    """
+    if k <= 0:
+        return []
+
+    top = TopK(k)
+    for item in items:
+        if upper_bound is not None and top.full and top.threshold >= upper_bound:
+            break
+        top.push(item, score(item))
+    return top.items()
+
+
+def daily_seed(user_id, day):
+    """Seed that is stable for one user for one day"""
+    return zlib.crc32(f'{user_id}:{day.isoformat()}'.encode())
+
+
+def seeded_jitter(seed, item, spread=10):
+    """Reproducible pseudo-random value in ``1..spread`` for an item"""
+    return zlib.crc32(f'{seed}:{item}'.encode()) % spread + 1
+
+
+def jaccard(first, second):
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+def diversify(scored_items, features, diversity):
+    """
+    Re-rank ``(item, score)`` pairs with maximal marginal relevance.
+
+    Each step picks the item with the best trade-off between its normalised
+    score and its highest Jaccard similarity (over ``features(item)``) to the
+    items already picked. ``diversity`` is the weight of the similarity
+    penalty, from 0 (keep the score order) to 1 (only avoid repetition).
+    Ties keep the incoming order.
+    """
+    remaining = list(scored_items)
+    if not remaining:
+        return []
+
+    scores = [score for item, score in remaining]
+    low, high = min(scores), max(scores)
+    spread = (high - low) or 1
+    relevance = {item: (score - low) / spread for item, score in remaining}
+    feature_sets = {item: set(features(item)) for item, score in remaining}
+    max_similarity = {item: 0.0 for item, score in remaining}
+
+    ranked = []
+    while remaining:
+        best_index = max(
+            range(len(remaining)),
+            key=lambda index: (
+                (1 - diversity) * relevance[remaining[index][0]]
+                - diversity * max_similarity[remaining[index][0]],
+                -index
+            )
+        )
+        picked = remaining.pop(best_index)
+        ranked.append(picked)
+
+        picked_features = feature_sets[picked[0]]
+        for item, score in remaining:
+            similarity = jaccard(feature_sets[item], picked_features)
+            if similarity > max_similarity[item]:
+                max_similarity[item] = similarity
+
+    return ranked
@@ -0,0 +1,264 @@
+# movie/recommender.py
+"""
+Film recommender.
+
+Scores the films available to a user against their quiz answers and review
+history, blended with item-item collaborative filtering scores from the
+neighbours stored by ``compute_film_similarities`` (see
+``movie/collaborative.py``), and returns a ranked pool of film ids. Ranked pools are cached per
+user; the cache entry is dropped when the user's watch history, streaming
+services or quiz answers change, and every entry goes stale when the catalog
+changes or the day rolls over (see ``movie/signals.py``).
+
+Rankings can also be precomputed offline into ``UserRecommendation`` rows by
+the ``precompute_recommendations`` command.
+"""
+import heapq
+from collections import Counter, defaultdict
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .candidates import get_candidate_film_ids, get_candidate_bitset, iter_bitset
+from .collaborative import collaborative_scores
+from .embeddings import film_embeddings
+from .features import film_features, CATEGORY, ACTOR, DIRECTOR
+from .models import WatchedFilm, UserRecommendation
+from .preferences import get_preference_profile, answer_weights
+from .ranking import TopK, diversify, daily_seed, seeded_jitter
+from .stats import get_user_stats
+from .versioning import get_version, bump_version
+
+RECOMMENDATIONS_CACHE_KEY = 'movie:recommendations:{user_id}'
+RECOMMENDATIONS_VERSION_CACHE_KEY = 'movie:recommendations:version'
+
+
+class Recommender:
+    """Rank candidate films for a user"""
+
+    # Points per occurrence of a feature in the user's highly rated films
+    REVIEW_FEATURE_WEIGHTS = {CATEGORY: 15, ACTOR: 20, DIRECTOR: 25}
+
+    # Bonus for films from the user's preferred era, or for new releases when they have none
+    ERA_BONUS = 15
+    NEW_RELEASE_BONUS = 5
+
+    # Films get a daily jitter of 1..JITTER_SPREAD points to keep recommendations varied
+    JITTER_SPREAD = 10
+
+    # Highly rated films whose embedding neighbours become candidates, and neighbours taken from each
+    EMBEDDING_SEED_FILMS = 20
+    EMBEDDING_NEIGHBORS = 100
+
+    def recommend(self, user, service_ids):
+        """Return ranked ``(film_id, score)`` pairs for films on the given services"""
+        # Films available on user's streaming services, excluding already watched films
+        candidate_ids = None
+        if settings.RECOMMENDATION_CANDIDATES == 'embeddings':
+            candidate_ids = self._embedding_candidates(user, service_ids)
+        if candidate_ids is None:
+            candidate_ids = get_candidate_film_ids(user.pk, service_ids)
+        return self._apply_recommendation_logic(user, candidate_ids)
+
+    def _embedding_candidates(self, user, service_ids):
+        """
+        Available films closest to the user's highly rated ones in the embedding
+        index, followed by available films added since the index was built, or
+        None when there are too few of them to fill the pool
+        """
+        index = film_embeddings.get()
+        liked_ids = list(
+            WatchedFilm.objects.filter(user=user, review__gte=4).order_by('-review', '-modified_at')
+            .values_list('film_id', flat=True)[:self.EMBEDDING_SEED_FILMS]
+        )
+        if not liked_ids:
+            return None
+
+        available = get_candidate_bitset(user.pk, service_ids)
+        candidate_ids = [
+            film_id for film_id in index.similar_to_any(liked_ids, self.EMBEDDING_NEIGHBORS)
+            if available >> film_id & 1
+        ]
+        candidate_ids += [film_id for film_id in iter_bitset(available) if film_id not in index]
+        if len(candidate_ids) < settings.RECOMMENDATION_POOL_SIZE:
+            return None
+        return candidate_ids
+
+    def _apply_recommendation_logic(self, user, candidate_ids):
+        """
+        Apply sophisticated recommendation logic based on:
+        1. User's quiz answers
+        2. User's review history (highly rated films)
+        3. Popular films among similar users
+        4. Variety in recommendations
+        """
+        store = film_features.get()
+        seed = daily_seed(user.pk, timezone.localdate())
+
+        # Get user's parsed quiz answers (cached across requests)
+        profile = get_preference_profile(user)
+
+        # Create preference weights based on quiz answers
+        category_weights = self._get_category_weights_from_quiz(profile)
+
+        # Get user's review preferences
+        review_preferences = self._get_review_preferences(user, store)
+
+        # Combine both into one sparse preference vector over feature ids
+        preference_vector = self._build_preference_vector(store, category_weights, review_preferences)
+
+        # Films liked by users who reviewed the same films like this user
+        cf_scores = collaborative_scores(review_preferences['reviews'], review_preferences['avg_rating'])
+
+        # Score films based on multiple factors, keeping only the best ones
+        top_scored = self._rank_candidates(store, candidate_ids, preference_vector, profile.era, seed, cf_scores)
+
+        # Spread the top picks over different categories to keep recommendations varied
+        return diversify(top_scored, lambda film_id: self._category_features(store, film_id),
+                         settings.RECOMMENDATION_DIVERSITY)
+
+    def _category_features(self, store, film_id):
+        return [key for key in store.row(film_id) if key[0] == CATEGORY]
+
+    def _get_category_weights_from_quiz(self, profile):
+        """
+        Map quiz answers to film category preferences, keyed by category id
+        """
+        return answer_weights.get().category_weights(profile.answers)
+
+    def _get_review_preferences(self, user, store):
+        """
+        Analyze user's review history to understand preferences
+        """
+        reviews = dict(
+            WatchedFilm.objects.filter(user=user, review__isnull=False).values_list('film_id', 'review')
+        )
+
+        # Count how often each category, actor and director appears in highly rated films
+        preferred_features = Counter()
+        for film_id, review in reviews.items():
+            if review >= 4:
+                preferred_features.update(store.row(film_id))
+
+        return {
+            'features': preferred_features,
+            'reviews': reviews,
+            'avg_rating': get_user_stats(user.pk).average_review or 0
+        }
+
+    def _build_preference_vector(self, store, category_weights, review_preferences):
+        """
+        Build the user's sparse preference vector keyed like the film feature rows
+        """
+        vector = defaultdict(int)
+
+        # Category-based scoring from quiz answers
+        for category_id, weight in category_weights.items():
+            vector[(CATEGORY, category_id)] += weight * 10
+
+        # Boost categories, actors and directors from the user's review history
+        for key, frequency in review_preferences['features'].items():
+            vector[key] += frequency * self.REVIEW_FEATURE_WEIGHTS[key[0]]
+
+        return vector
+
+    def _rank_candidates(self, store, candidate_ids, preference_vector, time_period_preference, seed, cf_scores):
+        """
+        Return the ``RECOMMENDATION_POOL_SIZE`` best scored candidates as
+        ``(film_id, score)`` pairs, best first.
+
+        A film's score is its base score (sparse dot product with the preference
+        vector, collaborative filtering score and era or new release bonus) plus
+        the daily jitter. Base scores are only accumulated for the films sharing
+        a feature with the vector or having a collaborative filtering score; every
+        other candidate's base is just its bonus. Candidates are then visited by
+        descending base and jitter is only computed until no remaining film can
+        beat the pool's weakest score.
+        """
+        k = settings.RECOMMENDATION_POOL_SIZE
+        if k <= 0:
+            return []
+
+        candidates = set(candidate_ids)
+        if time_period_preference:
+            bonus_films, bonus = store.era_films.get(time_period_preference, frozenset()), self.ERA_BONUS
+        else:
+            bonus_films, bonus = store.new_releases, self.NEW_RELEASE_BONUS
+
+        # Category, actor and director scoring accumulated over the inverted index
+        base = {
+            film_id: score for film_id, score in store.feature_scores(preference_vector).items()
+            if film_id in candidates
+        }
+
+        # Collaborative filtering: predicted review deviation from similar films the user reviewed
+        cf_weight = settings.RECOMMENDATION_CF_WEIGHT
+        for film_id, cf_score in cf_scores.items():
+            if film_id in candidates:
+                base[film_id] = base.get(film_id, 0) + cf_weight * cf_score
+
+        # Time period preferences from quiz, or a boost for newer films without one
+        for film_id in base.keys() & bonus_films:
+            base[film_id] += bonus
+
+        # Every pool film scores at least the k-th best base plus the lowest jitter,
+        # so films that cannot reach it even with the highest jitter are dropped
+        floor = float('-inf')
+        if len(base) >= k:
+            floor = min(heapq.nlargest(k, base.values())) + 1 - self.JITTER_SPREAD
+        scored = sorted(
+            ((score, film_id) for film_id, score in base.items() if score >= floor),
+            key=itemgetter(0), reverse=True
+        )
+
+        others = candidates.difference(base)
+        by_base = heapq.merge(
+            scored,
+            ((bonus, film_id) for film_id in others & bonus_films),
+            ((0, film_id) for film_id in others - bonus_films),
+            key=itemgetter(0), reverse=True
+        )
+
+        top = TopK(k)
+        for score, film_id in by_base:
+            # Ties go to the lower film id, so only stop once the jitter cannot even tie
+            if top.full and top.threshold > score + self.JITTER_SPREAD:
+                break
+            # Add some base scoring to ensure variety, reproducible for the user for the day
+            top.push(film_id, score + seeded_jitter(seed, film_id, self.JITTER_SPREAD))
+        return top.items()
+
+
+def invalidate_recommendations():
+    """Make every cached recommendation pool stale, e.g. after a catalog change"""
+    bump_version(RECOMMENDATIONS_VERSION_CACHE_KEY)
+
+
+def invalidate_user_recommendations(user_id):
+    cache.delete(RECOMMENDATIONS_CACHE_KEY.format(user_id=user_id))
+
+
+def get_recommended_film_ids(user, service_ids):
+    """Return the user's ranked film ids, served from the cache when still fresh"""
+    key = RECOMMENDATIONS_CACHE_KEY.format(user_id=user.pk)
+    stamp = (get_version(RECOMMENDATIONS_VERSION_CACHE_KEY), timezone.localdate().isoformat(), sorted(service_ids))
+
+    cached = cache.get(key)
+    if cached is not None and cached['stamp'] == stamp:
+        return cached['film_ids']
+
+    film_ids = [film_id for film_id, score in Recommender().recommend(user, service_ids)]
+    cache.set(key, {'stamp': stamp, 'film_ids': film_ids}, settings.RECOMMENDATION_CACHE_TIMEOUT)
+    return film_ids
+
+
+def get_precomputed_film_ids(user, service_ids):
+    """
+    Return the user's precomputed ranked film ids, skipping films they have
+    watched or can no longer stream since the ranking was computed
+    """
+    candidates = get_candidate_bitset(user.pk, service_ids)
+    film_ids = UserRecommendation.objects.filter(user=user).order_by('rank').values_list('film_id', flat=True)
+    return [film_id for film_id in film_ids if candidates >> film_id & 1]
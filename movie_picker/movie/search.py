@@ -0,0 +1,155 @@
+# movie/search.py
+"""
+Full-text film search.
+
+Every film has a ``FilmSearchDocument`` row holding its title, overview, cast,
+crew and category names. Migration 0004 indexes those rows with a weighted
+tsvector column and a GIN index on PostgreSQL, or with an external-content
+FTS5 table kept in sync by triggers on SQLite. Other databases fall back to
+``icontains`` matching.
+
+Documents are refreshed once per transaction for every film touched in it
+(see ``movie/signals.py``).
+"""
+import re
+import threading
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Film, FilmSearchDocument, FilmActor, FilmDirector, FilmCategory
+
+SEARCH_MAX_RESULTS = 1000
+FTS_TABLE = 'movie_filmsearch_fts'
+
+_pending = threading.local()
+
+
+def refresh_search_documents(film_ids):
+    """Rebuild the search documents of the given films"""
+    film_ids = set(film_ids)
+    if not film_ids:
+        return
+
+    names = {film_id: {'cast': [], 'crew': [], 'categories': []} for film_id in film_ids}
+    for key, through, fields in (
+        ('cast', FilmActor, ('actor__first_name', 'actor__last_name')),
+        ('crew', FilmDirector, ('director__first_name', 'director__last_name')),
+        ('categories', FilmCategory, ('category__name',)),
+    ):
+        for film_id, *parts in through.objects.filter(film_id__in=film_ids).values_list('film_id', *fields):
+            names[film_id][key].append(' '.join(part for part in parts if part))
+
+    documents = [
+        FilmSearchDocument(
+            film_id=film_id,
+            title=title,
+            overview=overview or '',
+            cast_names=', '.join(names[film_id]['cast']),
+            crew_names=', '.join(names[film_id]['crew']),
+            category_names=', '.join(names[film_id]['categories']),
+        )
+        for film_id, title, overview in Film.objects.filter(id__in=film_ids).values_list('id', 'title', 'overview')
+    ]
+
+    with transaction.atomic():
+        FilmSearchDocument.objects.filter(film_id__in=film_ids).delete()
+        FilmSearchDocument.objects.bulk_create(documents)
+
+
+def schedule_search_refresh(film_ids):
+    """Refresh the documents of the given films once the current transaction commits"""
+    pending = getattr(_pending, 'film_ids', None)
+    if pending is None:
+        pending = _pending.film_ids = set()
+    pending.update(film_ids)
+    transaction.on_commit(flush_search_refresh)
+
+
+def flush_search_refresh():
+    film_ids = getattr(_pending, 'film_ids', None)
+    if film_ids:
+        _pending.film_ids = set()
+        refresh_search_documents(film_ids)
+
+
+def search_terms(query):
+    return re.findall(r'\w+', query.lower())
+
+
+def full_text_match(terms):
+    """
+    ``(sql, params, ranking)`` selecting the ids of films matching every term,
+    with the ORDER BY clause ranking them, or None without a full-text index
+    """
+    if connection.vendor == 'postgresql':
+        sql = (
+            "SELECT film_id FROM movie_filmsearchdocument, to_tsquery('english', %s) query "
+            "WHERE search_vector @@ query"
+        )
+        return sql, [' & '.join(f'{term}:*' for term in terms)], "ts_rank(search_vector, query) DESC, film_id"
+    if connection.vendor == 'sqlite':
+        # Column weights: title, overview, cast, crew, categories
+        sql = f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+        return sql, [' '.join(f'"{term}"*' for term in terms)], f"bm25({FTS_TABLE}, 10.0, 1.0, 5.0, 5.0, 2.0), rowid"
+    return None
+
+
+def matching_documents(terms):
+    """Search documents containing every term, for databases without a full-text index"""
+    documents = FilmSearchDocument.objects.all()
+    for term in terms:
+        documents = documents.filter(
+            Q(title__icontains=term) | Q(overview__icontains=term) | Q(cast_names__icontains=term)
+            | Q(crew_names__icontains=term) | Q(category_names__icontains=term)
+        )
+    return documents
+
+
+def search_film_ids(query, limit=SEARCH_MAX_RESULTS):
+    """Return ids of the best ``limit`` films matching every word of ``query``, best match first"""
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    match = full_text_match(terms)
+    if match is None:
+        return list(matching_documents(terms).order_by('film_id').values_list('film_id', flat=True)[:limit])
+
+    sql, params, ranking = match
+    with connection.cursor() as cursor:
+        cursor.execute(f"{sql} ORDER BY {ranking} LIMIT %s", params + [limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+class FilmFullTextSearchFilter(BaseFilterBackend):
+    """
+    Filter films with ?search= against the full-text index.
+
+    Every match is kept, in the list's own ordering, through a subquery; the
+    ranked and capped results are ``search_film_ids``.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        terms = search_terms(request.query_params.get(self.search_param, ''))
+        if not terms:
+            return queryset
+        match = full_text_match(terms)
+        if match is None:
+            return queryset.filter(id__in=matching_documents(terms).values('film_id'))
+        sql, params, ranking = match
+        return queryset.filter(id__in=RawSQL(sql, params))
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.search_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Full-text search over title, overview, cast, crew and categories',
+                'schema': {'type': 'string'},
+            },
+        ]
@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import (
     Film, Actor, Director, Category, Tag, StreamingService,
@@ -48,14 +49,29 @@ class FilmListSerializer(serializers.ModelSerializer):
             'actors_count', 'directors_count', 'categories_count'
         ]
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        # Used by movie.optimizer.optimize_queryset
+        return queryset.with_counts()
+
+    def _related_count(self, obj, relation):
+        # Prefer counts annotated by Film.objects.with_counts(), then the denormalized
+        # columns when enabled, and only fall back to a COUNT query per row
+        annotated = getattr(obj, f'num_{relation}', None)
+        if annotated is not None:
+            return annotated
+        if settings.FILM_COUNTS_SOURCE == 'denormalized':
+            return getattr(obj, f'{relation}_count')
+        return getattr(obj, relation).count()
+
     def get_actors_count(self, obj):
-        return obj.actors.count()
+        return self._related_count(obj, 'actors')
 
     def get_directors_count(self, obj):
-        return obj.directors.count()
+        return self._related_count(obj, 'directors')
 
     def get_categories_count(self, obj):
-        return obj.categories.count()
+        return self._related_count(obj, 'categories')
 
 
 class FilmDetailSerializer(serializers.ModelSerializer):
@@ -178,3 +194,15 @@ class WatchedFilmWithDetailsSerializer(serializers.ModelSerializer):
     class Meta:
         model = WatchedFilm
         fields = ['id', 'film', 'user_username', 'review', 'created_at', 'modified_at']
+
+
+class WatchedFilmImportRowSerializer(serializers.Serializer):
+    """One row of a watched film import, naming the film by id or TMDb id"""
+    film = serializers.IntegerField(required=False)
+    tmdb_id = serializers.IntegerField(required=False)
+    review = serializers.IntegerField(required=False, allow_null=True)
+
+    def validate(self, attrs):
+        if 'film' not in attrs and 'tmdb_id' not in attrs:
+            raise serializers.ValidationError('Either film or tmdb_id is required.')
+        return attrs
@@ -0,0 +1,237 @@
+# movie/signals.py
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from authentication.models import Answer, QuestionAnswerWeight, UserStreamingService
+from authentication.signals import preferences_changed
+from .autocomplete import autocomplete_index, film_entry, person_entry, FILMS, ACTORS, DIRECTORS
+from .candidates import invalidate_service_candidates, invalidate_watched_candidates
+from .features import invalidate_film_features
+from .models import (
+    Film, Actor, Director, Category, FilmCategory, FilmActor, FilmDirector, FilmStreamingService,
+    StreamingService, WatchedFilm, UserStats
+)
+from .preferences import invalidate_preference_profile, invalidate_answer_weights
+from .recommender import invalidate_recommendations, invalidate_user_recommendations
+from .search import schedule_search_refresh
+from .stats import record_watched_saved, record_watched_deleted, refresh_service_counts
+
+M2M_WRITE_ACTIONS = ('post_add', 'post_remove', 'post_clear')
+
+
+@receiver(post_save, sender=Film)
+@receiver(post_delete, sender=Film)
+@receiver(post_save, sender=FilmCategory)
+@receiver(post_delete, sender=FilmCategory)
+@receiver(post_save, sender=FilmActor)
+@receiver(post_delete, sender=FilmActor)
+@receiver(post_save, sender=FilmDirector)
+@receiver(post_delete, sender=FilmDirector)
+def film_features_changed(sender, **kwargs):
+    invalidate_film_features()
+    invalidate_recommendations()
+
+
+@receiver(m2m_changed, sender=FilmCategory)
+@receiver(m2m_changed, sender=FilmActor)
+@receiver(m2m_changed, sender=FilmDirector)
+def film_relations_changed(sender, action, **kwargs):
+    if action in M2M_WRITE_ACTIONS:
+        invalidate_film_features()
+        invalidate_recommendations()
+
+
+@receiver(post_save, sender=Answer)
+@receiver(post_delete, sender=Answer)
+def quiz_answer_changed(sender, instance, **kwargs):
+    invalidate_preference_profile(instance.user_id)
+    invalidate_user_recommendations(instance.user_id)
+
+
+@receiver(preferences_changed)
+def user_preferences_changed(sender, user_id, **kwargs):
+    invalidate_preference_profile(user_id)
+    invalidate_user_recommendations(user_id)
+
+
+@receiver(post_save, sender=QuestionAnswerWeight)
+@receiver(post_delete, sender=QuestionAnswerWeight)
+def answer_weight_changed(sender, **kwargs):
+    invalidate_answer_weights()
+    invalidate_recommendations()
+
+
+@receiver(post_save, sender=FilmStreamingService)
+@receiver(post_delete, sender=FilmStreamingService)
+def film_availability_changed(sender, instance, **kwargs):
+    invalidate_service_candidates([instance.streaming_service_id])
+    invalidate_recommendations()
+
+
+@receiver(m2m_changed, sender=FilmStreamingService)
+def film_streaming_services_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in M2M_WRITE_ACTIONS:
+        return
+    if reverse:
+        invalidate_service_candidates([instance.pk])
+    elif pk_set is not None:
+        invalidate_service_candidates(pk_set)
+    else:
+        # Cleared without knowing which services were affected
+        invalidate_service_candidates(StreamingService.objects.values_list('id', flat=True))
+    invalidate_recommendations()
+
+
+@receiver(post_save, sender=WatchedFilm)
+@receiver(post_delete, sender=WatchedFilm)
+def watched_film_changed(sender, instance, **kwargs):
+    if kwargs.get('created', True):
+        invalidate_watched_candidates(instance.user_id)
+    # A new or changed review also changes the user's preferences
+    invalidate_user_recommendations(instance.user_id)
+
+
+@receiver(post_save, sender=UserStreamingService)
+@receiver(post_delete, sender=UserStreamingService)
+def user_streaming_service_changed(sender, instance, **kwargs):
+    invalidate_user_recommendations(instance.user_id)
+
+
+@receiver(m2m_changed, sender=UserStreamingService)
+def user_streaming_services_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in M2M_WRITE_ACTIONS:
+        return
+    if not reverse:
+        invalidate_user_recommendations(instance.pk)
+    elif pk_set is not None:
+        for user_id in pk_set:
+            invalidate_user_recommendations(user_id)
+    else:
+        invalidate_recommendations()
+
+
+@receiver(post_save, sender=FilmCategory)
+@receiver(post_delete, sender=FilmCategory)
+@receiver(post_save, sender=FilmActor)
+@receiver(post_delete, sender=FilmActor)
+@receiver(post_save, sender=FilmDirector)
+@receiver(post_delete, sender=FilmDirector)
+def film_relation_row_changed(sender, instance, **kwargs):
+    Film.objects.filter(pk=instance.film_id).refresh_counts()
+
+
+@receiver(m2m_changed, sender=FilmCategory)
+@receiver(m2m_changed, sender=FilmActor)
+@receiver(m2m_changed, sender=FilmDirector)
+def film_relation_counts_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in M2M_WRITE_ACTIONS:
+        return
+    if not reverse:
+        Film.objects.filter(pk=instance.pk).refresh_counts()
+    elif pk_set is not None:
+        Film.objects.filter(pk__in=pk_set).refresh_counts()
+    else:
+        # Cleared from the other side without knowing which films were affected
+        Film.objects.refresh_counts()
+
+
+@receiver(post_save, sender=Film)
+def film_search_document_changed(sender, instance, **kwargs):
+    schedule_search_refresh([instance.pk])
+
+
+@receiver(post_save, sender=FilmCategory)
+@receiver(post_delete, sender=FilmCategory)
+@receiver(post_save, sender=FilmActor)
+@receiver(post_delete, sender=FilmActor)
+@receiver(post_save, sender=FilmDirector)
+@receiver(post_delete, sender=FilmDirector)
+def film_relation_search_changed(sender, instance, **kwargs):
+    schedule_search_refresh([instance.film_id])
+
+
+@receiver(m2m_changed, sender=FilmCategory)
+@receiver(m2m_changed, sender=FilmActor)
+@receiver(m2m_changed, sender=FilmDirector)
+def film_relations_search_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in M2M_WRITE_ACTIONS:
+        return
+    if not reverse:
+        schedule_search_refresh([instance.pk])
+    elif pk_set is not None:
+        schedule_search_refresh(pk_set)
+    else:
+        schedule_search_refresh(Film.objects.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Actor)
+@receiver(post_save, sender=Director)
+@receiver(post_save, sender=Category)
+def film_search_names_changed(sender, instance, created, **kwargs):
+    if created:
+        return
+    through, field = {
+        Actor: (FilmActor, 'actor'),
+        Director: (FilmDirector, 'director'),
+        Category: (FilmCategory, 'category'),
+    }[sender]
+    schedule_search_refresh(through.objects.filter(**{field: instance}).values_list('film_id', flat=True))
+
+
+AUTOCOMPLETE_KINDS = {Film: FILMS, Actor: ACTORS, Director: DIRECTORS}
+
+
+@receiver(post_save, sender=Film)
+@receiver(post_save, sender=Actor)
+@receiver(post_save, sender=Director)
+def autocomplete_entry_saved(sender, instance, **kwargs):
+    entry = film_entry(instance) if sender is Film else person_entry(instance)
+    transaction.on_commit(lambda: autocomplete_index.update(AUTOCOMPLETE_KINDS[sender], entry))
+
+
+@receiver(post_delete, sender=Film)
+@receiver(post_delete, sender=Actor)
+@receiver(post_delete, sender=Director)
+def autocomplete_entry_deleted(sender, instance, **kwargs):
+    item_id = instance.pk
+    transaction.on_commit(lambda: autocomplete_index.remove(AUTOCOMPLETE_KINDS[sender], item_id))
+
+
+@receiver(pre_save, sender=WatchedFilm)
+def watched_film_saving(sender, instance, update_fields=None, **kwargs):
+    # Remember the stored review so the stats can move it to the new value
+    if instance._state.adding or (update_fields is not None and 'review' not in update_fields):
+        instance._stored_review = instance.review
+    else:
+        instance._stored_review = (
+            WatchedFilm.objects.filter(pk=instance.pk).values_list('review', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=WatchedFilm)
+def watched_film_stats_saved(sender, instance, created, **kwargs):
+    record_watched_saved(instance, created, getattr(instance, '_stored_review', instance.review))
+
+
+@receiver(post_delete, sender=WatchedFilm)
+def watched_film_stats_deleted(sender, instance, **kwargs):
+    record_watched_deleted(instance)
+
+
+@receiver(post_save, sender=UserStreamingService)
+@receiver(post_delete, sender=UserStreamingService)
+def user_service_count_changed(sender, instance, **kwargs):
+    refresh_service_counts([instance.user_id])
+
+
+@receiver(m2m_changed, sender=UserStreamingService)
+def user_service_counts_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in M2M_WRITE_ACTIONS:
+        return
+    if not reverse:
+        refresh_service_counts([instance.pk])
+    elif pk_set is not None:
+        refresh_service_counts(pk_set)
+    else:
+        refresh_service_counts(UserStats.objects.values_list('user_id', flat=True))
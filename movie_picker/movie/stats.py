@@ -0,0 +1,139 @@
+# movie/stats.py
+"""
+Materialized per-user statistics.
+
+``UserStats`` rows hold the watch history aggregates shown on the dashboard
+and used by the recommender. Signals apply each ``WatchedFilm`` save or
+delete and each streaming service change as a delta under a row lock, so
+reading the stats is one primary key lookup. Rows are built from scratch on
+first read; until then there is nothing to update. Writes that bypass
+signals (bulk imports) call ``rebuild_user_stats``, and the
+``rebuild_user_stats`` command repairs any drift for every user.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count
+
+from authentication.models import User, UserStreamingService
+from .models import WatchedFilm, UserStats
+
+REBUILD_CHUNK_SIZE = 1000
+
+STATS_FIELDS = ['watched_count', 'reviewed_count', 'review_sum', 'service_count', 'rating_histogram']
+
+
+def compute_user_stats(user_ids):
+    """Unsaved ``UserStats`` computed from the source tables for each of ``user_ids``"""
+    stats = {user_id: UserStats(user_id=user_id) for user_id in user_ids}
+    watched = (
+        WatchedFilm.objects.filter(user_id__in=stats).order_by().values('user_id', 'review')
+        .annotate(films=Count('id'))
+    )
+    for row in watched:
+        user_stats = stats[row['user_id']]
+        user_stats.watched_count += row['films']
+        if row['review'] is not None:
+            user_stats.reviewed_count += row['films']
+            user_stats.review_sum += row['review'] * row['films']
+            user_stats.rating_histogram[str(row['review'])] = row['films']
+
+    services = (
+        UserStreamingService.objects.filter(user_id__in=stats).order_by().values('user_id')
+        .annotate(services=Count('id'))
+    )
+    for row in services:
+        stats[row['user_id']].service_count = row['services']
+    return stats
+
+
+def rebuild_user_stats(user_ids=None):
+    """
+    Recompute and store the stats of ``user_ids`` (every user by default).
+
+    Returns the ids of users whose stored stats were missing or differed.
+    """
+    if user_ids is None:
+        user_ids = User.objects.order_by('id').values_list('id', flat=True)
+    user_ids = list(user_ids)
+
+    drifted = []
+    for start in range(0, len(user_ids), REBUILD_CHUNK_SIZE):
+        computed = compute_user_stats(user_ids[start:start + REBUILD_CHUNK_SIZE])
+        stored = UserStats.objects.in_bulk(computed.keys())
+        drifted += [
+            user_id for user_id, stats in computed.items()
+            if user_id not in stored or _values(stored[user_id]) != _values(stats)
+        ]
+        UserStats.objects.bulk_create(
+            computed.values(),
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=STATS_FIELDS + ['updated_at'],
+        )
+    return drifted
+
+
+def _values(stats):
+    return [getattr(stats, name) for name in STATS_FIELDS]
+
+
+def get_user_stats(user_id):
+    """Return the user's stats, building the row on first use"""
+    stats = UserStats.objects.filter(user_id=user_id).first()
+    if stats is None:
+        rebuild_user_stats([user_id])
+        stats = UserStats.objects.get(user_id=user_id)
+    return stats
+
+
+def update_user_stats(user_id, change):
+    """
+    Apply ``change(stats)`` to the user's stored stats under a row lock.
+
+    Users without a stats row are left alone: the row is computed from the
+    source tables on first read, and creating it here could race the
+    deletion of the user.
+    """
+    with transaction.atomic():
+        stats = UserStats.objects.select_for_update().filter(user_id=user_id).first()
+        if stats is None:
+            return
+        change(stats)
+        stats.save(update_fields=STATS_FIELDS + ['updated_at'])
+
+
+def record_watched_saved(instance, created, previous_review):
+    if created:
+        def change(stats):
+            stats.watched_count += 1
+            stats.count_review(instance.review, 1)
+    elif previous_review != instance.review:
+        def change(stats):
+            stats.count_review(previous_review, -1)
+            stats.count_review(instance.review, 1)
+    else:
+        return
+    update_user_stats(instance.user_id, change)
+
+
+def record_watched_deleted(instance):
+    def change(stats):
+        stats.watched_count -= 1
+        stats.count_review(instance.review, -1)
+    update_user_stats(instance.user_id, change)
+
+
+def refresh_service_counts(user_ids):
+    """Recount the streaming services of users that have a stats row"""
+    counts = defaultdict(int)
+    rows = (
+        UserStreamingService.objects.filter(user_id__in=user_ids).order_by().values('user_id')
+        .annotate(services=Count('id'))
+    )
+    for row in rows:
+        counts[row['user_id']] = row['services']
+    for stats in UserStats.objects.filter(user_id__in=user_ids):
+        if stats.service_count != counts[stats.user_id]:
+            stats.service_count = counts[stats.user_id]
+            stats.save(update_fields=['service_count', 'updated_at'])
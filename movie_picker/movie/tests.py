@@ -1,16 +1,44 @@
 # I love tests by Claude 4.0 <3
 
-from django.test import TestCase
+from django.apps import apps as django_apps
+from django.test import TestCase, override_settings
+from django.core.cache import cache
 from django.core.management import call_command
-from django.db import IntegrityError
-from datetime import date
+from django.utils import timezone
+from django.db import IntegrityError, connection
+import base64
+import json
+import os
+import random
+import tempfile
+import time
+from importlib import import_module
+from io import StringIO
+from datetime import date, timedelta
+from unittest import skipUnless
 from unittest.mock import patch, MagicMock
+from rest_framework.test import APIClient
 
 from .models import (
     Film, Actor, Director, Category, Tag, StreamingService,
-    FilmActor, FilmDirector, FilmCategory, WatchedFilm
+    FilmActor, FilmDirector, FilmCategory, FilmStreamingService, WatchedFilm,
+    UserRecommendation, CatalogSyncState, IngestionRun, UserStats, FilmSimilarity
 )
-from authentication.models import User
+from .candidates import to_bitset, iter_bitset, get_candidate_film_ids, get_watched_bitset
+from .features import film_features, release_era, CATEGORY, ACTOR
+from .ranking import TopK, select_top_k, diversify, daily_seed, seeded_jitter
+from .preferences import get_preference_profile, answer_weights
+from .search import search_film_ids
+from .stats import get_user_stats, compute_user_stats
+from .collaborative import item_similarities, collaborative_scores
+from .embeddings import film_embeddings, build_film_embeddings, embed
+from .recommender import Recommender, RECOMMENDATIONS_VERSION_CACHE_KEY
+from .versioning import get_version
+from .tmdb import TMDbClient, RateLimiter
+from .tmdb_cache import ResponseCache, OfflineCacheMiss
+from .autocomplete import autocomplete_index, PrefixIndex
+from .management.commands.sync_catalog import Command as SyncCatalogCommand, FETCH_WINDOW_PER_WORKER
+from authentication.models import User, UserStreamingService, Question, Answer, QuestionAnswerWeight
 
 
 class MovieModelsTest(TestCase):
@@ -91,65 +119,213 @@ class MovieModelsTest(TestCase):
         self.assertIsNotNone(self.director.created_at)
 
 
+def replay_cache(test_case, responses):
+    """Response cache file holding ``{(path, params): data}``, used to replay TMDb offline"""
+    handle, path = tempfile.mkstemp(suffix='.sqlite3')
+    os.close(handle)
+    test_case.addCleanup(os.remove, path)
+    response_cache = ResponseCache(path)
+    for (request_path, params), data in responses.items():
+        response_cache.store(request_path, dict(params), data)
+    response_cache.close()
+    return path
+
+
 class MovieSeedCommandTest(TestCase):
     """Test the database seeding command"""
 
-    @patch('movie.management.commands.db_seed.requests.get')
-    def test_db_seed_command_with_mock_data(self, mock_get):
-        """Test the db_seed command with mocked API responses"""
-
-        # TODO: Configure
-        mock_movie_response = MagicMock()
-        mock_movie_response.json.return_value = {
-            'results': [
-                {
-                    'id': 123,
-                    'title': 'Test Movie',
-                    'release_date': '2023-01-01',
-                    'original_language': 'en',
-                    'genre_ids': [28, 12]  # Action, Adventure
-                }
-            ]
-        }
-        mock_movie_response.raise_for_status.return_value = None
-
-        # TODO: configure
-        mock_detail_response = MagicMock()
-        mock_detail_response.json.return_value = {
-            'credits': {
-                'cast': [
-                    {'name': 'Test Actor', 'id': 1},
-                    {'name': 'Another Actor', 'id': 2}
-                ],
-                'crew': [
-                    {'name': 'Test Director', 'job': 'Director', 'id': 3}
+    def test_db_seed_command_with_mock_data(self):
+        """Test the db_seed command replaying cached API responses"""
+        cache_path = replay_cache(self, {
+            ('/movie/popular', (('page', 1), ('language', 'en-US'))): {
+                'results': [
+                    {
+                        'id': 123,
+                        'title': 'Test Movie',
+                        'release_date': '2023-01-01',
+                        'original_language': 'en',
+                        'genre_ids': [28, 12]  # Action, Adventure
+                    }
                 ]
-            }
-        }
-        mock_detail_response.raise_for_status.return_value = None
-
-        # TODO: configure
-        def mock_requests_get(url, params=None):
-            if 'movie/popular' in url:
-                return mock_movie_response
-            elif 'movie/123' in url:
-                return mock_detail_response
-            return mock_movie_response
+            },
+            ('/movie/123', (('append_to_response', 'credits'),)): {
+                'credits': {
+                    'cast': [
+                        {'name': 'Test Actor', 'id': 1},
+                        {'name': 'Another Actor', 'id': 2}
+                    ],
+                    'crew': [
+                        {'name': 'Test Director', 'job': 'Director', 'id': 3}
+                    ]
+                }
+            },
+            ('/movie/123/watch/providers', ()): {'results': {}},
+        })
 
-        mock_get.side_effect = mock_requests_get
+        handle, metrics_path = tempfile.mkstemp(suffix='.json')
+        os.close(handle)
+        self.addCleanup(os.remove, metrics_path)
 
         try:
             with patch.dict('os.environ', {'TMDB_API_KEY': 'test_key'}):
-                call_command('db_seed', '--popular', '--pages', '1', verbosity=0)
+                call_command(
+                    'db_seed', '--popular', '--pages', '1', '--offline', '--http-cache', cache_path,
+                    '--metrics-json', metrics_path, verbosity=0
+                )
         except Exception as e:
             self.fail(f"db_seed command raised an exception: {e}")
 
+        with open(metrics_path) as metrics_file:
+            metrics = json.load(metrics_file)
+        self.assertEqual(metrics['counters']['created'], 1)
+        self.assertEqual(metrics['counters']['fetched'], 1)
+        self.assertEqual(metrics['counters']['http_cache_hits'], 3)
+        self.assertEqual(metrics['stages']['db']['calls'], 1)
+
         # check if data created
         self.assertTrue(Film.objects.filter(title='Test Movie').exists())
         self.assertTrue(Actor.objects.filter(first_name='Test').exists())
         self.assertTrue(Director.objects.filter(first_name='Test').exists())
         self.assertTrue(Category.objects.filter(name='Action').exists())
 
+    def test_db_seed_resumes_unfinished_run(self):
+        """Test that --resume skips the pages an interrupted run already completed"""
+        interrupted = IngestionRun.objects.create(
+            command='db_seed', parameters={'movie_lists': ['popular'], 'pages': 2},
+            completed_pages={'popular': [1]}, completed_tmdb_ids=[1]
+        )
+        # Page 1 is not in the cache, fetching it again would fail
+        cache_path = replay_cache(self, {
+            ('/movie/popular', (('page', 2), ('language', 'en-US'))): {'results': [
+                {'id': 1, 'title': 'Alien', 'release_date': '1979-05-25'},
+                {'id': 2, 'title': 'Aliens', 'release_date': '1986-07-18'},
+            ]},
+            ('/movie/2', (('append_to_response', 'credits'),)): {'credits': {}},
+            ('/movie/2/watch/providers', ()): {'results': {}},
+        })
+
+        with patch.dict('os.environ', {'API_KEY_TMDB': 'test_key'}):
+            call_command(
+                'db_seed', '--popular', '--pages', '2', '--resume', '--offline', '--http-cache', cache_path,
+                verbosity=0
+            )
+
+        self.assertEqual(list(Film.objects.values_list('title', flat=True)), ['Aliens'])
+        interrupted.refresh_from_db()
+        self.assertEqual(interrupted.status, IngestionRun.COMPLETED)
+        self.assertEqual(interrupted.completed_pages, {'popular': [1, 2]})
+        self.assertEqual(interrupted.completed_tmdb_ids, [1, 2])
+        self.assertEqual(IngestionRun.objects.count(), 1)
+
+    def test_db_seed_stops_workers_when_processing_fails(self):
+        """Test that an error while saving movies ends the command instead of blocking on the full queue"""
+        cache_path = replay_cache(self, {
+            ('/movie/popular', (('page', 1), ('language', 'en-US'))): {'results': [
+                {'id': tmdb_id, 'title': f'Movie {tmdb_id}'} for tmdb_id in range(1, 41)
+            ]},
+        })
+
+        started = time.monotonic()
+        with patch.dict('os.environ', {'API_KEY_TMDB': 'test_key'}), \
+                patch('movie.management.commands.db_seed.Command.process_movie', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                call_command(
+                    'db_seed', '--popular', '--pages', '1', '--workers', '1', '--offline',
+                    '--http-cache', cache_path, verbosity=0
+                )
+
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertEqual(IngestionRun.objects.get().status, IngestionRun.FAILED)
+
+    @patch('movie.tmdb.requests.Session.get')
+    def test_tmdb_client_revalidates_stale_responses(self, mock_get):
+        response_cache = ResponseCache(replay_cache(self, {}), ttl=0)
+        self.addCleanup(response_cache.close)
+        client = TMDbClient('test_key', rate_limit=0, cache=response_cache)
+
+        fetched = MagicMock(status_code=200, headers={'ETag': '"v1"'})
+        fetched.json.return_value = {'results': [1]}
+        mock_get.return_value = fetched
+        self.assertEqual(client.movie_list('popular', 1), {'results': [1]})
+
+        mock_get.return_value = MagicMock(status_code=304, headers={})
+        self.assertEqual(client.movie_list('popular', 1), {'results': [1]})
+        self.assertEqual(mock_get.call_args.kwargs['headers'], {'If-None-Match': '"v1"'})
+
+        offline = TMDbClient('test_key', cache=response_cache, offline=True)
+        self.assertEqual(offline.movie_list('popular', 1), {'results': [1]})
+        with self.assertRaises(OfflineCacheMiss):
+            offline.movie_list('popular', 2)
+
+    def test_db_seed_bulk_mode(self):
+        """Test that bulk mode writes films, people, genres and providers in batches"""
+        existing = Actor.objects.create(first_name="Sigourney", last_name="Weaver")
+        cache_path = replay_cache(self, {
+            ('/movie/popular', (('page', 1), ('language', 'en-US'))): {'results': [
+                {'id': 1, 'title': 'Alien', 'release_date': '1979-05-25', 'genre_ids': [27, 878]},
+                {'id': 2, 'title': 'Aliens', 'release_date': '1986-07-18', 'genre_ids': [28, 878]},
+                {'id': 3, 'title': 'Alien', 'release_date': '2000-01-01', 'genre_ids': []},
+            ]},
+            ('/movie/1', (('append_to_response', 'credits'),)): {'credits': {
+                'cast': [{'name': 'Sigourney Weaver'}, {'name': 'Tom Skerritt'}],
+                'crew': [{'name': 'Ridley Scott', 'job': 'Director'}],
+            }},
+            ('/movie/2', (('append_to_response', 'credits'),)): {'credits': {
+                'cast': [{'name': 'Sigourney Weaver'}, {'name': 'Michael Biehn'}],
+                'crew': [{'name': 'James Cameron', 'job': 'Director'}],
+            }},
+            ('/movie/1/watch/providers', ()): {'results': {'US': {
+                'flatrate': [{'provider_id': 8, 'provider_name': 'Netflix'}],
+                'rent': [{'provider_id': 2, 'provider_name': 'Apple TV'}],
+            }}},
+            ('/movie/2/watch/providers', ()): {'results': {'US': {
+                'flatrate': [{'provider_id': 8, 'provider_name': 'Netflix'}],
+            }}},
+        })
+
+        with patch.dict('os.environ', {'API_KEY_TMDB': 'test_key'}):
+            call_command(
+                'db_seed', '--popular', '--pages', '1', '--bulk', '--batch-size', '2',
+                '--offline', '--http-cache', cache_path, verbosity=0
+            )
+
+        alien = Film.objects.get(title='Alien')
+        self.assertEqual(Film.objects.count(), 2)
+        self.assertEqual(Actor.objects.filter(first_name="Sigourney").count(), 1)
+        self.assertEqual(
+            set(FilmActor.objects.filter(actor=existing).values_list('film__title', flat=True)),
+            {'Alien', 'Aliens'}
+        )
+        self.assertEqual(set(alien.categories.values_list('name', flat=True)), {'Horror', 'Science Fiction'})
+        self.assertEqual(set(alien.streaming_services.values_list('name', flat=True)), {'Netflix', 'Apple TV'})
+        self.assertEqual(StreamingService.objects.count(), 2)
+        self.assertEqual((alien.actors_count, alien.directors_count, alien.categories_count), (2, 1, 2))
+        self.assertEqual(search_film_ids("ridley"), [alien.id])
+
+    @patch('movie.tmdb.time.sleep')
+    @patch('movie.tmdb.requests.Session.get')
+    def test_tmdb_client_retries_rate_limited_requests(self, mock_get, mock_sleep):
+        limited = MagicMock(status_code=429, headers={'Retry-After': '2'})
+        ok = MagicMock(status_code=200)
+        ok.json.return_value = {'results': []}
+        mock_get.side_effect = [limited, ok]
+
+        data = TMDbClient('test_key', rate_limit=0).movie_list('popular', 1)
+
+        self.assertEqual(data, {'results': []})
+        mock_sleep.assert_called_once_with(2.0)
+        self.assertEqual(mock_get.call_args.kwargs['params']['api_key'], 'test_key')
+
+    def test_rate_limiter_spaces_requests(self):
+        limiter = RateLimiter(rate=10, burst=1)
+        with patch('movie.tmdb.time.sleep') as mock_sleep:
+            limiter.acquire()
+            mock_sleep.assert_not_called()
+            with patch('movie.tmdb.time.monotonic', return_value=limiter.updated):
+                mock_sleep.side_effect = lambda seconds: setattr(limiter, 'tokens', 1)
+                limiter.acquire()
+            self.assertAlmostEqual(mock_sleep.call_args.args[0], 0.1)
+
     def test_db_seed_command_help(self):
         """Test that the command help works"""
         try:
@@ -158,6 +334,27 @@ class MovieSeedCommandTest(TestCase):
         except SystemExit:
             pass
 
+    def test_db_seed_questions_seeds_answer_weights(self):
+        """Test that seeding questions also seeds their category weights"""
+        with patch.dict('os.environ', {'API_KEY_TMDB': 'test_key'}):
+            call_command('db_seed', '--questions', '--http-cache', '', verbosity=0)
+
+        question = Question.objects.get(question="What's your mood today?")
+        weight = QuestionAnswerWeight.objects.get(question=question, answer="Jittery", category__name="Horror")
+        self.assertEqual(weight.weight, 3)
+
+        table = answer_weights.get()
+        weights = table.category_weights([(question.id, "jittery")])
+        self.assertEqual(weights[weight.category_id], 3)
+
+    @patch('movie.management.commands.db_seed.ResponseCache')
+    def test_db_seed_questions_skips_response_cache(self, response_cache):
+        """Test that seeding only questions does not open the TMDb response cache"""
+        with patch.dict('os.environ', {'API_KEY_TMDB': 'test_key', 'TMDB_CACHE_PATH': 'tmdb_cache.sqlite3'}):
+            call_command('db_seed', '--questions', verbosity=0)
+
+        response_cache.assert_not_called()
+
     def test_db_seed_without_api_key(self):
         """Test that command fails gracefully without API key"""
         with patch.dict('os.environ', {}, clear=True):
@@ -200,3 +397,1280 @@ class WatchedFilmTest(TestCase):
 
         with self.assertRaises(IntegrityError):
             WatchedFilm.objects.create(film=self.film, user=self.user, review=9)
+
+
+class WatchedFilmImportExportTest(TestCase):
+    """Test bulk import and streaming export of watched films"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="importer", email="importer@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.alien = Film.objects.create(title="Alien", release_date=date(1979, 1, 1), language="en", tmdb_id=348)
+        self.heat = Film.objects.create(title="Heat", release_date=date(1995, 1, 1), language="en", tmdb_id=949)
+        self.big = Film.objects.create(title="Big", release_date=date(1988, 1, 1), language="en")
+
+    def test_json_import_upserts_and_reports_every_row(self):
+        WatchedFilm.objects.create(film=self.alien, user=self.user, review=2)
+        rows = [
+            {'film': self.alien.id, 'review': 5},
+            {'tmdb_id': 949, 'review': 4},
+            {'film': self.big.id, 'review': 1},
+            {'film': self.big.id, 'review': 3},
+            {'tmdb_id': 1},
+            {'review': 4},
+        ]
+
+        response = self.client.post('/api/v1/movies/watched/import/', rows, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [result['status'] for result in response.data['results']],
+            ['updated', 'created', 'duplicate', 'created', 'error', 'error']
+        )
+        self.assertEqual((response.data['created'], response.data['updated'], response.data['error']), (2, 1, 2))
+        self.assertEqual(
+            dict(WatchedFilm.objects.filter(user=self.user).values_list('film__title', 'review')),
+            {"Alien": 5, "Heat": 4, "Big": 3}
+        )
+
+    def test_import_runs_a_fixed_number_of_queries(self):
+        rows = [{'film': self.alien.id}, {'tmdb_id': 949, 'review': 4}, {'film': self.big.id, 'review': 2}]
+
+        # Resolve films, existing rows and one upsert inside a savepoint, then four to rebuild the stats
+        with self.assertNumQueries(9):
+            self.client.post('/api/v1/movies/watched/import/', rows, format='json')
+
+        self.assertEqual(WatchedFilm.objects.filter(user=self.user).count(), 3)
+
+    def test_import_drops_cached_watched_set(self):
+        self.assertEqual(get_watched_bitset(self.user.id), 0)
+
+        self.client.post('/api/v1/movies/watched/import/', [{'film': self.heat.id}], format='json')
+
+        self.assertEqual(list(iter_bitset(get_watched_bitset(self.user.id))), [self.heat.id])
+
+    def test_csv_import(self):
+        body = f"film,tmdb_id,review\n{self.big.id},,4\n,348,\n"
+
+        response = self.client.post('/api/v1/movies/watched/import/', body, content_type='text/csv')
+
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(
+            dict(WatchedFilm.objects.filter(user=self.user).values_list('film__title', 'review')),
+            {"Big": 4, "Alien": None}
+        )
+
+    def test_import_rejects_non_list_and_oversized_bodies(self):
+        response = self.client.post('/api/v1/movies/watched/import/', {'film': self.big.id}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        with override_settings(WATCHED_IMPORT_MAX_ROWS=1):
+            response = self.client.post(
+                '/api/v1/movies/watched/import/', [{'film': self.big.id}, {'film': self.heat.id}], format='json'
+            )
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_streams_csv_that_can_be_imported(self):
+        WatchedFilm.objects.create(film=self.alien, user=self.user, review=5)
+        WatchedFilm.objects.create(film=self.big, user=self.user)
+
+        response = self.client.get('/api/v1/movies/watched/export/')
+
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'film,tmdb_id,title,review,watched_at')
+        self.assertTrue(lines[1].startswith(f"{self.alien.id},348,Alien,5,"))
+        self.assertTrue(lines[2].startswith(f"{self.big.id},,Big,,"))
+
+        WatchedFilm.objects.all().delete()
+        response = self.client.post(
+            '/api/v1/movies/watched/import/', '\n'.join(lines), content_type='text/csv'
+        )
+        self.assertEqual(response.data['created'], 2)
+
+
+class UserStatsTest(TestCase):
+    """Test the materialized user statistics"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="stats", email="stats@example.com")
+        self.films = [
+            Film.objects.create(title=f"Film {index}", release_date=date(2020, 1, 1), language="en")
+            for index in range(4)
+        ]
+        self.netflix = StreamingService.objects.create(name="Netflix")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _values(self, stats):
+        return (
+            stats.watched_count, stats.reviewed_count, stats.review_sum, stats.service_count, stats.rating_histogram
+        )
+
+    def test_stats_follow_watch_history_changes(self):
+        get_user_stats(self.user.pk)
+
+        WatchedFilm.objects.create(film=self.films[0], user=self.user, review=4)
+        WatchedFilm.objects.create(film=self.films[1], user=self.user, review=4)
+        unrated = WatchedFilm.objects.create(film=self.films[2], user=self.user)
+        unrated.review = 2
+        unrated.save()
+        reloaded = WatchedFilm.objects.get(film=self.films[1])
+        reloaded.review = 5
+        reloaded.save()
+        WatchedFilm.objects.get(film=self.films[0]).delete()
+        self.user.streaming_services.add(self.netflix)
+
+        stats = UserStats.objects.get(user=self.user)
+        self.assertEqual(self._values(stats), (2, 2, 7, 1, {"2": 1, "5": 1}))
+        self.assertEqual(self._values(stats), self._values(compute_user_stats([self.user.pk])[self.user.pk]))
+
+    def test_endpoint_reads_one_row(self):
+        WatchedFilm.objects.create(film=self.films[0], user=self.user, review=3)
+        WatchedFilm.objects.create(film=self.films[1], user=self.user, review=4)
+        WatchedFilm.objects.create(film=self.films[2], user=self.user)
+        get_user_stats(self.user.pk)
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/movies/my-stats/')
+
+        self.assertEqual(response.data['watched_films_count'], 3)
+        self.assertEqual(response.data['reviewed_films_count'], 2)
+        self.assertEqual(response.data['average_review_score'], 3.5)
+        self.assertEqual(response.data['rating_histogram'], {3: 1, 4: 1})
+
+    def test_rebuild_command_repairs_drift(self):
+        WatchedFilm.objects.create(film=self.films[0], user=self.user, review=5)
+        get_user_stats(self.user.pk)
+        # Queryset updates bypass the signals
+        WatchedFilm.objects.filter(user=self.user).update(review=1)
+
+        output = StringIO()
+        call_command('rebuild_user_stats', stdout=output)
+
+        self.assertIn("Repaired stats of 1 users", output.getvalue())
+        self.assertEqual(UserStats.objects.get(user=self.user).rating_histogram, {"1": 1})
+
+    def test_deleting_user_removes_stats(self):
+        WatchedFilm.objects.create(film=self.films[0], user=self.user, review=5)
+        get_user_stats(self.user.pk)
+
+        self.user.delete()
+
+        self.assertFalse(UserStats.objects.exists())
+
+
+class FilmFeatureStoreTest(TestCase):
+    """Test the in-process film feature store"""
+
+    def setUp(self):
+        cache.clear()
+        self.film = Film.objects.create(title="Alien", release_date=date(1979, 5, 25), language="en")
+        self.category = Category.objects.create(name="Horror")
+        self.actor = Actor.objects.create(first_name="Sigourney", last_name="Weaver")
+        FilmCategory.objects.create(film=self.film, category=self.category)
+        FilmActor.objects.create(film=self.film, actor=self.actor)
+
+    def test_rows_are_keyed_by_feature_ids(self):
+        store = film_features.get()
+        self.assertCountEqual(
+            store.row(self.film.id),
+            [(CATEGORY, self.category.id), (ACTOR, self.actor.id)]
+        )
+        self.assertEqual(store.release_year(self.film.id), 1979)
+        self.assertEqual(store.score(self.film.id, {(ACTOR, self.actor.id): 20}), 20)
+
+    def test_store_rebuilds_after_catalog_change(self):
+        store = film_features.get()
+        version = store.version
+
+        sci_fi = Category.objects.create(name="Science Fiction")
+        FilmCategory.objects.create(film=self.film, category=sci_fi)
+
+        store = film_features.get()
+        self.assertNotEqual(store.version, version)
+        self.assertIn((CATEGORY, sci_fi.id), store.row(self.film.id))
+
+    def test_inverted_index_scores_only_films_sharing_a_feature(self):
+        other = Film.objects.create(title="Heat", release_date=date(2021, 1, 1), language="en")
+        FilmCategory.objects.create(film=other, category=self.category)
+
+        store = film_features.get()
+
+        self.assertEqual(
+            store.feature_scores({(CATEGORY, self.category.id): 10, (ACTOR, self.actor.id): 20}),
+            {self.film.id: 30, other.id: 10}
+        )
+        self.assertEqual(store.feature_scores({(ACTOR, self.actor.id): 20, (CATEGORY, self.category.id): 0}),
+                         {self.film.id: 20})
+        self.assertEqual(store.era_films, {'classic': {self.film.id}, 'recent': {other.id}})
+        self.assertEqual(store.new_releases, {other.id})
+        self.assertEqual([release_era(year) for year in (None, 1979, 1980, 2014, 2015)],
+                         [None, 'classic', 'retro', 'modern', 'recent'])
+
+
+class CandidateRankingTest(TestCase):
+    """Test that pruned candidate ranking matches scoring every candidate"""
+
+    def setUp(self):
+        cache.clear()
+        rng = random.Random(7)
+        categories = [Category.objects.create(name=f"Category {index}") for index in range(6)]
+        actors = [Actor.objects.create(first_name="Actor", last_name=str(index)) for index in range(30)]
+        films = Film.objects.bulk_create(
+            Film(title=f"Film {index}", release_date=date(rng.randrange(1960, 2025), 1, 1), language="en")
+            for index in range(300)
+        )
+        FilmCategory.objects.bulk_create(
+            FilmCategory(film=film, category=category)
+            for film in films for category in rng.sample(categories, 2)
+        )
+        FilmActor.objects.bulk_create(
+            FilmActor(film=film, actor=actor) for film in films for actor in rng.sample(actors, 3)
+        )
+
+        self.store = film_features.get()
+        self.film_ids = [film.id for film in films]
+        self.vector = {(CATEGORY, categories[0].id): 30, (CATEGORY, categories[1].id): -10, (ACTOR, actors[0].id): 20}
+        self.cf_scores = {film.id: rng.uniform(-1, 1) for film in rng.sample(films, 20)}
+
+    def exhaustive_ranking(self, candidate_ids, era, seed):
+        scores = []
+        for film_id in candidate_ids:
+            score = self.store.score(film_id, self.vector) + 10 * self.cf_scores.get(film_id, 0)
+            era_match = release_era(self.store.release_year(film_id)) == era
+            if era and era_match or not era and self.store.release_year(film_id) >= 2020:
+                score += 15 if era else 5
+            scores.append((film_id, score + seeded_jitter(seed, film_id)))
+        return sorted(scores, key=lambda pair: (-pair[1], pair[0]))[:10]
+
+    @override_settings(RECOMMENDATION_POOL_SIZE=10, RECOMMENDATION_CF_WEIGHT=10)
+    def test_matches_exhaustive_scoring(self):
+        candidate_ids = self.film_ids[::2]
+        for era in (None, 'classic', 'recent'):
+            for seed in range(5):
+                with self.subTest(era=era, seed=seed):
+                    self.assertEqual(
+                        Recommender()._rank_candidates(
+                            self.store, iter(candidate_ids), self.vector, era, seed, self.cf_scores
+                        ),
+                        self.exhaustive_ranking(candidate_ids, era, seed)
+                    )
+
+
+class PreferenceProfileTest(TestCase):
+    """Test parsing and caching of quiz preference profiles"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="quizzer", email="quizzer@example.com")
+        self.era_question = Question.objects.create(
+            question="What's your favorite time period for movies?",
+            available_answers=["Classic (before 1980)", "Retro (1980-2000)"]
+        )
+        self.context_question = Question.objects.create(
+            question="How do you prefer to watch movies?",
+            available_answers=["Alone for focus", "Family time"]
+        )
+        Answer.objects.create(user=self.user, question=self.era_question, answer="Retro (1980-2000)")
+        Answer.objects.create(user=self.user, question=self.context_question, answer="Family time")
+
+    def test_profile_parses_answers(self):
+        profile = get_preference_profile(self.user)
+
+        self.assertEqual(profile.era, "retro")
+        self.assertEqual(profile.context, "family time")
+        self.assertIsNone(profile.movie_type)
+
+    def test_movie_type_ignores_other_prefer_questions(self):
+        length_question = Question.objects.create(
+            question="What movie length do you prefer?",
+            available_answers=["Standard length (90-120 min)", "No preference"]
+        )
+        type_question = Question.objects.create(
+            question="What type of movie do you prefer?",
+            available_answers=["Action-packed", "Emotional"]
+        )
+        Answer.objects.create(user=self.user, question=length_question, answer="No preference")
+        Answer.objects.create(user=self.user, question=type_question, answer="Emotional")
+
+        profile = get_preference_profile(self.user)
+
+        self.assertEqual(profile.movie_type, "emotional")
+        self.assertEqual(profile.context, "family time")
+
+    def test_profile_is_cached_until_answers_change(self):
+        get_preference_profile(self.user)
+        with self.assertNumQueries(0):
+            get_preference_profile(self.user)
+
+        Answer.objects.filter(question=self.era_question).get().delete()
+
+        self.assertIsNone(get_preference_profile(self.user).era)
+
+    def test_migration_seeds_legacy_answer_weights(self):
+        migration = import_module('authentication.migrations.0004_seed_answer_weights')
+        type_question = Question.objects.create(
+            question="What type of movie do you prefer?",
+            available_answers=["Action-packed", "Emotional"]
+        )
+        draw_question = Question.objects.create(
+            question="What draws you to a movie most?",
+            available_answers=["Amazing visuals", "Great storyline"]
+        )
+        Answer.objects.create(user=self.user, question=type_question, answer="Emotional")
+        other = User.objects.create(username="other", email="other@example.com")
+        Answer.objects.create(user=other, question=draw_question, answer="Great storyline twists")
+
+        migration.seed_answer_weights(django_apps, None)
+
+        weights = set(QuestionAnswerWeight.objects.values_list('answer', 'category__name', 'weight'))
+        self.assertIn(("Emotional", 'Drama', 4), weights)
+        self.assertIn(("Great storyline", 'Drama', 3), weights)
+        self.assertIn(("Great storyline twists", 'Drama', 3), weights)
+        # The old rules never weighted the era or viewing context answers
+        self.assertFalse(QuestionAnswerWeight.objects.filter(question=self.era_question).exists())
+        self.assertFalse(QuestionAnswerWeight.objects.filter(question=self.context_question).exists())
+
+        table = answer_weights.get()
+        drama, romance = Category.objects.get(name='Drama'), Category.objects.get(name='Romance')
+        self.assertEqual(
+            dict(table.category_weights(get_preference_profile(self.user).answers)),
+            {drama.id: 4, romance.id: 3}
+        )
+
+
+class QuizAnswersViewTest(TestCase):
+    """Test the bulk quiz answer upsert"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="answerer", email="answerer@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.questions = [
+            Question.objects.create(question=f"Question {index}", available_answers=["Yes", "No"])
+            for index in range(4)
+        ]
+
+    def _post(self, answers):
+        return self.client.post('/api/v1/auth/quiz-answers/', {'answers': answers}, format='json')
+
+    def test_answers_are_upserted(self):
+        Answer.objects.create(user=self.user, question=self.questions[0], answer="No")
+
+        response = self._post([
+            {'question_id': str(self.questions[0].id), 'answer': "Yes"},
+            {'question_id': str(self.questions[1].id), 'answer': "No"},
+            {'question_id': str(self.questions[1].id), 'answer': "Yes"},
+        ])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            dict(Answer.objects.filter(user=self.user).values_list('question_id', 'answer')),
+            {self.questions[0].id: "Yes", self.questions[1].id: "Yes"}
+        )
+
+    def test_query_count_does_not_grow_with_answers(self):
+        for questions in (self.questions[:1], self.questions):
+            # Question lookup, then the upsert inside a savepoint
+            with self.assertNumQueries(4):
+                self._post([{'question_id': str(question.id), 'answer': "Yes"} for question in questions])
+
+    def test_unknown_question_is_rejected(self):
+        response = self._post([{'question_id': '999999', 'answer': "Yes"}])
+        self.assertEqual(response.status_code, 400)
+
+        response = self._post([{'question_id': 'first', 'answer': "Yes"}])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Answer.objects.exists())
+
+    def test_submission_refreshes_preference_profile(self):
+        era_question = Question.objects.create(
+            question="What's your favorite time period for movies?", available_answers=["Retro (1980-2000)"]
+        )
+        self.assertIsNone(get_preference_profile(self.user).era)
+
+        self._post([{'question_id': str(era_question.id), 'answer': "Retro (1980-2000)"}])
+
+        self.assertEqual(get_preference_profile(self.user).era, "retro")
+
+
+class TopKSelectionTest(TestCase):
+    """Test bounded top-K ranking"""
+
+    def test_keeps_best_items_in_order(self):
+        scores = {1: 5, 2: 9, 3: 1, 4: 9, 5: 7}
+
+        result = select_top_k(scores, scores.get, 3)
+
+        self.assertEqual(result, [(2, 9), (4, 9), (5, 7)])
+
+    def test_heap_never_grows_past_k(self):
+        top = TopK(2)
+        for item in range(100):
+            top.push(item, item)
+
+        self.assertEqual(top.items(), [(99, 99), (98, 98)])
+        self.assertEqual(top.threshold, 98)
+
+    def test_stops_once_upper_bound_is_reached(self):
+        scored = []
+
+        def score(item):
+            scored.append(item)
+            return 10
+
+        result = select_top_k(range(1000), score, 2, upper_bound=10)
+
+        self.assertEqual(result, [(0, 10), (1, 10)])
+        self.assertEqual(scored, [0, 1])
+
+
+class DiversityRerankTest(TestCase):
+    """Test seeded jitter and MMR re-ranking"""
+
+    def test_seeded_jitter_is_reproducible(self):
+        seed = daily_seed(1, date(2025, 6, 1))
+
+        self.assertEqual(seed, daily_seed(1, date(2025, 6, 1)))
+        self.assertNotEqual(seed, daily_seed(1, date(2025, 6, 2)))
+        self.assertEqual(seeded_jitter(seed, 42), seeded_jitter(seed, 42))
+        self.assertTrue(all(1 <= seeded_jitter(seed, item) <= 10 for item in range(100)))
+
+    def test_similar_items_are_pushed_down(self):
+        categories = {1: {'horror'}, 2: {'horror'}, 3: {'comedy'}}
+        scored = [(1, 100), (2, 95), (3, 90)]
+
+        self.assertEqual([item for item, score in diversify(scored, categories.get, 0.5)], [1, 3, 2])
+        self.assertEqual([item for item, score in diversify(scored, categories.get, 0)], [1, 2, 3])
+
+
+class CandidateSetTest(TestCase):
+    """Test the cached candidate bitsets"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="picker", email="picker@example.com")
+        self.netflix = StreamingService.objects.create(name="Netflix")
+        self.hulu = StreamingService.objects.create(name="Hulu")
+        self.first = Film.objects.create(title="First", release_date=date(2001, 1, 1), language="en")
+        self.second = Film.objects.create(title="Second", release_date=date(2002, 1, 1), language="en")
+        FilmStreamingService.objects.create(film=self.first, streaming_service=self.netflix)
+        FilmStreamingService.objects.create(film=self.second, streaming_service=self.hulu)
+
+    def test_bitset_round_trip(self):
+        ids = [0, 3, 8, 9, 1000]
+        self.assertEqual(list(iter_bitset(to_bitset(ids))), ids)
+        self.assertEqual(list(iter_bitset(to_bitset([]))), [])
+
+    def test_candidates_are_union_of_services_minus_watched(self):
+        service_ids = [self.netflix.id, self.hulu.id]
+        self.assertEqual(list(get_candidate_film_ids(self.user.id, service_ids)), [self.first.id, self.second.id])
+
+        WatchedFilm.objects.create(film=self.first, user=self.user)
+
+        self.assertEqual(list(get_candidate_film_ids(self.user.id, service_ids)), [self.second.id])
+
+    def test_cached_candidates_skip_the_database(self):
+        list(get_candidate_film_ids(self.user.id, [self.netflix.id]))
+        with self.assertNumQueries(0):
+            list(get_candidate_film_ids(self.user.id, [self.netflix.id]))
+
+    def test_availability_changes_invalidate_service_bitset(self):
+        list(get_candidate_film_ids(self.user.id, [self.netflix.id]))
+
+        self.second.streaming_services.add(self.netflix)
+
+        self.assertEqual(
+            list(get_candidate_film_ids(self.user.id, [self.netflix.id])),
+            [self.first.id, self.second.id]
+        )
+
+
+class RecommendedFilmsViewTest(TestCase):
+    """Test the recommendations endpoint"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="viewer", email="viewer@example.com")
+        self.netflix = StreamingService.objects.create(name="Netflix")
+        UserStreamingService.objects.create(user=self.user, streaming_service=self.netflix)
+
+        self.actor = Actor.objects.create(first_name="Tom", last_name="Hanks")
+        self.seen = self._film("Big", 1988, self.actor)
+        self.match = self._film("Cast Away", 2000, self.actor)
+        self.other = self._film("Heat", 1995)
+        WatchedFilm.objects.create(film=self.seen, user=self.user, review=5)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _film(self, title, year, actor=None):
+        film = Film.objects.create(title=title, release_date=date(year, 1, 1), language="en")
+        FilmStreamingService.objects.create(film=film, streaming_service=self.netflix)
+        if actor:
+            FilmActor.objects.create(film=film, actor=actor)
+        return film
+
+    def test_recommendations_exclude_watched_and_rank_by_preferences(self):
+        response = self.client.get('/api/v1/movies/recommendations/')
+
+        self.assertEqual(response.status_code, 200)
+        ids = [film['id'] for film in response.data['recommendations']]
+        self.assertNotIn(self.seen.id, ids)
+        self.assertEqual(ids[0], self.match.id)
+        self.assertIn(self.other.id, ids)
+
+    def test_recommendations_are_reproducible(self):
+        first = self.client.get('/api/v1/movies/recommendations/').data['recommendations']
+        second = self.client.get('/api/v1/movies/recommendations/').data['recommendations']
+
+        self.assertEqual([film['id'] for film in first], [film['id'] for film in second])
+
+    def test_ranked_ids_are_served_from_cache(self):
+        self.client.get('/api/v1/movies/recommendations/')
+
+        with patch('movie.recommender.Recommender.recommend') as recommend:
+            response = self.client.get('/api/v1/movies/recommendations/')
+
+        recommend.assert_not_called()
+        self.assertEqual(response.data['recommendations'][0]['id'], self.match.id)
+
+    def test_watching_a_film_invalidates_cached_recommendations(self):
+        self.client.get('/api/v1/movies/recommendations/')
+
+        WatchedFilm.objects.create(film=self.match, user=self.user, review=2)
+
+        response = self.client.get('/api/v1/movies/recommendations/')
+        ids = [film['id'] for film in response.data['recommendations']]
+        self.assertEqual(ids, [self.other.id])
+
+    def test_quiz_answer_weights_boost_matching_categories(self):
+        question = Question.objects.create(question="What's your mood today?", available_answers=["Jittery"])
+        horror = Category.objects.create(name="Horror")
+        FilmCategory.objects.create(film=self.other, category=horror)
+        QuestionAnswerWeight.objects.create(question=question, answer="Jittery", category=horror, weight=3)
+        Answer.objects.create(user=self.user, question=question, answer="Jittery")
+
+        response = self.client.get('/api/v1/movies/recommendations/')
+
+        ids = [film['id'] for film in response.data['recommendations']]
+        self.assertEqual(ids[0], self.other.id)
+
+    def test_recommendations_require_streaming_services(self):
+        UserStreamingService.objects.filter(user=self.user).delete()
+
+        response = self.client.get('/api/v1/movies/recommendations/')
+
+        self.assertEqual(response.data['recommendations'], [])
+
+
+class CollaborativeFilteringTest(TestCase):
+    """Test item-item similarities and their blend into recommendations"""
+
+    def setUp(self):
+        cache.clear()
+        self.netflix = StreamingService.objects.create(name="Netflix")
+        self.alien, self.aliens, self.cats, self.heat = [
+            Film.objects.create(title=title, release_date=date(1990, 1, 1), language="en")
+            for title in ("Alien", "Aliens", "Cats", "Heat")
+        ]
+        for film in (self.aliens, self.heat):
+            FilmStreamingService.objects.create(film=film, streaming_service=self.netflix)
+
+        self.viewer = User.objects.create(username="viewer", email="viewer@example.com")
+        UserStreamingService.objects.create(user=self.viewer, streaming_service=self.netflix)
+        self._review(self.viewer, {self.alien: 5, self.cats: 1})
+        # Fans of Alien also loved Aliens and disliked Cats, nobody reviewed Heat
+        for index, (high, low) in enumerate([(5, 1), (4, 2), (5, 2)]):
+            fan = User.objects.create(username=f"fan{index}", email=f"fan{index}@example.com")
+            self._review(fan, {self.alien: high, self.aliens: high, self.cats: low})
+
+    def _review(self, user, reviews):
+        for film, review in reviews.items():
+            WatchedFilm.objects.create(film=film, user=user, review=review)
+
+    def test_similarities_keep_positive_neighbours(self):
+        ratings = WatchedFilm.objects.values_list('user_id', 'film_id', 'review')
+        neighbors = dict(item_similarities(ratings, shrinkage=0))
+
+        self.assertEqual([film_id for film_id, score in neighbors[self.alien.id]], [self.aliens.id])
+        self.assertTrue(0.5 < neighbors[self.alien.id][0][1] <= 1)
+        self.assertNotIn(self.heat.id, neighbors)
+        # Too few shared reviewers
+        self.assertEqual(dict(item_similarities(ratings, min_overlap=5)), {})
+
+    def test_shrinkage_damps_small_overlaps(self):
+        ratings = list(WatchedFilm.objects.values_list('user_id', 'film_id', 'review'))
+        undamped = dict(item_similarities(ratings, shrinkage=0))[self.alien.id][0][1]
+        damped = dict(item_similarities(ratings, shrinkage=10))[self.alien.id][0][1]
+
+        self.assertAlmostEqual(damped, undamped * 3 / 13)
+
+    def test_command_stores_neighbours_used_by_recommender(self):
+        call_command('compute_film_similarities', '--shrinkage', '0', stdout=StringIO())
+
+        self.assertEqual(
+            list(FilmSimilarity.objects.filter(film=self.alien).values_list('neighbor_id', 'rank')),
+            [(self.aliens.id, 1)]
+        )
+        scores = collaborative_scores({self.alien.id: 5, self.cats.id: 1}, 3)
+        self.assertGreater(scores[self.aliens.id], 0)
+
+        ranked = Recommender().recommend(self.viewer, [self.netflix.id])
+        self.assertEqual([film_id for film_id, score in ranked], [self.aliens.id, self.heat.id])
+
+
+class FilmEmbeddingTest(TestCase):
+    """Test the film embedding index, the similar films endpoint and embedding candidates"""
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'film_embeddings.bin')
+        overridden = self.settings(FILM_EMBEDDINGS_PATH=self.path)
+        overridden.enable()
+        self.addCleanup(overridden.disable)
+
+        scifi = Category.objects.create(name="Science Fiction")
+        drama = Category.objects.create(name="Drama")
+        scott = Director.objects.create(first_name="Ridley", last_name="Scott", birthdate=date(1937, 11, 30))
+        self.netflix = StreamingService.objects.create(name="Netflix")
+        self.alien, self.blade_runner, self.amelie = [
+            Film.objects.create(title=title, release_date=date(year, 1, 1), language=language)
+            for title, year, language in (("Alien", 1979, "en"), ("Blade Runner", 1982, "en"), ("Amelie", 2001, "fr"))
+        ]
+        for film in (self.alien, self.blade_runner):
+            FilmCategory.objects.create(film=film, category=scifi)
+            FilmDirector.objects.create(film=film, director=scott)
+        FilmCategory.objects.create(film=self.amelie, category=drama)
+        for film in (self.blade_runner, self.amelie):
+            FilmStreamingService.objects.create(film=film, streaming_service=self.netflix)
+
+    def test_vectors_are_unit_length(self):
+        vectors = embed({1: [('category', 1), ('language', 'en')], 2: []}, dim=16)
+
+        self.assertEqual(len(vectors[1]), 16)
+        self.assertAlmostEqual(sum(value * value for value in vectors[1]), 1, places=6)
+        self.assertEqual(vectors[2], [0.0] * 16)
+
+    def test_build_writes_index_used_for_similar_films(self):
+        self.assertEqual(build_film_embeddings(self.path, dim=32), (3, 2))
+
+        index = film_embeddings.get()
+        self.assertIn(self.amelie.id, index)
+        self.assertEqual(len(index.vector(self.alien.id)), 32)
+        similar = index.similar(self.alien.id, 2, nprobe=2)
+        self.assertEqual([film_id for film_id, score in similar], [self.blade_runner.id, self.amelie.id])
+        self.assertGreater(similar[0][1], similar[1][1])
+
+        # Films added after the build are not indexed yet
+        later = Film.objects.create(title="Prometheus", release_date=date(2012, 1, 1), language="en")
+        self.assertEqual(index.similar(later.id, 2), [])
+
+    def test_rebuild_swaps_in_a_new_index(self):
+        build_film_embeddings(self.path, dim=32)
+        before = film_embeddings.get()
+
+        build_film_embeddings(self.path, dim=16)
+        after = film_embeddings.get()
+
+        self.assertIsNot(before, after)
+        self.assertEqual(len(after.vector(self.alien.id)), 16)
+        # Searches holding the previous index keep reading it unchanged
+        self.assertEqual(len(before.vector(self.alien.id)), 32)
+        self.assertEqual(before.similar(self.alien.id, 1, nprobe=2)[0][0], self.blade_runner.id)
+
+    def test_index_file_replaced_by_another_process_is_reloaded(self):
+        self.assertNotIn(self.alien.id, film_embeddings.get())
+
+        # A build in another process whose version bump never reaches this one
+        with patch('movie.embeddings.invalidate_film_embeddings'):
+            build_film_embeddings(self.path, dim=32)
+
+        self.assertIn(self.alien.id, film_embeddings.get())
+
+    def test_similar_endpoint(self):
+        client = APIClient()
+        url = f'/api/v1/movies/films/{self.alien.id}/similar/'
+
+        # No index built yet
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'film': self.alien.id, 'results': []})
+
+        build_film_embeddings(self.path, dim=32, clusters=1)
+        response = client.get(url, {'limit': 1})
+        self.assertEqual([film['id'] for film in response.data['results']], [self.blade_runner.id])
+        self.assertIn('similarity', response.data['results'][0])
+
+        self.assertEqual(client.get('/api/v1/movies/films/999999/similar/').status_code, 404)
+
+    @override_settings(RECOMMENDATION_CANDIDATES='embeddings')
+    def test_recommender_scores_embedding_neighbours(self):
+        user = User.objects.create(username="fan", email="fan@example.com")
+        UserStreamingService.objects.create(user=user, streaming_service=self.netflix)
+        WatchedFilm.objects.create(film=self.alien, user=user, review=5)
+        build_film_embeddings(self.path, dim=32, clusters=1)
+
+        with patch.object(Recommender, 'EMBEDDING_NEIGHBORS', 1), self.settings(RECOMMENDATION_POOL_SIZE=1):
+            ranked = Recommender().recommend(user, [self.netflix.id])
+        self.assertEqual([film_id for film_id, score in ranked], [self.blade_runner.id])
+
+        # Too few neighbours to fill the pool: every available film is scored
+        with patch.object(Recommender, 'EMBEDDING_NEIGHBORS', 1):
+            ranked = Recommender().recommend(user, [self.netflix.id])
+        self.assertEqual({film_id for film_id, score in ranked}, {self.blade_runner.id, self.amelie.id})
+
+        # Films added since the build stay candidates until the next one
+        prometheus = Film.objects.create(title="Prometheus", release_date=date(2012, 1, 1), language="en")
+        FilmStreamingService.objects.create(film=prometheus, streaming_service=self.netflix)
+        with patch.object(Recommender, 'EMBEDDING_NEIGHBORS', 1), self.settings(RECOMMENDATION_POOL_SIZE=2):
+            ranked = Recommender().recommend(user, [self.netflix.id])
+        self.assertEqual({film_id for film_id, score in ranked}, {self.blade_runner.id, prometheus.id})
+
+    def test_rebuild_makes_cached_recommendations_stale(self):
+        version = get_version(RECOMMENDATIONS_VERSION_CACHE_KEY)
+        build_film_embeddings(self.path, dim=32)
+
+        self.assertNotEqual(get_version(RECOMMENDATIONS_VERSION_CACHE_KEY), version)
+
+
+class PrecomputedRecommendationsTest(TestCase):
+    """Test offline recommendation precompute and the precomputed view mode"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="batch", email="batch@example.com")
+        self.netflix = StreamingService.objects.create(name="Netflix")
+        UserStreamingService.objects.create(user=self.user, streaming_service=self.netflix)
+        self.films = []
+        for year in (2001, 2002, 2003):
+            film = Film.objects.create(title=f"Film {year}", release_date=date(year, 1, 1), language="en")
+            FilmStreamingService.objects.create(film=film, streaming_service=self.netflix)
+            self.films.append(film)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_command_stores_ranked_recommendations(self):
+        call_command('precompute_recommendations', '--workers', '1', verbosity=0)
+
+        ranks = list(UserRecommendation.objects.filter(user=self.user).values_list('rank', flat=True))
+        self.assertEqual(sorted(ranks), [1, 2, 3])
+
+        # Re-running replaces the previous rows instead of adding to them
+        call_command('precompute_recommendations', '--workers', '1', verbosity=0)
+        self.assertEqual(UserRecommendation.objects.filter(user=self.user).count(), 3)
+
+    def test_command_removes_rows_of_users_no_longer_scored(self):
+        inactive = User.objects.create(username="gone", email="gone@example.com", is_active=False)
+        UserRecommendation.objects.create(user=inactive, film=self.films[0], rank=1, score=1)
+        call_command('precompute_recommendations', '--workers', '1', stdout=StringIO())
+        self.assertEqual(set(UserRecommendation.objects.values_list('user_id', flat=True)), {self.user.id})
+
+        # Dropping every streaming service also stops the user being scored
+        UserStreamingService.objects.filter(user=self.user).delete()
+        call_command('precompute_recommendations', '--workers', '1', stdout=StringIO())
+
+        self.assertFalse(UserRecommendation.objects.exists())
+
+    def add_films(self, years):
+        for year in years:
+            film = Film.objects.create(title=f"Film {year}", release_date=date(year, 1, 1), language="en")
+            FilmStreamingService.objects.create(film=film, streaming_service=self.netflix)
+            self.films.append(film)
+
+    @override_settings(RECOMMENDATION_SOURCE='precomputed')
+    def test_view_reads_precomputed_rows(self):
+        self.add_films((2004, 2005, 2006))
+        for rank, film in enumerate(reversed(self.films), start=1):
+            UserRecommendation.objects.create(user=self.user, film=film, rank=rank, score=10 - rank)
+        WatchedFilm.objects.create(user=self.user, film=self.films[3])
+
+        with patch('movie.recommender.Recommender.recommend') as recommend:
+            response = self.client.get('/api/v1/movies/recommendations/')
+
+        recommend.assert_not_called()
+        self.assertEqual(
+            [film['id'] for film in response.data['recommendations']],
+            [film.id for film in (self.films[5], self.films[4], self.films[2], self.films[1], self.films[0])]
+        )
+
+    @override_settings(RECOMMENDATION_SOURCE='precomputed')
+    def test_view_falls_back_to_online_scoring(self):
+        response = self.client.get('/api/v1/movies/recommendations/')
+
+        self.assertEqual(len(response.data['recommendations']), 3)
+
+    @override_settings(RECOMMENDATION_SOURCE='precomputed')
+    def test_view_falls_back_when_too_few_precomputed_rows_remain(self):
+        self.add_films((2004, 2005, 2006))
+        for rank, film in enumerate(self.films[:2], start=1):
+            UserRecommendation.objects.create(user=self.user, film=film, rank=rank, score=10 - rank)
+
+        response = self.client.get('/api/v1/movies/recommendations/')
+
+        self.assertEqual(len(response.data['recommendations']), 5)
+
+
+class FilmRelationCountsTest(TestCase):
+    """Test annotated and denormalized film relation counts"""
+
+    def setUp(self):
+        cache.clear()
+        self.films = []
+        for index in range(3):
+            film = Film.objects.create(title=f"Film {index}", release_date=date(2020, 1, 1), language="en")
+            for actor_index in range(index + 1):
+                actor = Actor.objects.create(first_name=f"Actor {actor_index}", last_name=str(index))
+                FilmActor.objects.create(film=film, actor=actor)
+            self.films.append(film)
+
+    def test_with_counts_annotates_relations(self):
+        counts = dict(Film.objects.with_counts().values_list('title', 'num_actors'))
+
+        self.assertEqual(counts, {"Film 0": 1, "Film 1": 2, "Film 2": 3})
+
+    def test_film_list_does_not_count_per_row(self):
+        # One COUNT for the paginator plus one query for the page
+        with self.assertNumQueries(2):
+            response = APIClient().get('/api/v1/movies/films/')
+
+        self.assertEqual(
+            sorted(film['actors_count'] for film in response.data['results']),
+            [1, 2, 3]
+        )
+
+    def test_denormalized_counts_follow_relation_changes(self):
+        film = self.films[0]
+        film.refresh_from_db()
+        self.assertEqual(film.actors_count, 1)
+
+        director = Director.objects.create(first_name="Ridley", last_name="Scott")
+        film.directors.add(director)
+        FilmActor.objects.filter(film=film).delete()
+        film.save()  # must not write back the stale counts loaded above
+
+        film.refresh_from_db()
+        self.assertEqual((film.actors_count, film.directors_count), (0, 1))
+
+    @override_settings(FILM_COUNTS_SOURCE='denormalized')
+    def test_serializer_reads_denormalized_counts(self):
+        with self.assertNumQueries(2):
+            response = APIClient().get('/api/v1/movies/films/')
+
+        self.assertEqual(sorted(film['actors_count'] for film in response.data['results']), [1, 2, 3])
+
+
+class QueryCountTest(TestCase):
+    """Test that movie endpoints run a fixed number of queries however many rows they return"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="counter", email="counter@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.netflix = StreamingService.objects.create(name="Netflix")
+        self.category = Category.objects.create(name="Drama")
+        self.tag = Tag.objects.create(name="classic")
+
+    def _add_films(self, count):
+        films = []
+        for index in range(count):
+            film = Film.objects.create(
+                title=f"Film {Film.objects.count()}", release_date=date(2020, 1, 1), language="en"
+            )
+            film.actors.add(Actor.objects.create(first_name="Actor", last_name=str(film.id)))
+            film.directors.add(Director.objects.create(first_name="Director", last_name=str(film.id)))
+            film.categories.add(self.category)
+            film.tags.add(self.tag)
+            film.streaming_services.add(self.netflix)
+            WatchedFilm.objects.create(film=film, user=self.user, review=index % 5 + 1)
+            films.append(film)
+        return films
+
+    def assertConstantQueries(self, url, expected):
+        """Request ``url`` with one and then four more films, both times in ``expected`` queries"""
+        for count in (1, 4):
+            self._add_films(count)
+            with self.assertNumQueries(expected):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_film_detail_prefetches_relations(self):
+        film = self._add_films(1)[0]
+
+        # The film plus one query per nested relation
+        with self.assertNumQueries(6):
+            response = self.client.get(f'/api/v1/movies/films/{film.id}/')
+
+        self.assertEqual(response.data['actors'][0]['last_name'], str(film.id))
+        self.assertEqual(response.data['streaming_services'][0]['name'], "Netflix")
+
+    def test_my_films(self):
+        # Count, page and five relation prefetches
+        response = self.assertConstantQueries('/api/v1/movies/my-films/', 7)
+
+        self.assertEqual(response.data['count'], 5)
+        self.assertTrue(all(len(film['categories']) == 1 for film in response.data['results']))
+
+    def test_watched_list(self):
+        # Count, page with the user joined and the films with their counts
+        response = self.assertConstantQueries('/api/v1/movies/watched/', 3)
+
+        self.assertEqual(response.data['results'][0]['user_username'], "counter")
+        self.assertEqual(response.data['results'][0]['film']['actors_count'], 1)
+
+    def test_watched_detail(self):
+        watched = WatchedFilm.objects.get(film=self._add_films(1)[0])
+
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/v1/movies/watched/{watched.id}/')
+
+        self.assertEqual(response.data['film']['title'], watched.film.title)
+
+    def test_film_list(self):
+        self.assertConstantQueries('/api/v1/movies/films/', 2)
+
+    def test_actor_list(self):
+        self.assertConstantQueries('/api/v1/movies/actors/', 2)
+
+    def test_director_list(self):
+        self.assertConstantQueries('/api/v1/movies/directors/', 2)
+
+    def test_update_returns_fresh_relations(self):
+        film = self._add_films(1)[0]
+        comedy = Category.objects.create(name="Comedy")
+
+        response = self.client.patch(
+            f'/api/v1/movies/films/{film.id}/', {'category_ids': [comedy.id]}, format='json'
+        )
+
+        self.assertEqual([category['name'] for category in response.data['categories']], ["Comedy"])
+
+
+class PaginationTest(TestCase):
+    """Test page number and keyset pagination of list endpoints"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        created_at = timezone.now()
+        for index in range(5):
+            Film.objects.create(
+                title=f"Film {index % 3}", release_date=date(2020, 1, 1), language="en",
+                # Two films share every timestamp to exercise the id tiebreak
+                created_at=created_at - timedelta(minutes=index // 2)
+            )
+
+    def _walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(film['id'] for film in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_page_number_pagination_bounds_page_size(self):
+        response = self.client.get('/api/v1/movies/films/', {'page_size': 2})
+
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_keyset_pagination_by_created_at(self):
+        ids = self._walk('/api/v1/movies/films/?pagination=cursor&page_size=2')
+
+        expected = list(Film.objects.order_by('-created_at', 'id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_keyset_pagination_by_title(self):
+        ids = self._walk('/api/v1/movies/films/?pagination=cursor&ordering=title&page_size=2')
+
+        expected = list(Film.objects.order_by('title', 'id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get('/api/v1/movies/films/', {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, 404)
+
+        # Valid JSON whose values do not fit the ordering fields
+        for position in (["x", "y"], [None, 1], ["2020-01-01T00:00:00", "abc"], [{}, 1]):
+            cursor = base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+            response = self.client.get('/api/v1/movies/films/', {'cursor': cursor})
+            self.assertEqual(response.status_code, 404, position)
+
+
+class FilmSearchTest(TestCase):
+    """Test the full-text film search index"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alien = Film.objects.create(
+                title="Alien", overview="A crew meets a deadly creature in space.",
+                release_date=date(1979, 5, 25), language="en"
+            )
+            self.blade_runner = Film.objects.create(
+                title="Blade Runner", overview="A detective hunts replicants.",
+                release_date=date(1982, 6, 25), language="en"
+            )
+            self.space_comedy = Film.objects.create(
+                title="Spaceballs", overview="A parody of space adventures.",
+                release_date=date(1987, 6, 24), language="en"
+            )
+            self.scott = Director.objects.create(first_name="Ridley", last_name="Scott")
+            self.alien.directors.add(self.scott)
+            FilmDirector.objects.create(film=self.blade_runner, director=self.scott)
+            self.alien.categories.add(Category.objects.create(name="Horror"))
+
+    def test_search_matches_title_cast_crew_and_categories(self):
+        self.assertEqual(search_film_ids("blade"), [self.blade_runner.id])
+        self.assertEqual(set(search_film_ids("ridley scott")), {self.alien.id, self.blade_runner.id})
+        self.assertEqual(search_film_ids("horror"), [self.alien.id])
+        self.assertEqual(search_film_ids("missing"), [])
+
+    def test_title_matches_rank_above_overview_matches(self):
+        self.assertEqual(search_film_ids("space")[0], self.space_comedy.id)
+
+    def test_documents_follow_renames(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.scott.last_name = "Hampton"
+            self.scott.save()
+
+        self.assertEqual(search_film_ids("scott"), [])
+        self.assertEqual(set(search_film_ids("hampton")), {self.alien.id, self.blade_runner.id})
+
+    def test_search_ignores_query_syntax(self):
+        self.assertEqual(search_film_ids('"blade" -(runner*'), [self.blade_runner.id])
+
+    def test_film_list_search_filter(self):
+        response = self.client.get('/api/v1/movies/films/', {'search': 'scott'})
+
+        self.assertEqual(
+            {film['id'] for film in response.data['results']},
+            {self.alien.id, self.blade_runner.id}
+        )
+
+        # The filter keeps every match rather than the capped ranked ids
+        self.assertEqual(search_film_ids('space', limit=1), [self.space_comedy.id])
+        response = self.client.get('/api/v1/movies/films/', {'search': 'space', 'ordering': 'title'})
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual([film['id'] for film in response.data['results']], [self.alien.id, self.space_comedy.id])
+
+    def test_search_endpoint_returns_ranked_page(self):
+        response = self.client.get('/api/v1/movies/films/search/', {'q': 'space'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(response.data['results'][0]['id'], self.space_comedy.id)
+
+
+class AutocompleteTest(TestCase):
+    """Test the in-process autocomplete prefix index"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.blade_runner = Film.objects.create(title="Blade Runner", release_date=date(1982, 6, 25), language="en")
+        self.blade = Film.objects.create(title="Blade", release_date=date(1998, 8, 21), language="en")
+        self.actor = Actor.objects.create(first_name="Harrison", last_name="Ford")
+        self.director = Director.objects.create(first_name="Ridley", last_name="Scott")
+
+    def test_prefix_index_matches_word_starts(self):
+        index = PrefixIndex()
+        index.load([(1, "Blade Runner", 'runner'), (2, "Amélie", 'amelie'), (3, "Runaway", 'runaway')])
+
+        self.assertEqual(index.search("run", 5), ['runaway', 'runner'])
+        self.assertEqual(index.search("AME", 5), ['amelie'])
+        self.assertEqual(index.search("run", 1), ['runaway'])
+
+        index.remove(3)
+        self.assertEqual(index.search("run", 5), ['runner'])
+
+        # A reload swaps in new arrays instead of refilling the old ones
+        entries = index.entries
+        index.load([(4, "Run Lola Run", 'lola')])
+        self.assertEqual(index.search("run", 5), ['lola'])
+        self.assertEqual(entries, [('amelie', 2), ('blade runner', 1), ('runner', 1)])
+        # Entries read just before the swap skip items the new payloads dropped
+        index.entries = entries
+        self.assertEqual(index.search("run", 5), [])
+
+    def test_autocomplete_endpoint(self):
+        response = self.client.get('/api/v1/movies/autocomplete/', {'q': 'bla'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([film['id'] for film in response.data['films']], [self.blade.id, self.blade_runner.id])
+        self.assertEqual(
+            self.client.get('/api/v1/movies/autocomplete/', {'q': 'for'}).data['actors'],
+            [{'id': self.actor.id, 'name': "Harrison Ford"}]
+        )
+
+    def test_index_updates_in_place(self):
+        autocomplete_index.get()
+
+        with patch.object(autocomplete_index, '_build') as build:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.director.last_name = "Hampton"
+                self.director.save()
+            with self.captureOnCommitCallbacks(execute=True):
+                self.blade.delete()
+
+            index = autocomplete_index.get()
+            build.assert_not_called()
+
+        self.assertEqual(index.search("hamp")['directors'], [{'id': self.director.id, 'name': "Ridley Hampton"}])
+        self.assertEqual(index.search("scott")['directors'], [])
+        self.assertEqual([film['id'] for film in index.search("blade")['films']], [self.blade_runner.id])
+
+
+@skipUnless(connection.vendor == 'postgresql', "Index plans are only checked on PostgreSQL")
+class QueryIndexTest(TestCase):
+    """Test that the hot query shapes are planned on their indexes"""
+
+    def setUp(self):
+        self.user = User.objects.create(username="planner", email="planner@example.com")
+        with connection.cursor() as cursor:
+            # Tables are tiny in tests, make the planner prefer any usable index
+            cursor.execute("SET enable_seqscan = off")
+
+    def assertUsesIndex(self, queryset, index_name):
+        self.assertIn(index_name, queryset.explain())
+
+    def test_film_indexes(self):
+        self.assertUsesIndex(Film.objects.order_by('-created_at', 'id')[:50], 'film_created_at_idx')
+        self.assertUsesIndex(Film.objects.filter(title="Alien"), 'film_title_idx')
+        self.assertUsesIndex(Film.objects.filter(release_date=date(1979, 5, 25)), 'film_release_date_idx')
+        self.assertUsesIndex(Film.objects.filter(language="en"), 'film_language_idx')
+
+    def test_watched_film_indexes(self):
+        self.assertUsesIndex(
+            WatchedFilm.objects.filter(user=self.user, review__isnull=False), 'watched_user_review_idx'
+        )
+        self.assertUsesIndex(
+            WatchedFilm.objects.filter(user=self.user).order_by('-created_at')[:50], 'watched_user_created_idx'
+        )
+
+    def test_name_indexes(self):
+        for model in (Category, Tag, StreamingService):
+            self.assertIn('Index', model.objects.filter(name="Drama").explain())
+
+
+class SyncCatalogCommandTest(TestCase):
+    """Test the incremental catalog sync command"""
+
+    def setUp(self):
+        cache.clear()
+        self.film = Film.objects.create(
+            title="Alien", overview="Old overview", release_date=date(1979, 5, 25), language="en", tmdb_id=1
+        )
+        self.other = Film.objects.create(title="Heat", release_date=date(1995, 12, 15), language="en", tmdb_id=2)
+        self.kept = Actor.objects.create(first_name="Sigourney", last_name="Weaver")
+        self.dropped = Actor.objects.create(first_name="Wrong", last_name="Actor")
+        self.film.actors.add(self.kept, self.dropped)
+        self.film.categories.add(Category.objects.create(name="Horror"))
+        self.netflix = StreamingService.objects.create(name="Netflix", tmdb_provider_id=8)
+        self.film.streaming_services.add(self.netflix)
+        self.today = timezone.now().date()
+
+    def call_sync(self, responses, *args):
+        with patch.dict('os.environ', {'API_KEY_TMDB': 'test_key'}):
+            call_command(
+                'sync_catalog', *args, '--offline', '--http-cache', replay_cache(self, responses), verbosity=0
+            )
+
+    def test_sync_applies_changes_to_stored_films(self):
+        since = self.today - timedelta(days=1)
+        self.call_sync({
+            ('/movie/changes', (('start_date', since.isoformat()), ('end_date', self.today.isoformat()),
+                                ('page', 1))): {'results': [{'id': 1}, {'id': 99}], 'total_pages': 1},
+            ('/movie/1', (('append_to_response', 'credits'),)): {
+                'id': 1, 'title': 'Alien', 'overview': 'New overview', 'release_date': '1979-05-25',
+                'original_language': 'en', 'genres': [{'id': 27, 'name': 'Horror'}, {'id': 878, 'name': 'Sci-Fi'}],
+                'credits': {
+                    'cast': [{'name': 'Sigourney Weaver'}, {'name': 'Tom Skerritt'}],
+                    'crew': [{'name': 'Ridley Scott', 'job': 'Director'}],
+                },
+            },
+            ('/movie/1/watch/providers', ()): {'results': {'US': {
+                'flatrate': [{'provider_id': 9, 'provider_name': 'Prime Video'}],
+            }}},
+        }, '--since', since.isoformat())
+
+        self.film.refresh_from_db()
+        self.assertEqual(self.film.overview, "New overview")
+        self.assertEqual(
+            set(self.film.actors.values_list('last_name', flat=True)), {"Weaver", "Skerritt"}
+        )
+        self.assertTrue(self.film.actors.filter(pk=self.kept.pk).exists())
+        self.assertEqual(list(self.film.directors.values_list('last_name', flat=True)), ["Scott"])
+        self.assertEqual(
+            set(self.film.categories.values_list('name', flat=True)), {"Horror", "Science Fiction"}
+        )
+        self.assertEqual(list(self.film.streaming_services.values_list('name', flat=True)), ["Prime Video"])
+        self.assertEqual((self.film.actors_count, self.film.directors_count), (2, 1))
+        self.assertEqual(CatalogSyncState.objects.get(name='tmdb_changes').synced_through, self.today)
+
+    def test_failed_films_keep_high_water_mark(self):
+        since = self.today - timedelta(days=1)
+        self.call_sync({
+            ('/movie/changes', (('start_date', since.isoformat()), ('end_date', self.today.isoformat()),
+                                ('page', 1))): {'results': [{'id': 1}], 'total_pages': 1},
+        }, '--since', since.isoformat())
+
+        self.assertFalse(CatalogSyncState.objects.exists())
+        self.assertEqual(Film.objects.get(pk=self.film.pk).overview, "Old overview")
+
+    @patch('movie.management.commands.sync_catalog.sync_film', side_effect=IntegrityError("duplicate"))
+    def test_write_errors_skip_the_film_and_keep_high_water_mark(self, sync_film):
+        since = self.today - timedelta(days=1)
+        self.call_sync({
+            ('/movie/changes', (('start_date', since.isoformat()), ('end_date', self.today.isoformat()),
+                                ('page', 1))): {'results': [{'id': 1}, {'id': 2}], 'total_pages': 1},
+            ('/movie/1', (('append_to_response', 'credits'),)): {'id': 1, 'title': 'Alien'},
+            ('/movie/1/watch/providers', ()): {'results': {}},
+            ('/movie/2', (('append_to_response', 'credits'),)): {'id': 2, 'title': 'Heat'},
+            ('/movie/2/watch/providers', ()): {'results': {}},
+        }, '--since', since.isoformat())
+
+        self.assertEqual(sync_film.call_count, 2)
+        self.assertFalse(CatalogSyncState.objects.exists())
+
+    def test_stopping_early_cancels_pending_fetches(self):
+        fetched = []
+        command = SyncCatalogCommand()
+        command.workers = 1
+        films = [Film(title=f"Film {index}", tmdb_id=index) for index in range(100)]
+
+        results = command.fetch_all(films, lambda film: fetched.append(film) or film)
+        self.assertEqual(next(results), films[0])
+        results.close()
+        time.sleep(0.1)
+
+        # Only the bounded window ahead of the consumer was ever fetched
+        self.assertLessEqual(len(fetched), 1 + FETCH_WINDOW_PER_WORKER)
+
+    def test_providers_only(self):
+        self.call_sync({
+            ('/movie/1/watch/providers', ()): {'results': {'US': {
+                'flatrate': [{'provider_id': 8, 'provider_name': 'Netflix'}],
+                'rent': [{'provider_id': 2, 'provider_name': 'Apple TV'}],
+            }}},
+            ('/movie/2/watch/providers', ()): {'results': {}},
+        }, '--providers-only')
+
+        self.assertEqual(
+            set(self.film.streaming_services.values_list('name', flat=True)), {"Netflix", "Apple TV"}
+        )
+        self.assertFalse(self.other.streaming_services.exists())
+        self.assertEqual(Film.objects.get(pk=self.film.pk).overview, "Old overview")
@@ -0,0 +1,212 @@
+# movie/tmdb.py
+"""
+Thread-safe TMDb API client used by the ingestion commands.
+
+All requests go through one ``requests.Session`` so connections are kept alive
+and reused across worker threads, and through a shared token bucket so a pool
+of workers stays within TMDb's request quota. Responses with status 429 are
+retried after the ``Retry-After`` delay. With a ``ResponseCache`` responses are
+kept on disk and revalidated (see ``movie/tmdb_cache.py``).
+"""
+import threading
+import time
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .metrics import IngestionMetrics
+from .tmdb_cache import OfflineCacheMiss
+
+DEFAULT_BASE_URL = 'https://api.themoviedb.org/3'
+# TMDb allows roughly 50 requests per second per IP, leave some headroom
+DEFAULT_RATE_LIMIT = 40
+DEFAULT_TIMEOUT = 10
+MAX_RETRIES = 3
+
+# Cast members kept per film
+CAST_LIMIT = 10
+# Provider offers linked to films
+PROVIDER_OFFERS = ('flatrate', 'rent', 'buy')
+
+# genre mapping from tmdb, not sure if this shouldn't be stored externally
+GENRES = {
+    28: 'Action', 12: 'Adventure', 16: 'Animation', 35: 'Comedy',
+    80: 'Crime', 99: 'Documentary', 18: 'Drama', 10751: 'Family',
+    14: 'Fantasy', 36: 'History', 27: 'Horror', 10402: 'Music',
+    9648: 'Mystery', 10749: 'Romance', 878: 'Science Fiction',
+    10770: 'TV Movie', 53: 'Thriller', 10752: 'War', 37: 'Western'
+}
+
+
+class RateLimiter:
+    """Token bucket allowing ``rate`` acquisitions per second, shared across threads"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class TMDbClient:
+    """Minimal TMDb v3 client, safe to share between threads"""
+
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL, rate_limit=DEFAULT_RATE_LIMIT, pool_size=10,
+                 timeout=DEFAULT_TIMEOUT, max_retries=MAX_RETRIES, cache=None, offline=False, metrics=None):
+        if offline and cache is None:
+            raise ValueError("Offline mode needs a response cache")
+        self.api_key = api_key
+        self.cache = cache
+        self.offline = offline
+        self.metrics = metrics or IngestionMetrics()
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.rate_limiter = RateLimiter(rate_limit)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, 1))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get(self, path, revalidate=False, **params):
+        """
+        GET ``path`` and return the decoded JSON body, raising ``requests.RequestException`` on failure.
+
+        ``revalidate`` skips the TTL and always checks a cached response with TMDb.
+        """
+        cached = self.cache.get(path, params) if self.cache else None
+        if cached and (self.offline or (not revalidate and cached.is_fresh(self.cache.ttl))):
+            self.metrics.incr('http_cache_hits')
+            return cached.data
+        if self.offline:
+            raise OfflineCacheMiss(f"{path} is not in the response cache")
+
+        with self.metrics.stage('http'):
+            response = self.request(path, params, cached.revalidation_headers() if cached else {})
+        if cached and response.status_code == 304:
+            self.metrics.incr('http_not_modified')
+            self.cache.touch(path, params)
+            return cached.data
+
+        with self.metrics.stage('parse'):
+            data = response.json()
+        if self.cache:
+            self.cache.store(
+                path, params, data,
+                etag=response.headers.get('ETag'), last_modified=response.headers.get('Last-Modified')
+            )
+        return data
+
+    def request(self, path, params, headers):
+        url = f"{self.base_url}{path}"
+        params = {'api_key': self.api_key, **params}
+
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            if response.status_code == 429 and attempt < self.max_retries:
+                time.sleep(self.retry_delay(response, attempt))
+                continue
+            if response.status_code != 304:
+                response.raise_for_status()
+            return response
+
+    def retry_delay(self, response, attempt):
+        try:
+            return float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return 2 ** attempt
+
+    def movie_list(self, category, page):
+        """One page of a movie list such as ``popular`` or ``top_rated``"""
+        return self.get(f'/movie/{category}', page=page, language='en-US')
+
+    def movie_details(self, tmdb_id):
+        """Movie details with credits"""
+        return self.get(f'/movie/{tmdb_id}', append_to_response='credits')
+
+    def movie_watch_providers(self, tmdb_id):
+        return self.get(f'/movie/{tmdb_id}/watch/providers')
+
+    def movie_changes(self, start_date, end_date, page=1):
+        """Ids of movies changed between two dates, at most 14 days apart"""
+        return self.get(
+            '/movie/changes', revalidate=True,
+            start_date=start_date.isoformat(), end_date=end_date.isoformat(), page=page
+        )
+
+    def watch_providers(self, region='US'):
+        return self.get('/watch/providers/movie', watch_region=region)
+
+    def close(self):
+        self.session.close()
+        if self.cache:
+            self.cache.close()
+
+
+def split_name(name):
+    """Split "Ridley Scott" into ("Ridley", "Scott")"""
+    name_parts = name.split(' ', 1)
+    return name_parts[0], name_parts[1] if len(name_parts) > 1 else ''
+
+
+def film_fields(movie_data, image_base_url):
+    """Film model fields from a TMDb movie list entry"""
+    release_date = None
+    if movie_data.get('release_date'):
+        try:
+            release_date = datetime.strptime(movie_data['release_date'], '%Y-%m-%d').date()
+        except ValueError:
+            pass
+
+    poster_url = None
+    if movie_data.get('poster_path'):
+        poster_url = f"{image_base_url}{movie_data['poster_path']}"
+
+    return {
+        'title': movie_data['title'],
+        'release_date': release_date or datetime.now().date(),
+        'language': movie_data.get('original_language', 'en'),
+        'overview': movie_data.get('overview', ''),
+        'poster_url': poster_url,
+        'tmdb_id': movie_data['id'],
+    }
+
+
+def cast_names(details):
+    """(first name, last name) of the top billed cast in a details response"""
+    cast = details.get('credits', {}).get('cast', [])[:CAST_LIMIT]
+    return [split_name(person['name']) for person in cast if person.get('name')]
+
+
+def director_names(details):
+    crew = details.get('credits', {}).get('crew', [])
+    return [split_name(person['name']) for person in crew if person.get('job') == 'Director' and person.get('name')]
+
+
+def genre_names(movie_data):
+    return [GENRES[genre_id] for genre_id in movie_data.get('genre_ids') or [] if genre_id in GENRES]
+
+
+def region_providers(data, region='US'):
+    """Provider entries offered in ``region`` in a watch providers response"""
+    offers = data.get('results', {}).get(region, {})
+    return [provider for offer in PROVIDER_OFFERS for provider in offers.get(offer, [])]
@@ -0,0 +1,99 @@
+# movie/tmdb_cache.py
+"""
+On-disk cache of TMDb responses.
+
+Responses are stored zlib-compressed in a single SQLite file, keyed by request
+path and parameters (the API key is left out). Entries younger than the TTL
+are served without a request; older ones are revalidated with
+``If-None-Match``/``If-Modified-Since`` and refreshed on ``304 Not Modified``.
+
+The cache also serves as a replayable stand-in for TMDb: ``TMDbClient`` in
+offline mode answers only from it, which is how tests and benchmarks run the
+ingestion commands without network access.
+"""
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlencode
+
+import requests
+
+DEFAULT_TTL = 60 * 60 * 24
+IGNORED_PARAMS = ('api_key',)
+
+
+class OfflineCacheMiss(requests.RequestException):
+    """Raised in offline mode for requests that were never cached"""
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    data: object
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    def is_fresh(self, ttl):
+        return time.time() - self.fetched_at < ttl
+
+    def revalidation_headers(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """SQLite-backed response store, safe to share between threads"""
+
+    def __init__(self, path, ttl=DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, body BLOB NOT NULL, etag TEXT, last_modified TEXT, fetched_at REAL NOT NULL)"
+            )
+
+    @staticmethod
+    def key(path, params=None):
+        params = sorted((name, str(value)) for name, value in (params or {}).items() if name not in IGNORED_PARAMS)
+        return f"{path}?{urlencode(params)}" if params else path
+
+    def get(self, path, params=None):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM responses WHERE key = ?",
+                (self.key(path, params),)
+            ).fetchone()
+        if row is None:
+            return None
+        body, etag, last_modified, fetched_at = row
+        return CachedResponse(json.loads(zlib.decompress(body)), etag, last_modified, fetched_at)
+
+    def store(self, path, params, data, etag=None, last_modified=None):
+        body = zlib.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, body, etag, last_modified, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (self.key(path, params), body, etag, last_modified, time.time())
+            )
+
+    def touch(self, path, params=None):
+        """Mark a revalidated entry as fresh again"""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE responses SET fetched_at = ? WHERE key = ?", (time.time(), self.key(path, params))
+            )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
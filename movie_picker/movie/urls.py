@@ -6,7 +6,11 @@ app_name = 'movie'
 
 urlpatterns = [
     path('films/', views.FilmListCreateView.as_view(), name='film-list-create'),
+    path('films/search/', views.FilmSearchView.as_view(), name='film-search'),
     path('films/<int:pk>/', views.FilmDetailView.as_view(), name='film-detail'),
+    path('films/<int:pk>/similar/', views.FilmSimilarView.as_view(), name='film-similar'),
+
+    path('autocomplete/', views.AutocompleteView.as_view(), name='autocomplete'),
 
     path('actors/', views.ActorListCreateView.as_view(), name='actor-list-create'),
     path('actors/<int:pk>/', views.ActorDetailView.as_view(), name='actor-detail'),
@@ -24,6 +28,8 @@ urlpatterns = [
     path('streaming-services/<int:pk>/', views.StreamingServiceDetailView.as_view(), name='streaming-service-detail'),
 
     path('watched/', views.WatchedFilmListCreateView.as_view(), name='watched-film-list-create'),
+    path('watched/import/', views.WatchedFilmImportView.as_view(), name='watched-film-import'),
+    path('watched/export/', views.WatchedFilmExportView.as_view(), name='watched-film-export'),
     path('watched/<int:pk>/', views.WatchedFilmDetailView.as_view(), name='watched-film-detail'),
 
     path('my-films/', views.MyWatchedFilmsView.as_view(), name='my-watched-films'),
@@ -0,0 +1,35 @@
+# movie/versioning.py
+"""
+Version counters kept in the Django cache.
+
+In-process structures (feature store, weight tables, ...) remember the version
+they were built from and rebuild once it changes, so a write handled by one
+worker process invalidates the copies held by every other worker.
+"""
+import time
+
+from django.core.cache import cache
+
+
+def initial_version():
+    # Counters start from the clock rather than 1, so a counter recreated after a
+    # cache flush or eviction never matches a version some process built earlier
+    return time.time_ns() // 1000
+
+
+def get_version(key):
+    """Return the current version stored under ``key``, initialising it if missing"""
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, initial_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    """Move ``key`` to a new version"""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, initial_version(), timeout=None)
+        return cache.get(key)
@@ -0,0 +1,107 @@
+# movie/watched.py
+"""
+Bulk import and export of a user's watched films.
+
+An import validates every row, resolves film ids and TMDb ids with one query
+and upserts the rows with ``bulk_create(update_conflicts=True)`` on the
+(film, user) key in a single transaction. ``bulk_create`` sends no signals,
+so the caches the ``WatchedFilm`` receivers would drop are invalidated and
+the user's stats rebuilt here.
+"""
+from django.db import transaction
+from django.db.models import Q
+
+from .candidates import invalidate_watched_candidates
+from .models import Film, WatchedFilm
+from .recommender import invalidate_user_recommendations
+from .serializers import WatchedFilmImportRowSerializer
+from .stats import rebuild_user_stats
+
+IMPORT_BATCH_SIZE = 500
+
+CREATED = 'created'
+UPDATED = 'updated'
+DUPLICATE = 'duplicate'
+ERROR = 'error'
+
+EXPORT_COLUMNS = ('film', 'tmdb_id', 'title', 'review', 'watched_at')
+
+
+def import_watched_films(user, rows):
+    """
+    Upsert ``rows`` of ``{film or tmdb_id, review}`` into the user's watched films.
+
+    Returns one result per row, in order. A film listed more than once keeps
+    the review of its last row; earlier rows are reported as duplicates.
+    """
+    results = []
+    valid = []
+    for number, row in enumerate(rows, start=1):
+        serializer = WatchedFilmImportRowSerializer(data=row)
+        if serializer.is_valid():
+            valid.append((number, serializer.validated_data))
+            results.append(None)
+        else:
+            results.append({'row': number, 'status': ERROR, 'errors': serializer.errors})
+
+    film_ids, tmdb_ids = resolve_films(valid)
+    reviews = {}
+    for number, data in valid:
+        film_id = data['film'] if 'film' in data else tmdb_ids.get(data['tmdb_id'])
+        if film_id is None or film_id not in film_ids:
+            reference = {'film': data['film']} if 'film' in data else {'tmdb_id': data['tmdb_id']}
+            results[number - 1] = {'row': number, 'status': ERROR, 'errors': {**reference, 'detail': 'Unknown film.'}}
+            continue
+        if film_id in reviews:
+            earlier = reviews[film_id][0]
+            results[earlier - 1] = {'row': earlier, 'status': DUPLICATE, 'film': film_id}
+        reviews[film_id] = (number, data.get('review'))
+
+    if reviews:
+        with transaction.atomic():
+            existing = set(
+                WatchedFilm.objects.filter(user=user, film_id__in=reviews).values_list('film_id', flat=True)
+            )
+            WatchedFilm.objects.bulk_create(
+                [WatchedFilm(user=user, film_id=film_id, review=review) for film_id, (_, review) in reviews.items()],
+                batch_size=IMPORT_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['film', 'user'],
+                update_fields=['review', 'modified_at'],
+            )
+        invalidate_watched_candidates(user.pk)
+        invalidate_user_recommendations(user.pk)
+        rebuild_user_stats([user.pk])
+
+        for film_id, (number, review) in reviews.items():
+            results[number - 1] = {
+                'row': number, 'status': UPDATED if film_id in existing else CREATED, 'film': film_id, 'review': review
+            }
+    return results
+
+
+def resolve_films(rows):
+    """Look up the films named by ``rows`` in one query: (existing film ids, {tmdb id: film id})"""
+    requested_ids = {data['film'] for _, data in rows if 'film' in data}
+    requested_tmdb_ids = {data['tmdb_id'] for _, data in rows if 'film' not in data}
+    if not requested_ids and not requested_tmdb_ids:
+        return set(), {}
+
+    film_ids, tmdb_ids = set(), {}
+    found = Film.objects.filter(Q(id__in=requested_ids) | Q(tmdb_id__in=requested_tmdb_ids))
+    for film_id, tmdb_id in found.values_list('id', 'tmdb_id'):
+        film_ids.add(film_id)
+        if tmdb_id is not None:
+            tmdb_ids[tmdb_id] = film_id
+    return film_ids, tmdb_ids
+
+
+def export_rows(user):
+    """Yield the user's watched films as rows of EXPORT_COLUMNS, header first, streaming from the database"""
+    yield EXPORT_COLUMNS
+    watched = (
+        WatchedFilm.objects.filter(user=user).order_by('created_at', 'id')
+        .values_list('film_id', 'film__tmdb_id', 'film__title', 'review', 'created_at')
+    )
+    for film_id, tmdb_id, title, review, created_at in watched.iterator(chunk_size=2000):
+        yield film_id, tmdb_id, title, review, created_at.isoformat()
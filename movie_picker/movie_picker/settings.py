@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import sys
+import tempfile
 from dotenv import load_dotenv
 from datetime import timedelta
 
@@ -145,6 +147,23 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# The cache carries the version counters that tell every process (web workers and management
+# commands such as db_seed or build_film_embeddings) to rebuild their in-process structures, so
+# it must be shared between processes: files on disk by default, or e.g. Redis via CACHE_BACKEND.
+# Local memory is private to each process and only used by the test runner.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'movie_picker_cache')),
+    }
+}
+if sys.argv[1:2] == ['test']:
+    CACHES['default'] = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -202,9 +221,41 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # Page numbers by default, keyset cursors with ?pagination=cursor (see movie/pagination.py)
+    'DEFAULT_PAGINATION_CLASS': 'movie.pagination.StandardPagination',
+    'PAGE_SIZE': 50,
 }
 
 
+# Film relation counts in list responses: 'annotate' computes them with subqueries,
+# 'denormalized' reads the columns kept up to date by signals on the through models
+FILM_COUNTS_SOURCE = os.getenv('FILM_COUNTS_SOURCE', 'annotate')
+
+# Most rows accepted by one watched films import
+WATCHED_IMPORT_MAX_ROWS = int(os.getenv('WATCHED_IMPORT_MAX_ROWS', 10000))
+
+# Film embedding index written by the build_film_embeddings command
+FILM_EMBEDDINGS_PATH = os.getenv('FILM_EMBEDDINGS_PATH', str(BASE_DIR / 'film_embeddings.bin'))
+
+# Recommendations
+# Number of best scored films kept per request before the final picks are made
+RECOMMENDATION_POOL_SIZE = int(os.getenv('RECOMMENDATION_POOL_SIZE', 40))
+# Weight of the category similarity penalty when re-ranking the pool (0 keeps score order)
+RECOMMENDATION_DIVERSITY = float(os.getenv('RECOMMENDATION_DIVERSITY', 0.3))
+# Points per unit of review deviation predicted by item-item collaborative filtering
+# (neighbours computed by the compute_film_similarities command)
+RECOMMENDATION_CF_WEIGHT = float(os.getenv('RECOMMENDATION_CF_WEIGHT', 10))
+# 'all' scores every film on the user's services; 'embeddings' scores only films close to the
+# user's highly rated ones in the film embedding index (plus films not indexed yet) when that
+# yields enough of them. Rebuild the index with build_film_embeddings after catalog imports
+RECOMMENDATION_CANDIDATES = os.getenv('RECOMMENDATION_CANDIDATES', 'all')
+# Seconds a user's ranked recommendations are served from the cache
+RECOMMENDATION_CACHE_TIMEOUT = int(os.getenv('RECOMMENDATION_CACHE_TIMEOUT', 60 * 15))
+# 'online' scores on request; 'precomputed' reads rankings stored by the precompute_recommendations
+# command and falls back to online scoring for users without them
+RECOMMENDATION_SOURCE = os.getenv('RECOMMENDATION_SOURCE', 'online')
+
+
 # drf-spectacular settings
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Movie Picker API',